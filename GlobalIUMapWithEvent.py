@@ -12,19 +12,14 @@ import obspy
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 from obspy.clients.fdsn import Client
+from catalog_cache import FDSN_SERVICE
+from basemap_cache import add_cached_basemap, GLOBAL_FEATURES
+from station_arrays import inventory_to_arrays
+from station_labels import plot_station_labels
+from great_circle import great_circle_paths, plot_great_circles
 
-# Function to strip STA out of IU.STA.LOC.CHAN
-def get_sta(stachan):
-    sta = []
-    index = 3
-    while stachan[index] != '.':
-        sta.append(stachan[index])
-        index += 1
-    sta = stachan[3:(index)]
-    return sta
-
-# Create IRIS client to fetch data
-c = Client('IRIS')
+# Create IRIS client (or $SEISMICITY_FDSN_SERVICE) to fetch data
+c = Client(FDSN_SERVICE)
 
 # Get event information
 UTC_str = '2011-03-11T05:46:23.2'     #Tohoku event
@@ -37,16 +32,13 @@ origin = cat[0].preferred_origin()
 inv = c.get_stations(network = 'IU', station = '*', location = '00',
                       channel='BHZ',level='channel')
 
-# Make lists of station names and coordinates (for plotting)
-stachan_list = inv.get_contents()['channels']
-coords_list = []
-for stachan in stachan_list:
-    coords = inv.get_coordinates(stachan)
-    coords_list.append(coords)
+# Flatten inventory into arrays of codes and coordinates, one row per station
+stations = inventory_to_arrays(inv)
 
 # Create world map with colored land/ocean and coastlines
 ax = plt.axes(projection=ccrs.PlateCarree())
-ax.stock_img()
+ax.set_global()
+add_cached_basemap(ax, GLOBAL_FEATURES, dpi = 300)   #cached ax.stock_img()
 # ax.coastlines()
 
 # Plot event
@@ -58,24 +50,18 @@ plt.plot(origin.longitude, origin.latitude,
 
 # Plot stations
 sta_color = (255/255, 140/255, 0/255)   #dark orange
-stachan_prev = ()
-for stachan, coords in zip(stachan_list, coords_list):
-    if stachan != stachan_prev:
-        # Plot station
-        plt.plot(coords['longitude'], coords['latitude'],
-                  marker='^', markersize=2, markerfacecolor=sta_color, 
-                  markeredgecolor = sta_color,transform=ccrs.Geodetic(), 
-                  zorder=5)
-        # Path from event to station
-        plt.plot([origin.longitude, coords['longitude']],[origin.latitude, coords['latitude']], 
-                 color='black', linewidth=0.5,linestyle='--',
-                 transform=ccrs.Geodetic(),zorder = 6)
-        # Label station
-        sta = get_sta(stachan)   #strip out STA code
-        plt.text(coords['longitude'], coords['latitude'], 
-                 sta,va="bottom", ha="left", fontsize=6,
-                 transform=ccrs.Geodetic(),zorder = 7)
-    stachan_prev = stachan    
+ax.plot(stations['longitude'], stations['latitude'], linestyle='none',
+        marker='^', markersize=2, markerfacecolor=sta_color, 
+        markeredgecolor = sta_color,transform=ccrs.PlateCarree(), 
+        zorder=5)
+# Paths from event to stations, all great circles in one collection
+path_lon, path_lat = great_circle_paths(origin.longitude, origin.latitude,
+                                        stations['longitude'], stations['latitude'])
+plot_great_circles(ax, path_lon, path_lat, colors='black', linewidths=0.5,
+                   linestyles='--', zorder=6)
+# Label stations, dropping or moving labels that would overlap
+plot_station_labels(ax, stations['longitude'], stations['latitude'],
+                    stations['station'], fontsize=6, zorder=7)
 
 # Save the plot by calling plt.savefig() BEFORE plt.show()
 plt.savefig('GlobalIUMapWithEvent.png', dpi = 300)
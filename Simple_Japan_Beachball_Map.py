@@ -5,15 +5,16 @@ Created on Tue Nov 22 18:39:04 2022
 
 @author: chrisyoung
 """
-# Plots focal mechanisms for specified events in Japan
+# Plots focal mechanisms for events in Japan
 
 import obspy
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 from obspy.clients.fdsn import Client
-from obspy.imaging.beachball import beach
+from basemap_cache import add_cached_basemap, REGIONAL_FEATURES
+from beachball_layer import plot_event_beachballs
+from focal_mechanisms import cached_get_mechanisms
 
 # Event catalog information
 start_str = '2010-01-01T00:00:00.0'
@@ -29,12 +30,9 @@ max_longitude = 150.
 ax = plt.axes(projection=ccrs.PlateCarree())
 ax.set_extent([min_longitude, max_longitude, min_latitude, max_latitude], crs=ccrs.PlateCarree())
 
-ax.add_feature(cfeature.LAND)
-ax.add_feature(cfeature.OCEAN)
-ax.add_feature(cfeature.COASTLINE,linestyle='-',linewidth=0.3)
-ax.add_feature(cfeature.STATES, linestyle='-',linewidth=0.2)
-ax.add_feature(cfeature.LAKES, alpha=0.5,linewidth=0.1)
-# ax.add_feature(cfeature.RIVERS)
+# Land, ocean, coastlines, states and lakes come from a cached raster that is
+# rendered once per extent and dpi (see basemap_cache.py)
+add_cached_basemap(ax, REGIONAL_FEATURES, dpi = 300)
 
 # Plot catalog events
 depth_list = [35.,70.,150.,300.,500.]
@@ -57,13 +55,18 @@ min_marker_size = 1
 max_marker_size = 3
 marker_scale_fac = (max_marker_size - min_marker_size)/(max_mag - min_mag)
 
-# Plot beachballs
-np1 = [150, 87, 1]
-mt = [-2.39, 1.04, 1.35, 0.57, -2.94, -0.94]
-beach1 = beach(np1, xy=(130,40), width=0.5, linewidth=0.2, facecolor='k')
-beach2 = beach(mt, xy=(135,35), width=1.0, linewidth=0.2,facecolor='k')
-ax.add_collection(beach1)
-ax.add_collection(beach2)
+# Focal mechanisms for the map area, from the mechanism cache (see
+# focal_mechanisms.py). The source is an FDSN event service, or a list of
+# local QuakeML/NDK files, e.g. mechanism_source = ['jan76_dec20.ndk']
+mechanism_source = 'USGS'
+events = cached_get_mechanisms(mechanism_source, starttime=start_str, endtime=end_str,
+                               minlatitude=min_latitude, maxlatitude=max_latitude,
+                               minlongitude=min_longitude, maxlongitude=max_longitude,
+                               minmagnitude=min_mag, maxmagnitude=max_mag)
+
+# Plot beachballs as one collection (see beachball_layer.py), sized by
+# magnitude and filled with the depth colors
+plot_event_beachballs(ax, events, min_mag, max_mag, linewidth=0.2)
 
 # # Add some labels at the bottom of the map
 # # Create a Rectangle patch for legend
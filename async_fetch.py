@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:52:18 2026
+
+@author: chrisyoung
+"""
+# asyncio layer for issuing many FDSN event and station queries at once, e.g.
+# every catalog and inventory of a job file. Requests go through one pooled
+# requests.Session per host, run in a thread pool, with at most per_host of
+# them in flight to any one host; each has a timeout and is retried with
+# exponential backoff on connection errors, timeouts and 429/5xx answers. An
+# event query the service refuses as too large (413) is split in two halves
+# of its time window. Responses are spooled (to disk once large) and parsed
+# into event arrays (streaming QuakeML parser) or station arrays.
+#
+#   async with AsyncFDSNFetcher(per_host=4) as fetcher:
+#       tasks = [fetcher.get_event_arrays('IRIS', **query) for query in queries]
+#       for task in asyncio.as_completed(tasks):
+#           events = await task
+#
+# indexed_get_event_arrays answers event queries from the local catalog
+# store (see catalog_index.py) and only fetches the parts it does not cover.
+# Stages (get_events, get_stations, parse_quakeml, ...) are timed under the
+# span_path given, in the fetch threads (see pipeline_timing.py).
+#
+# Services are names known to obspy ('IRIS', 'USGS', ...) or base URLs
+# (e.g. of fdsn_standin.py); service_mappings maps 'event'/'station' to a
+# full service URL, like obspy Client's.
+
+import os
+import asyncio
+import tempfile
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import obspy
+import requests
+from requests.adapters import HTTPAdapter
+from obspy.clients.fdsn.header import (URL_MAPPINGS, URL_MAPPING_SUBPATHS,
+                                       URL_DEFAULT_SUBPATH, FDSNException,
+                                       FDSNBadRequestException,
+                                       FDSNRequestTooLargeException,
+                                       FDSNTimeoutException)
+
+from catalog_arrays import concat_event_arrays, deduplicate_events, empty_event_arrays
+from catalog_cache import (CACHE_DIR, load_event_arrays, normalize_query, query_key,
+                           save_event_arrays)
+from catalog_fetch import split_time_window
+from catalog_index import indexable, open_store, save_store, store_path
+from pipeline_timing import count, in_path, span
+from quakeml_stream import read_quakeml_arrays
+from station_arrays import inventory_to_arrays
+
+# Answers worth asking again, after a wait
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Function to get the query URL of a service's event or station web service
+def service_query_url(service, kind, service_mappings=None):
+    if service_mappings and kind in service_mappings:
+        return service_mappings[kind].rstrip('/') + '/query'
+    name = service.upper()
+    if name == 'EARTHSCOPE+USGS' and kind == 'event':
+        return 'https://earthquake.usgs.gov/fdsnws/event/1/query'
+    if name in URL_MAPPINGS:
+        base = URL_MAPPINGS[name] + URL_MAPPING_SUBPATHS.get(name, URL_DEFAULT_SUBPATH)
+    else:
+        base = service.rstrip('/') + URL_DEFAULT_SUBPATH
+    return '%s/%s/1/query' % (base, kind)
+
+# Function to turn query values into FDSN parameter strings
+def query_parameters(**query):
+    params = {}
+    for name, value in query.items():
+        if value is None:
+            continue
+        if name in ('starttime', 'endtime', 'updatedafter'):
+            value = obspy.UTCDateTime(value).strftime('%Y-%m-%dT%H:%M:%S.%f')
+        elif isinstance(value, bool):
+            value = 'true' if value else 'false'
+        params[name] = str(value)
+    return params
+
+# Fetcher of FDSN queries from asyncio code; use as an async context manager
+# (or call close) to shut its sessions and threads down
+class AsyncFDSNFetcher:
+    def __init__(self, per_host=4, timeout=120., retries=3, retry_wait=2.,
+                 max_splits=6, service_mappings=None, max_threads=32):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_wait = retry_wait
+        self.max_splits = max_splits
+        self.service_mappings = service_mappings
+        self.executor = ThreadPoolExecutor(max_workers=max_threads,
+                                           thread_name_prefix='fdsn-fetch')
+        self.sessions = {}
+        self.semaphores = {}
+        self.store_locks = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
+
+    # Function to get the pooled session and the request limit of a host
+    def _host(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        if host not in self.sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.per_host)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self.sessions[host] = session
+            self.semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self.sessions[host], self.semaphores[host]
+
+    # Function to get the lock of a catalog store file, held by a task
+    # while it works out, fetches and adds what the store is missing
+    def store_lock(self, path):
+        if path not in self.store_locks:
+            self.store_locks[path] = asyncio.Lock()
+        return self.store_locks[path]
+
+    # Function to run func(*args) in the fetch threads
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    # Function to download a query into a spooled file (blocking; runs in a
+    # fetch thread) inside a stage span under span_path. Returns the status
+    # and the file (None unless 200).
+    def _download(self, session, url, params, stage, span_path):
+        try:
+            with in_path(span_path), span(stage), \
+                    session.get(url, params=params, stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    return response.status_code, response.text[:500]
+                body = tempfile.SpooledTemporaryFile(max_size=64*1024*1024)
+                for chunk in response.iter_content(chunk_size=1024*1024):
+                    body.write(chunk)
+                if stage == 'get_events':
+                    count('quakeml_bytes', body.tell())
+                body.seek(0)
+                return 200, body
+        except requests.Timeout as e:
+            raise FDSNTimeoutException('Timed out: %s (%s)' % (url, e))
+
+    # Function to make one request with the host's limit, retrying with
+    # backoff; returns (status, body): body is a file for 200, None for 204
+    # (or 404 with nodata=404). Each attempt is timed as a stage span
+    # ('get_events', 'get_stations') under span_path.
+    async def request(self, url, params, stage='request', span_path=()):
+        session, semaphore = self._host(url)
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    status, body = await self._run(self._download, session, url, params,
+                                                   stage, span_path)
+            except (requests.ConnectionError, FDSNTimeoutException):
+                if attempt == self.retries:
+                    raise
+            else:
+                if status == 200:
+                    return status, body
+                if status == 204 or status == 404 and params.get('nodata') == '404':
+                    return 204, None
+                if status == 400:
+                    raise FDSNBadRequestException('Bad request: %s\n%s' % (url, body))
+                if status == 413:
+                    raise FDSNRequestTooLargeException('Request too large: %s' % url)
+                if status not in RETRY_STATUS or attempt == self.retries:
+                    raise FDSNException('HTTP %d from %s\n%s' % (status, url, body))
+            await asyncio.sleep(self.retry_wait*2**attempt)
+
+    # Function to parse a QuakeML response (blocking; runs in a fetch thread)
+    def _parse_events(self, body, mechanisms, span_path):
+        with body, in_path(span_path):
+            with span('parse_quakeml'):
+                arrays = read_quakeml_arrays(body, 10000, mechanisms)
+            count('events_parsed', arrays['event_id'].size)
+        return arrays
+
+    # Function to fetch an event query as event arrays; no events is an empty
+    # set. A query refused as too large is split at the middle of its time
+    # window, up to max_splits times deep. Stages are timed under span_path.
+    async def get_event_arrays(self, service, mechanisms=False, _depth=0, span_path=(),
+                               **query):
+        url = service_query_url(service, 'event', self.service_mappings)
+        try:
+            status, body = await self.request(url, query_parameters(**query), 'get_events',
+                                              span_path)
+        except FDSNRequestTooLargeException:
+            if _depth >= self.max_splits or 'starttime' not in query or 'endtime' not in query:
+                raise
+            starttime = obspy.UTCDateTime(query['starttime'])
+            middle = starttime + (obspy.UTCDateTime(query['endtime']) - starttime)/2.
+            halves = await asyncio.gather(
+                self.get_event_arrays(service, mechanisms, _depth + 1, span_path,
+                                      **dict(query, endtime=middle)),
+                self.get_event_arrays(service, mechanisms, _depth + 1, span_path,
+                                      **dict(query, starttime=middle)))
+            return deduplicate_events(concat_event_arrays(list(halves)))
+        if body is None:
+            return empty_event_arrays(mechanisms)
+        return await self._run(self._parse_events, body, mechanisms, span_path)
+
+    # Function to fetch an event query over time slices of slice_days, all
+    # issued at once (the host limit still applies), merged and de-duplicated
+    async def get_event_arrays_sliced(self, service, slice_days=30., mechanisms=False,
+                                      span_path=(), **query):
+        slices = split_time_window(query.pop('starttime'), query.pop('endtime'), slice_days)
+        results = await asyncio.gather(*[
+            self.get_event_arrays(service, mechanisms, span_path=span_path,
+                                  **dict(query, starttime=t0, endtime=t1))
+            for t0, t1 in slices])
+        return deduplicate_events(concat_event_arrays(list(results)))
+
+    # Function to parse a StationXML response (blocking; runs in a fetch
+    # thread)
+    def _parse_inventory(self, body, span_path):
+        with body, in_path(span_path), span('parse_stationxml'):
+            return obspy.read_inventory(body, 'STATIONXML')
+
+    # Function to fetch a station query as an obspy Inventory (None if no
+    # data)
+    async def get_inventory(self, service, span_path=(), **query):
+        url = service_query_url(service, 'station', self.service_mappings)
+        status, body = await self.request(url, query_parameters(**query), 'get_stations',
+                                          span_path)
+        if body is None:
+            return None
+        return await self._run(self._parse_inventory, body, span_path)
+
+    # Function to fetch a station query as station arrays
+    async def get_station_arrays(self, service, span_path=(), **query):
+        inv = await self.get_inventory(service, span_path, **query)
+        if inv is None:
+            return inventory_to_arrays(obspy.Inventory(networks=[]))
+        return await self._run(inventory_to_arrays, inv)
+
+    # Function to fetch an event query, over concurrent time slices with
+    # slice_days
+    async def fetch_event_arrays(self, service, slice_days=None, span_path=(), **query):
+        if slice_days:
+            return await self.get_event_arrays_sliced(service, slice_days,
+                                                      span_path=span_path, **query)
+        return await self.get_event_arrays(service, span_path=span_path, **query)
+
+# Function to load cached event arrays (blocking; runs in a fetch thread)
+def _load_cached(path, span_path):
+    with in_path(span_path), span('cache_load'):
+        arrays, meta = load_event_arrays(path)
+    return arrays
+
+# Function to get event arrays for a query from the cache (see
+# catalog_cache.cached_get_events), fetching them with fetcher on a miss;
+# with slice_days the fetch is split into concurrent time slices
+async def cached_get_event_arrays(fetcher, service, cache_dir=CACHE_DIR, refresh=False,
+                                  slice_days=None, span_path=(), **query):
+    query = normalize_query(**query)
+    path = os.path.join(cache_dir, query_key(query, service) + '.npz')
+    if not refresh and os.path.exists(path):
+        with in_path(span_path):
+            count('cache_hits')
+        return await fetcher._run(_load_cached, path, span_path)
+    with in_path(span_path):
+        count('cache_misses')
+    arrays = await fetcher.fetch_event_arrays(service, slice_days, span_path, **query)
+    await fetcher._run(save_event_arrays, path, arrays, {'query': query})
+    return arrays
+
+# Function to get event arrays for a query from the local catalog store of
+# the catalog and service (see catalog_index.indexed_get_events), fetching
+# only the parts it does not cover, all at once. Tasks sharing a store take
+# turns (fetcher.store_lock), so a query inside one being fetched waits for
+# it and is then served from the store.
+async def indexed_get_event_arrays(fetcher, service, cache_dir=CACHE_DIR, slice_days=None,
+                                   max_age_days=None, settle_days=1., span_path=(),
+                                   **query):
+    query = normalize_query(**query)
+    if not indexable(query):
+        return await cached_get_event_arrays(fetcher, service, cache_dir,
+                                             slice_days=slice_days, span_path=span_path,
+                                             **query)
+    async with fetcher.store_lock(store_path(service, query.get('catalog'), cache_dir)):
+        store = open_store(service, query.get('catalog'), cache_dir)
+        pieces = store.remainder(query, max_age_days, settle_days)
+        if pieces:
+            with in_path(span_path):
+                count('index_misses')
+                count('index_fetches', len(pieces))
+            fetched_at = obspy.UTCDateTime().timestamp
+            fetched = await asyncio.gather(*[
+                fetcher.fetch_event_arrays(service, slice_days, span_path, **piece)
+                for piece in pieces])
+            store.add(concat_event_arrays(list(fetched)), pieces, fetched_at)
+            save_store(store)
+        else:
+            with in_path(span_path):
+                count('index_hits')
+    with in_path(span_path), span('index_lookup'):
+        return store.query(**query)
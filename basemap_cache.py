@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:37:52 2026
+
+@author: chrisyoung
+"""
+# Pre-rendered map backgrounds. The land/ocean/coastline/state/lake features
+# (or the stock image) are drawn once for a given projection, extent, pixel
+# size, dpi and feature set, saved as a PNG in the cache directory, and later
+# maps only composite that raster under their events. The vector features
+# themselves are read pre-clipped from geometry_store.py.
+
+import os
+import json
+import hashlib
+
+import numpy as np
+import matplotlib.image as mpimg
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import cartopy.crs as ccrs
+import cartopy.feature as cfeature
+
+from catalog_cache import CACHE_DIR
+from geometry_store import GEOMETRY_DIR, clipped_feature
+from pipeline_timing import count, span
+
+BASEMAP_DIR = os.path.join(CACHE_DIR, 'basemaps')
+
+# Feature sets as (name, keyword arguments); a name is an attribute of
+# cartopy.feature, or 'stock_img'
+GLOBAL_FEATURES = (('stock_img', {}),)
+REGIONAL_FEATURES = (('LAND', {}),
+                     ('OCEAN', {}),
+                     ('COASTLINE', {'linestyle': '-', 'linewidth': 0.3}),
+                     ('STATES', {'linestyle': '-', 'linewidth': 0.2}),
+                     ('LAKES', {'alpha': 0.5, 'linewidth': 0.1}))
+
+# Function to draw a feature set directly on a map. With preclip the Natural
+# Earth features come from geometry_store, clipped and simplified to the map
+# extent (plus a small margin) and cached as coordinate arrays in
+# geometry_dir.
+def add_basemap_features(ax, features, preclip=True, geometry_dir=GEOMETRY_DIR):
+    if preclip:
+        min_lon, max_lon, min_lat, max_lat = ax.get_extent(crs=ccrs.PlateCarree())
+        margin = 0.02*max(max_lon - min_lon, max_lat - min_lat)
+        extent = [min_lon - margin, max_lon + margin,
+                  max(-90., min_lat - margin), min(90., max_lat + margin)]
+    for name, kwargs in features:
+        if name == 'stock_img':
+            ax.stock_img(**kwargs)
+        elif preclip:
+            ax.add_feature(clipped_feature(name, extent, cache_dir=geometry_dir), **kwargs)
+        else:
+            ax.add_feature(getattr(cfeature, name), **kwargs)
+
+# Function to hash everything that changes the look of a basemap
+def basemap_key(projection, extent, size_px, dpi, features):
+    spec = {'projection': projection.proj4_init,
+            'extent': [round(float(value), 6) for value in extent],
+            'size_px': [int(value) for value in size_px],
+            'dpi': float(dpi),
+            'features': [[name, kwargs] for name, kwargs in features]}
+    text = json.dumps(spec, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+# Function to render a feature set to a PNG of exactly size_px pixels that
+# covers extent (projection coordinates) edge to edge
+def render_basemap(path, projection, extent, size_px, dpi, features,
+                   geometry_dir=GEOMETRY_DIR):
+    width_px, height_px = size_px
+    fig = Figure(figsize=(width_px/dpi, height_px/dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1], projection=projection)
+    ax.set_extent(extent, crs=projection)
+    ax.set_aspect('auto')
+    ax.spines['geo'].set_visible(False)
+    add_basemap_features(ax, features, geometry_dir=geometry_dir)
+    ax.set_extent(extent, crs=projection)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = '%s.%d.tmp.png' % (path, os.getpid())
+    fig.savefig(tmp_path, dpi=dpi)
+    os.replace(tmp_path, path)
+
+# Function to put a cached basemap under a map, rendering it first if this
+# extent/projection/size/dpi/feature set has not been seen before. Set the
+# map extent before calling, and pass the dpi the map will be saved at. A
+# render takes the clipped Natural Earth features from geometry_dir.
+def add_cached_basemap(ax, features=REGIONAL_FEATURES, dpi=300, cache_dir=BASEMAP_DIR,
+                       zorder=0, geometry_dir=GEOMETRY_DIR):
+    ax.apply_aspect()
+    extent = ax.get_extent()
+    fig_width, fig_height = ax.figure.get_size_inches()
+    position = ax.get_position()
+    size_px = (max(1, int(round(position.width*fig_width*dpi))),
+               max(1, int(round(position.height*fig_height*dpi))))
+    path = os.path.join(cache_dir, basemap_key(ax.projection, extent, size_px,
+                                               dpi, features) + '.png')
+    if not os.path.exists(path):
+        count('basemap_renders')
+        with span('basemap_render'):
+            render_basemap(path, ax.projection, extent, size_px, dpi, features,
+                           geometry_dir)
+    image = mpimg.imread(path)
+    artist = ax.imshow(np.asarray(image), extent=extent, transform=ax.projection,
+                       origin='upper', interpolation='nearest', zorder=zorder)
+    ax.set_extent(extent, crs=ax.projection)
+    return artist
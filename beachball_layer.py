@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:03:51 2026
+
+@author: chrisyoung
+"""
+# Focal mechanisms (beachballs) for whole catalogs in one collection. The
+# outline of each mechanism is made once by obspy's beach() as a unit glyph
+# (radius 1) and cached under the mechanism rounded to a few degrees (or, for
+# moment tensors, the normalized tensor rounded to a small step); every event
+# then just scales and shifts its glyph's paths, and all of them are drawn as
+# one PathCollection. Glyphs are sized in points, so they stay round on any
+# projection, like the station labels.
+
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import cartopy.crs as ccrs
+from matplotlib.collections import PathCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+from matplotlib.path import Path
+from matplotlib.transforms import Affine2D
+from obspy.imaging.beachball import beach
+
+from event_style import (DEPTH_LIST, DEPTH_COLOR_LIST, depth_class_indices,
+                         magnitude_marker_sizes)
+
+# Unit glyphs by quantized mechanism and its step: (paths, compressional-fill
+# mask)
+_GLYPHS = {}
+
+# Function to round nodal planes to angle_step degrees; returns (n, 3) ints
+# in units of the step, strike taken modulo 360
+def quantize_planes(strike, dip, rake, angle_step=5.):
+    strike = np.mod(np.round(np.asarray(strike, dtype=np.float64)/angle_step), 360./angle_step)
+    dip = np.round(np.asarray(dip, dtype=np.float64)/angle_step)
+    rake = np.round(np.asarray(rake, dtype=np.float64)/angle_step)
+    with np.errstate(invalid='ignore'):
+        return np.nan_to_num(np.column_stack([strike, dip, rake])).astype(np.int64)
+
+# Function to scale moment tensors (n, 6: m_rr, m_tt, m_pp, m_rt, m_rp,
+# m_tp) to a largest component of 1 and round them to tensor_step; the
+# beachball only depends on the tensor's shape. Returns (n, 6) ints in units
+# of the step.
+def quantize_tensors(tensor, tensor_step=0.05):
+    tensor = np.asarray(tensor, dtype=np.float64).reshape(-1, 6)
+    scale = np.max(np.abs(tensor), axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.nan_to_num(np.round(tensor/scale/tensor_step)).astype(np.int64)
+
+# Function to thin a polygon outline (MOVETO, LINETOs, CLOSEPOLY) to about
+# max_vertices evenly spaced vertices; beach() traces outlines finely enough
+# for a full-page ball, far more than a map symbol needs
+def _thin_path(path, max_vertices=180):
+    n = len(path.vertices)
+    codes = path.codes
+    if n <= max_vertices or codes is None or codes[0] != Path.MOVETO or \
+            np.any(codes[1:-1] != Path.LINETO):
+        return Path(path.vertices.copy(), codes)
+    keep = np.unique(np.round(np.linspace(0, n - 1, max_vertices)).astype(np.int64))
+    return Path(path.vertices[keep], codes[keep])
+
+# Function to make the unit glyph of a quantized mechanism with beach(). key
+# is ('dc', strike, dip, rake) or ('mt', *tensor), in units of step. Returns
+# the paths and which of them are the filled (compressional) parts; no paths
+# if beach() cannot draw the mechanism.
+def make_glyph(key, step):
+    fm = [value*step for value in key[1:]]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            collection = beach(fm, xy=(0., 0.), width=2., facecolor='b', bgcolor='w')
+    except Exception:
+        return [], np.zeros(0, dtype=bool)
+    # Filled parts come out blue, the background white
+    fill = to_rgba_array(collection.get_facecolors())[:, 0] < 0.5
+    return [_thin_path(path) for path in collection.get_paths()], fill
+
+# Function to make the glyphs of (key, step) pairs not cached yet, in up to
+# processes worker processes when there are many of them (moment tensor
+# glyphs take beach() over 10 ms each)
+def cache_glyphs(keys_steps, processes=1):
+    missing = list({(key, step) for key, step in keys_steps if (key, step) not in _GLYPHS})
+    if processes > 1 and len(missing) > 100:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            glyphs = pool.map(make_glyph, *zip(*missing), chunksize=50)
+            for (key, step), glyph in zip(missing, glyphs):
+                _GLYPHS[(key, step)] = glyph
+    else:
+        for key, step in missing:
+            _GLYPHS[(key, step)] = make_glyph(key, step)
+
+# Function to draw beachballs at lon/lat with diameters sizes (points). Give
+# nodal planes (strike, dip, rake in degrees) or moment tensors (n, 6); where
+# a tensor row is not finite the nodal plane is used, and events with
+# neither are skipped. facecolors is one color or one per event for the
+# compressional quadrants. New glyphs are made in up to processes worker
+# processes. Returns the collection and the mask of events drawn.
+def plot_beachballs(ax, longitude, latitude, sizes, strike=None, dip=None, rake=None,
+                    tensor=None, facecolors='black', bgcolor='white', edgecolor='black',
+                    linewidth=0.2, angle_step=5., tensor_step=0.05, processes=1,
+                    zorder=10):
+    longitude = np.atleast_1d(np.asarray(longitude, dtype=np.float64))
+    latitude = np.atleast_1d(np.asarray(latitude, dtype=np.float64))
+    n = longitude.size
+    sizes = np.broadcast_to(np.asarray(sizes, dtype=np.float64), (n,))
+    facecolors = to_rgba_array(facecolors)
+    facecolors = np.broadcast_to(facecolors, (n, 4)) if len(facecolors) == 1 else facecolors
+    background = to_rgba(bgcolor)
+
+    keys = [None]*n
+    steps = np.zeros(n)
+    if strike is not None:
+        planes = quantize_planes(strike, dip, rake, angle_step)
+        finite = np.isfinite(np.column_stack([strike, dip, rake]).astype(np.float64)).all(axis=1)
+        for i in np.flatnonzero(finite):
+            keys[i] = ('dc',) + tuple(planes[i])
+            steps[i] = angle_step
+    if tensor is not None:
+        tensors = quantize_tensors(tensor, tensor_step)
+        finite = np.isfinite(np.asarray(tensor, dtype=np.float64).reshape(-1, 6)).all(axis=1)
+        finite &= np.abs(np.asarray(tensor, dtype=np.float64).reshape(-1, 6)).max(axis=1) > 0
+        for i in np.flatnonzero(finite):
+            keys[i] = ('mt',) + tuple(tensors[i])
+            steps[i] = tensor_step
+
+    xy = ax.projection.transform_points(ccrs.PlateCarree(), longitude, latitude)[:, :2]
+    usable = [i for i in range(n) if keys[i] is not None and np.all(np.isfinite(xy[i]))]
+    cache_glyphs([(keys[i], steps[i]) for i in usable], processes)
+    drawn = np.zeros(n, dtype=bool)
+    paths, offsets, colors = [], [], []
+    for i in usable:
+        glyph, fill = _GLYPHS[(keys[i], steps[i])]
+        if not glyph:
+            continue
+        radius = 0.5*sizes[i]
+        for path, filled in zip(glyph, fill):
+            paths.append(Path(path.vertices*radius, path.codes))
+            colors.append(facecolors[i] if filled else background)
+        offsets.extend([xy[i]]*len(glyph))
+        drawn[i] = True
+
+    collection = PathCollection(paths, offsets=np.reshape(offsets, (-1, 2)),
+                                offset_transform=ax.transData,
+                                transform=Affine2D().scale(1/72.) + ax.figure.dpi_scale_trans,
+                                facecolors=np.reshape(colors, (-1, 4)), edgecolors=edgecolor,
+                                linewidths=linewidth, zorder=zorder)
+    ax.add_collection(collection, autolim=False)
+    return collection, drawn
+
+# Function to draw the mechanisms of event arrays read with mechanisms=True
+# (see catalog_arrays.py), sized by magnitude (points) and filled with the
+# depth colors. Returns the collection and the mask of events drawn.
+def plot_event_beachballs(ax, events, min_mag, max_mag, min_size=6., max_size=16.,
+                          depth_list=DEPTH_LIST, depth_color_list=DEPTH_COLOR_LIST,
+                          linewidth=0.2, processes=1, zorder=10):
+    sizes = magnitude_marker_sizes(events['magnitude'], min_mag, max_mag, min_size, max_size)
+    colors = np.asarray(depth_color_list, dtype=np.float64)[
+        depth_class_indices(events['depth_km'], depth_list)]
+    tensor = np.column_stack([events[key] for key in
+                              ('m_rr', 'm_tt', 'm_pp', 'm_rt', 'm_rp', 'm_tp')])
+    return plot_beachballs(ax, events['longitude'], events['latitude'], sizes,
+                           events['strike'], events['dip'], events['rake'], tensor,
+                           facecolors=colors, linewidth=linewidth, processes=processes,
+                           zorder=zorder)
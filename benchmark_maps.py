@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:41:26 2026
+
+@author: chrisyoung
+"""
+# Offline benchmark of the map pipeline on synthetic catalogs and inventories
+# (see synthetic_data.py). Each map style is run for every catalog size and
+# every stage is timed on its own:
+#   fetch     the events (stations) from a local FDSN stand-in serving them,
+#             as the map jobs fetch them: time slices in parallel, parsed
+#   parse     QuakeML (or StationXML) bytes to arrays
+#   extract   valid events (and, regionally, the map box)
+#   classify  depth colors and magnitude marker sizes
+#   project   lon/lat to map coordinates
+#   basemap   cached basemap, rendered cold into a temporary cache (the
+#             basemap rasters and the clipped Natural Earth geometry)
+#   draw      events (paths and labels for stations) and a full canvas draw
+#   savefig   PNG at the output dpi, to memory
+# Styles are the global map (stock image), the regional map (Natural Earth
+# features, Japan) and the great-circle station map. Fetches only go to the
+# stand-in (fdsn_standin.py) on this machine; the regional style is skipped,
+# with the reason, if the Natural Earth data is not available locally.
+# Results go to a JSON file that a later run can compare against.
+#
+#   python benchmark_maps.py --output benchmark.json
+#   python benchmark_maps.py --sizes 1000 10000 --compare benchmark.json
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import numpy as np
+import obspy
+import matplotlib
+import cartopy
+import cartopy.crs as ccrs
+import cartopy.feature as cfeature
+from obspy.clients.fdsn import Client
+
+from basemap_cache import add_cached_basemap, GLOBAL_FEATURES, REGIONAL_FEATURES
+from catalog_arrays import select_events
+from catalog_cache import query_mask
+from catalog_fetch import fetch_events_chunked
+from event_plot import plot_events
+from event_style import classify_events
+from fdsn_standin import start_standin
+from great_circle import great_circle_paths, plot_great_circles
+from map_jobs import new_map_figure, EVENT_COLOR, STATION_COLOR
+from quakeml_stream import read_quakeml_arrays
+from station_arrays import inventory_to_arrays
+from station_labels import plot_station_labels
+from synthetic_data import (synthetic_event_arrays, event_arrays_to_quakeml,
+                            synthetic_inventory, inventory_to_stationxml)
+
+SIZES = (1000, 10000, 100000, 1000000)
+JAPAN_EXTENT = [125., 150., 23., 48.]
+MIN_MAG = 2.5
+MAX_MAG = 7.5
+# Time window of the synthetic catalogs, and the query fetching them
+STARTTIME = '2010-01-01'
+ENDTIME = '2012-01-01'
+EVENT_QUERY = {'catalog': 'ISC', 'starttime': STARTTIME, 'endtime': ENDTIME,
+               'minmagnitude': MIN_MAG, 'maxmagnitude': MAX_MAG}
+STATION_QUERY = {'network': '*', 'station': '*', 'location': '00', 'channel': 'BHZ',
+                 'level': 'channel'}
+
+# Collector of stage timings for one style and size
+class StageTimer:
+    def __init__(self, results, style, size):
+        self.results = results
+        self.style = style
+        self.size = size
+
+    # Function to run func(*args), record its wall time under stage and
+    # return its result
+    def run(self, stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.results.append({'style': self.style, 'size': self.size, 'stage': stage,
+                             'seconds': time.perf_counter() - start})
+        return result
+
+    def skip(self, stage, reason):
+        self.results.append({'style': self.style, 'size': self.size, 'stage': stage,
+                             'seconds': None, 'skipped': reason})
+
+# Function to draw a figure to its canvas
+def _draw(fig):
+    fig.canvas.draw()
+
+# Function to save a figure as PNG into memory
+def _savefig(fig, dpi):
+    out = io.BytesIO()
+    fig.savefig(out, dpi=dpi, format='png')
+    return out.getbuffer().nbytes
+
+# Function to time a seismicity map style (global or regional) for one
+# synthetic catalog. The catalog is fetched from service, the base URL of a
+# stand-in serving it, and quakeml parsed, only when given (large documents
+# are slow to build and serve); the events are then taken from the parse.
+def benchmark_seismicity(timer, events, quakeml, regional, cache_dir, dpi=300,
+                         service=None):
+    if service is not None:
+        query = dict(EVENT_QUERY)
+        if regional:
+            min_lon, max_lon, min_lat, max_lat = JAPAN_EXTENT
+            query.update(minlongitude=min_lon, maxlongitude=max_lon,
+                         minlatitude=min_lat, maxlatitude=max_lat)
+        timer.run('fetch', fetch_events_chunked, service, slice_days=30., **query)
+    else:
+        timer.skip('fetch', 'catalog larger than --max-parse')
+    if quakeml is not None:
+        events = timer.run('parse', read_quakeml_arrays, io.BytesIO(quakeml))
+    else:
+        timer.skip('parse', 'catalog larger than --max-parse')
+    if regional:
+        min_lon, max_lon, min_lat, max_lat = JAPAN_EXTENT
+        mask = timer.run('extract', lambda: events['valid'] & query_mask(
+            events, minlongitude=min_lon, maxlongitude=max_lon,
+            minlatitude=min_lat, maxlatitude=max_lat))
+    else:
+        mask = timer.run('extract', lambda: events['valid'].copy())
+    events = select_events(events, mask)
+    timer.run('classify', classify_events, events['depth_km'], events['magnitude'],
+              MIN_MAG, MAX_MAG)
+
+    fig, ax = new_map_figure({})
+    if regional:
+        ax.set_extent(JAPAN_EXTENT, crs=ccrs.PlateCarree())
+    else:
+        ax.set_global()
+    timer.run('project', ax.projection.transform_points, ccrs.PlateCarree(),
+              events['longitude'], events['latitude'])
+    timer.run('basemap', add_cached_basemap, ax,
+              REGIONAL_FEATURES if regional else GLOBAL_FEATURES, dpi=dpi,
+              cache_dir=cache_dir, geometry_dir=os.path.join(cache_dir, 'geometry'))
+
+    def draw():
+        plot_events(ax, events, MIN_MAG, MAX_MAG, zorder=1 if regional else 10)
+        _draw(fig)
+    timer.run('draw', draw)
+    timer.run('savefig', _savefig, fig, dpi)
+    return events['event_id'].size
+
+# Function to time the great-circle station map for one synthetic inventory
+# with paths from a single event; the inventory is fetched from service, the
+# base URL of a stand-in serving it, when given
+def benchmark_stations(timer, stationxml, cache_dir, dpi=300, service=None):
+    if service is not None:
+        timer.run('fetch', lambda: inventory_to_arrays(
+            Client(service).get_stations(**STATION_QUERY)))
+    inv = timer.run('parse', obspy.read_inventory, io.BytesIO(stationxml), format='STATIONXML')
+    stations = timer.run('extract', inventory_to_arrays, inv)
+    origin = (142.37, 38.30)
+    fig, ax = new_map_figure({})
+    ax.set_global()
+    path_lon, path_lat = timer.run('project', great_circle_paths, origin[0], origin[1],
+                                   stations['longitude'], stations['latitude'])
+    timer.run('basemap', add_cached_basemap, ax, GLOBAL_FEATURES, dpi=dpi,
+              cache_dir=cache_dir, geometry_dir=os.path.join(cache_dir, 'geometry'))
+
+    def draw():
+        ax.plot(origin[0], origin[1], marker='*', markerfacecolor=EVENT_COLOR,
+                markeredgecolor=EVENT_COLOR, transform=ccrs.PlateCarree(), zorder=10)
+        ax.plot(stations['longitude'], stations['latitude'], linestyle='none',
+                marker='^', markersize=2, markerfacecolor=STATION_COLOR,
+                markeredgecolor=STATION_COLOR, transform=ccrs.PlateCarree(), zorder=5)
+        plot_great_circles(ax, path_lon, path_lat, colors='black', linewidths=0.5,
+                           linestyles='--', zorder=6)
+        plot_station_labels(ax, stations['longitude'], stations['latitude'],
+                            stations['station'], fontsize=6, zorder=7)
+        _draw(fig)
+    timer.run('draw', draw)
+    timer.run('savefig', _savefig, fig, dpi)
+    return stations['station'].size
+
+# Function to check that the regional style can run offline: the Natural
+# Earth shapefiles it needs at the Japan extent must already be on disk.
+# Returns None or the reason to skip it.
+def regional_unavailable():
+    from cartopy.io import Downloader
+    downloader = Downloader.from_config(('shapefiles', 'natural_earth'))
+    for name, kwargs in REGIONAL_FEATURES:
+        feature = getattr(cfeature, name)
+        scale = feature.scaler.scale_from_extent(JAPAN_EXTENT) \
+            if isinstance(feature.scaler, cfeature.AdaptiveScaler) else feature.scale
+        spec = {'config': cartopy.config, 'category': feature.category,
+                'name': feature.name, 'resolution': scale}
+        paths = [downloader.pre_downloaded_path(spec), downloader.target_path(spec)]
+        if not any(path is not None and path.exists() for path in paths):
+            return 'Natural Earth %s %s %s not available offline' % (
+                scale, feature.category, feature.name)
+    return None
+
+# Function to describe the environment the benchmark ran in
+def benchmark_meta(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit,
+            'date': obspy.UTCDateTime().isoformat(),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'matplotlib': matplotlib.__version__,
+            'cartopy': cartopy.__version__,
+            'obspy': obspy.__version__,
+            'sizes': list(args.sizes),
+            'stations': args.stations,
+            'dpi': args.dpi,
+            'seed': args.seed}
+
+# Function to run every style over the given catalog sizes; returns the
+# list of stage results
+def run_benchmarks(sizes=SIZES, stations=1000, max_parse=200000, dpi=300, seed=0,
+                   styles=('global', 'regional', 'stations'), log=print):
+    results = []
+    skip_regional = regional_unavailable() if 'regional' in styles else None
+    cache_dir = tempfile.mkdtemp(prefix='benchmark_maps_')
+    try:
+        for size in sizes:
+            events = synthetic_event_arrays(size, STARTTIME, ENDTIME, min_mag=MIN_MAG,
+                                            max_mag=MAX_MAG, seed=seed)
+            quakeml = event_arrays_to_quakeml(events) if size <= max_parse else None
+            server = start_standin(catalogs={'ISC': events}) if quakeml is not None else None
+            try:
+                for style in ('global', 'regional'):
+                    if style not in styles:
+                        continue
+                    timer = StageTimer(results, style, size)
+                    if style == 'regional' and skip_regional:
+                        timer.skip('all', skip_regional)
+                        log('%-9s %8d events  skipped: %s' % (style, size, skip_regional))
+                        continue
+                    # Every size starts from a cold basemap and geometry
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                    service = None if server is None else server.base_url
+                    count = benchmark_seismicity(timer, events, quakeml, style == 'regional',
+                                                 cache_dir, dpi, service)
+                    log('%-9s %8d events  %d drawn' % (style, size, count))
+            finally:
+                if server is not None:
+                    server.shutdown()
+                    server.server_close()
+        if 'stations' in styles:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            timer = StageTimer(results, 'stations', stations)
+            inv = synthetic_inventory(stations, seed=seed)
+            stationxml = inventory_to_stationxml(inv)
+            server = start_standin(inventory=inv)
+            try:
+                count = benchmark_stations(timer, stationxml, cache_dir, dpi, server.base_url)
+            finally:
+                server.shutdown()
+                server.server_close()
+            log('%-9s %8d stations' % ('stations', count))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+# Function to print a results table, with the ratio to a baseline run's
+# time for the same style, size and stage when one is given
+def print_results(results, baseline=None, stream=sys.stdout):
+    previous = {}
+    for row in baseline or []:
+        if row.get('seconds') is not None:
+            previous[(row['style'], row['size'], row['stage'])] = row['seconds']
+    for row in results:
+        if row.get('seconds') is None:
+            continue
+        line = '%-9s %8d  %-9s %9.3f s' % (row['style'], row['size'], row['stage'],
+                                          row['seconds'])
+        key = (row['style'], row['size'], row['stage'])
+        if key in previous and previous[key] > 0:
+            line += '  x%.2f' % (row['seconds']/previous[key])
+        stream.write(line + '\n')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the map pipeline offline.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES),
+                        help='synthetic catalog sizes')
+    parser.add_argument('--stations', type=int, default=1000,
+                        help='stations in the synthetic inventory')
+    parser.add_argument('--styles', nargs='+', default=['global', 'regional', 'stations'],
+                        choices=['global', 'regional', 'stations'])
+    parser.add_argument('--max-parse', type=int, default=200000,
+                        help='largest catalog to build, fetch and parse as QuakeML')
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark.json', help='JSON results file')
+    parser.add_argument('--compare', help='earlier JSON results to compare against')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    results = run_benchmarks(args.sizes, args.stations, args.max_parse, args.dpi,
+                             args.seed, args.styles)
+    with open(args.output, 'w') as f:
+        json.dump({'meta': benchmark_meta(args), 'results': results}, f, indent=1)
+    print_results(results, baseline)
+    print('results written to ' + args.output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+@author: chrisyoung
+"""
+# Turns an obspy Catalog (or a QuakeML file) into flat NumPy arrays that the
+# map scripts can filter and plot without walking the event objects again.
+#
+# Event arrays are a plain dict of equal-length arrays:
+#   event_id   resource id string of the event
+#   time       origin time, POSIX seconds (float64)
+#   longitude  degrees
+#   latitude   degrees
+#   depth_km   km (NaN when missing)
+#   magnitude  preferred magnitude (NaN when missing)
+#   valid      True when the event has both depth and magnitude
+#
+# Focal mechanism columns (MECHANISM_FIELDS) are added when requested:
+#   strike, dip, rake                 nodal plane 1, degrees
+#   m_rr, m_tt, m_pp, m_rt, m_rp, m_tp  moment tensor, N m
+
+import numpy as np
+
+EVENT_FIELDS = ('event_id', 'time', 'longitude', 'latitude', 'depth_km',
+                'magnitude', 'valid')
+MECHANISM_FIELDS = ('strike', 'dip', 'rake',
+                    'm_rr', 'm_tt', 'm_pp', 'm_rt', 'm_rp', 'm_tp')
+
+# Function to pick the preferred item (origin or magnitude) out of a list
+# without going through the global resource id registry
+def _preferred(items, preferred_id):
+    if not items:
+        return None
+    if preferred_id is not None:
+        for item in items:
+            if item.resource_id == preferred_id:
+                return item
+        referred = preferred_id.get_referred_object()
+        if referred is not None:
+            return referred
+    return items[0]
+
+# Function to return an empty set of event arrays
+def empty_event_arrays(mechanisms=False):
+    arrays = {'event_id': np.array([], dtype='U1')}
+    for key in ('time', 'longitude', 'latitude', 'depth_km', 'magnitude'):
+        arrays[key] = np.array([], dtype=np.float64)
+    arrays['valid'] = np.array([], dtype=bool)
+    if mechanisms:
+        for key in MECHANISM_FIELDS:
+            arrays[key] = np.array([], dtype=np.float64)
+    return arrays
+
+# Function to build event arrays from plain per-event lists
+def build_event_arrays(event_id, time, longitude, latitude, depth_km, magnitude):
+    arrays = {'event_id': np.asarray(event_id, dtype=str)}
+    if arrays['event_id'].size == 0:
+        return empty_event_arrays()
+    arrays['time'] = np.asarray(time, dtype=np.float64)
+    arrays['longitude'] = np.asarray(longitude, dtype=np.float64)
+    arrays['latitude'] = np.asarray(latitude, dtype=np.float64)
+    arrays['depth_km'] = np.asarray(depth_km, dtype=np.float64)
+    arrays['magnitude'] = np.asarray(magnitude, dtype=np.float64)
+    arrays['valid'] = (np.isfinite(arrays['depth_km'])
+                       & np.isfinite(arrays['magnitude'])
+                       & np.isfinite(arrays['longitude'])
+                       & np.isfinite(arrays['latitude']))
+    return arrays
+
+# Function to convert an obspy Catalog to event arrays in one pass
+def catalog_to_arrays(cat):
+    nan = float('nan')
+    event_id, time, longitude, latitude, depth_km, magnitude = [], [], [], [], [], []
+    for event in cat:
+        origin = _preferred(event.origins, event.preferred_origin_id)
+        mag = _preferred(event.magnitudes, event.preferred_magnitude_id)
+        event_id.append(str(event.resource_id))
+        if origin is None:
+            time.append(nan)
+            longitude.append(nan)
+            latitude.append(nan)
+            depth_km.append(nan)
+        else:
+            time.append(origin.time.timestamp if origin.time is not None else nan)
+            longitude.append(nan if origin.longitude is None else origin.longitude)
+            latitude.append(nan if origin.latitude is None else origin.latitude)
+            depth_km.append(nan if origin.depth is None else origin.depth/1000.)
+        magnitude.append(nan if (mag is None or mag.mag is None) else mag.mag)
+    return build_event_arrays(event_id, time, longitude, latitude, depth_km, magnitude)
+
+# Function to read a QuakeML file (path, file object or bytes) into event
+# arrays with the streaming parser in quakeml_stream.py
+def read_event_arrays(source, mechanisms=False):
+    from quakeml_stream import read_quakeml_arrays
+    return read_quakeml_arrays(source, mechanisms=mechanisms)
+
+# Function to keep only the events selected by a boolean mask or index array
+def select_events(arrays, selection):
+    return {key: value[selection] for key, value in arrays.items()}
+
+# Function to join several sets of event arrays end to end
+def concat_event_arrays(array_list):
+    nonempty = [arrays for arrays in array_list if arrays['event_id'].size]
+    if not nonempty:
+        return array_list[0] if array_list else empty_event_arrays()
+    return {key: np.concatenate([arrays[key] for arrays in nonempty])
+            for key in nonempty[0]}
+
+# Function to drop repeated event ids (keeping the first copy) and put the
+# events in time order
+def deduplicate_events(arrays):
+    _, first = np.unique(arrays['event_id'], return_index=True)
+    first = np.sort(first)
+    order = first[np.argsort(arrays['time'][first], kind='stable')]
+    return select_events(arrays, order)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:20:06 2026
+
+@author: chrisyoung
+"""
+# On-disk cache of event arrays (see catalog_arrays.py) keyed on the
+# get_events query, so re-rendering a map skips both the FDSN request and the
+# QuakeML parsing. Each query (and the service it went to) is stored as one
+# uncompressed .npz file.
+#
+# refresh_events keeps a growing store per query instead (same query without
+# the end time): each run only asks for events after the last end time it
+# fetched, plus events revised since the last run, and upserts them by id.
+#
+# The cache directory defaults to ~/.cache/seismicity_maps and can be moved
+# with the SEISMICITY_CACHE_DIR environment variable. FDSN_SERVICE, the
+# service the scripts and map jobs fetch from, defaults to IRIS and can be
+# pointed elsewhere (e.g. at fdsn_standin.py) with SEISMICITY_FDSN_SERVICE.
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+import obspy
+from obspy.clients.fdsn import Client
+from obspy.clients.fdsn.header import FDSNNoDataException
+
+from catalog_arrays import (concat_event_arrays, deduplicate_events,
+                            empty_event_arrays, select_events)
+from pipeline_timing import count, span
+from quakeml_stream import read_quakeml_arrays
+
+CACHE_DIR = os.environ.get('SEISMICITY_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache',
+                                        'seismicity_maps'))
+FDSN_SERVICE = os.environ.get('SEISMICITY_FDSN_SERVICE', 'IRIS')
+
+QUERY_FIELDS = ('catalog', 'starttime', 'endtime',
+                'minlatitude', 'maxlatitude', 'minlongitude', 'maxlongitude',
+                'minmagnitude', 'maxmagnitude')
+
+# Function to put a get_events query into a canonical form: times as ISO
+# strings, numbers as floats, unset fields dropped
+def normalize_query(**query):
+    normalized = {}
+    for name, value in query.items():
+        if value is None:
+            continue
+        if name in ('starttime', 'endtime', 'updatedafter'):
+            value = str(obspy.UTCDateTime(value))
+        elif isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+            value = float(value)
+        normalized[name] = value
+    return normalized
+
+# Function to select the events of event arrays that a get_events query
+# (time window, bounding box, magnitude range) would return
+def query_mask(arrays, **query):
+    query = normalize_query(**query)
+    mask = np.ones(arrays['event_id'].size, dtype=bool)
+    if 'starttime' in query:
+        mask &= arrays['time'] >= obspy.UTCDateTime(query['starttime']).timestamp
+    if 'endtime' in query:
+        mask &= arrays['time'] <= obspy.UTCDateTime(query['endtime']).timestamp
+    for name, key, compare in (('minlatitude', 'latitude', np.greater_equal),
+                               ('maxlatitude', 'latitude', np.less_equal),
+                               ('minlongitude', 'longitude', np.greater_equal),
+                               ('maxlongitude', 'longitude', np.less_equal),
+                               ('minmagnitude', 'magnitude', np.greater_equal),
+                               ('maxmagnitude', 'magnitude', np.less_equal)):
+        if name in query:
+            mask &= compare(arrays[key], query[name])
+    return mask
+
+# Function to get what identifies an FDSN service in cache keys: the
+# service name or URL, or a Client's base URL
+def service_id(client):
+    return client if isinstance(client, str) else client.base_url
+
+# Function to hash a normalized query, and the service (name, URL or Client)
+# it is sent to, into a cache file key
+def query_key(query, service=None):
+    spec = {'query': normalize_query(**query)}
+    if service is not None:
+        spec['service'] = service_id(service)
+    text = json.dumps(spec, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+# Function to write event arrays (and an optional metadata dict) to .npz,
+# replacing any old file in one step
+def save_event_arrays(path, arrays, meta=None):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = '%s.%d.tmp.npz' % (path, os.getpid())
+    np.savez(tmp_path, __meta__=np.array(json.dumps(meta or {})), **arrays)
+    os.replace(tmp_path, path)
+
+# Function to read event arrays and their metadata dict back from .npz
+def load_event_arrays(path):
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files if key != '__meta__'}
+        meta = json.loads(str(data['__meta__'])) if '__meta__' in data.files else {}
+    return arrays, meta
+
+# Function to fetch events as arrays, no events is an empty set not an error.
+# client is an obspy FDSN Client or a service name/URL to create one from.
+# The raw QuakeML response is spooled (to disk once it gets large) and read
+# with the streaming parser instead of being turned into a Catalog.
+def fetch_event_arrays(client, mechanisms=False, **query):
+    if isinstance(client, str):
+        client = Client(client)
+    with tempfile.SpooledTemporaryFile(max_size=64*1024*1024) as response:
+        try:
+            with span('get_events'):
+                client.get_events(filename=response, **query)
+        except FDSNNoDataException:
+            return empty_event_arrays(mechanisms)
+        count('quakeml_bytes', response.tell())
+        response.seek(0)
+        with span('parse_quakeml'):
+            arrays = read_quakeml_arrays(response, mechanisms=mechanisms)
+        count('events_parsed', arrays['event_id'].size)
+        return arrays
+
+# Function to get event arrays for a query from the cache, fetching and
+# storing them on a miss (or when refresh is set). Pass the service name
+# rather than a Client to avoid connecting at all on a cache hit. fetch is
+# called as fetch(client, **query) on a miss, e.g.
+# catalog_fetch.fetch_events_chunked for long time windows.
+def cached_get_events(client, cache_dir=CACHE_DIR, refresh=False,
+                      fetch=fetch_event_arrays, **query):
+    query = normalize_query(**query)
+    path = os.path.join(cache_dir, query_key(query, client) + '.npz')
+    if not refresh and os.path.exists(path):
+        with span('cache_load'):
+            arrays, meta = load_event_arrays(path)
+        count('cache_hits')
+        return arrays
+    count('cache_misses')
+    arrays = fetch(client, **query)
+    save_event_arrays(path, arrays, {'query': query})
+    return arrays
+
+# Function to merge new event arrays into old ones; an event id present in
+# both takes the new values
+def upsert_events(old, new):
+    return deduplicate_events(concat_event_arrays([new, old]))
+
+# Function to bring the store for a rolling-window query up to endtime and
+# return the events in starttime..endtime. Only the interval after the last
+# stored end time (less overlap_days, for late additions) is fetched. With
+# track_updates the rest of the stored window is asked for events updated
+# since the last run (updatedafter), so revised locations and magnitudes
+# replace the stored ones.
+def refresh_events(client, starttime, endtime, cache_dir=CACHE_DIR,
+                   overlap_days=1., track_updates=True,
+                   fetch=fetch_event_arrays, **query):
+    starttime = obspy.UTCDateTime(starttime)
+    endtime = obspy.UTCDateTime(endtime)
+    query = normalize_query(**query)
+    path = os.path.join(cache_dir, 'store_' + query_key(query, client) + '.npz')
+    overlap = overlap_days*86400.
+    fetched_at = obspy.UTCDateTime()
+
+    if os.path.exists(path):
+        arrays, meta = load_event_arrays(path)
+        store_start = obspy.UTCDateTime(meta['starttime'])
+        store_end = obspy.UTCDateTime(meta['endtime'])
+        new = []
+        if starttime < store_start:
+            new.append(fetch(client, starttime=starttime, endtime=store_start, **query))
+            store_start = starttime
+        if endtime > store_end - overlap:
+            new_start = max(store_start, store_end - overlap)
+            new.append(fetch(client, starttime=new_start, endtime=endtime, **query))
+            if track_updates and new_start > store_start:
+                updated_after = obspy.UTCDateTime(meta['fetched_at']) - overlap
+                new.append(fetch(client, starttime=store_start, endtime=new_start,
+                                 updatedafter=updated_after, **query))
+            store_end = max(store_end, endtime)
+        if new:
+            arrays = upsert_events(arrays, concat_event_arrays(new))
+    else:
+        arrays = deduplicate_events(fetch(client, starttime=starttime,
+                                          endtime=endtime, **query))
+        store_start, store_end = starttime, endtime
+
+    save_event_arrays(path, arrays, {'query': query,
+                                     'starttime': str(store_start),
+                                     'endtime': str(store_end),
+                                     'fetched_at': str(fetched_at)})
+    in_window = ((arrays['time'] >= starttime.timestamp)
+                 & (arrays['time'] <= endtime.timestamp))
+    return select_events(arrays, in_window)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 12:04:31 2026
+
+@author: chrisyoung
+"""
+# Fetches a long get_events window as many short time slices in parallel,
+# retrying slices that fail and splitting slices refused as too large, then
+# merges the slices into one set of event arrays with the events that appear
+# in two slices removed.
+#
+# client may be an FDSN service name or URL (e.g. 'IRIS', or the URL of a
+# local stand-in server), in which case each worker thread creates its own
+# obspy Client, or an existing Client that all threads share.
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import obspy
+from obspy.clients.fdsn import Client
+from obspy.clients.fdsn.header import FDSNBadRequestException, FDSNRequestTooLargeException
+
+from catalog_arrays import concat_event_arrays, deduplicate_events
+from catalog_cache import fetch_event_arrays
+from pipeline_timing import current_path, in_path
+
+# Function to split starttime..endtime into consecutive slices of at most
+# slice_days; neighbouring slices share their boundary time
+def split_time_window(starttime, endtime, slice_days=30.):
+    starttime = obspy.UTCDateTime(starttime)
+    endtime = obspy.UTCDateTime(endtime)
+    step = slice_days*86400.
+    n_slices = max(1, int(np.ceil((endtime - starttime)/step)))
+    edges = [starttime + i*step for i in range(n_slices)] + [endtime]
+    return list(zip(edges[:-1], edges[1:]))
+
+# Function to fetch one slice, retrying with exponential backoff (a bad
+# request is not retried, it will not get any better); a slice the service
+# refuses as too large is split in two halves of its time window, up to
+# max_splits times deep. Timing spans go under the caller's span path.
+def _fetch_slice(get_client, query, retries, retry_wait, path=(), max_splits=6):
+    for attempt in range(retries + 1):
+        try:
+            with in_path(path):
+                return fetch_event_arrays(get_client(), **query)
+        except FDSNBadRequestException:
+            raise
+        except FDSNRequestTooLargeException:
+            if max_splits == 0:
+                raise
+            starttime = obspy.UTCDateTime(query['starttime'])
+            middle = starttime + (obspy.UTCDateTime(query['endtime']) - starttime)/2.
+            halves = [_fetch_slice(get_client, dict(query, **bounds), retries, retry_wait,
+                                   path, max_splits - 1)
+                      for bounds in ({'endtime': middle}, {'starttime': middle})]
+            return concat_event_arrays(halves)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(retry_wait*2**attempt)
+
+# Function to fetch get_events results over slice_days time slices with at
+# most max_workers requests in flight, merged and de-duplicated
+def fetch_events_chunked(client='IRIS', slice_days=30., max_workers=4, retries=3,
+                         retry_wait=2., client_kwargs=None, **query):
+    if isinstance(client, str):
+        local = threading.local()
+        def get_client():
+            if not hasattr(local, 'client'):
+                local.client = Client(client, **(client_kwargs or {}))
+            return local.client
+    else:
+        def get_client():
+            return client
+
+    slices = split_time_window(query.pop('starttime'), query.pop('endtime'), slice_days)
+    path = current_path()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_fetch_slice, get_client,
+                               dict(query, starttime=t0, endtime=t1),
+                               retries, retry_wait, path)
+                   for t0, t1 in slices]
+        results = [future.result() for future in futures]
+    return deduplicate_events(concat_event_arrays(results))
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 03:14:47 2026
+
+@author: chrisyoung
+"""
+# Local catalog store that answers get_events queries (time window, bounding
+# box, magnitude range) from events already fetched for other queries. There
+# is one store per catalog and service: the events of every query fetched so far,
+# de-duplicated, plus the list of query boxes (time x latitude x longitude x
+# magnitude) they cover. A query inside the covered boxes is a local lookup,
+# e.g. NEIC California inside NEIC CONUS; otherwise only the parts of it no
+# box covers are fetched, e.g. ISC Japan's M2.5-4 and M7-7.5 events when ISC
+# Global (M4-7) is stored, and the store grows by those parts.
+#
+# Lookups go through CatalogIndex: the events in time order (a time window
+# is two binary searches) and a lon/lat grid of cell_deg cells listing each
+# cell's events (a bounding box only looks at the events in its cells);
+# whichever leaves fewer candidates is used, then filtered exactly.
+#
+#   events = indexed_get_events('IRIS', fetch=fetch_events_chunked,
+#                               catalog='NEIC PDE', starttime=..., endtime=...,
+#                               minlatitude=28., maxlatitude=43., ...)
+#
+# Stores are per catalog and service. A covered box is not trusted for the
+# last settle_days before it was fetched (a window still open then is fetched
+# again up to now), nor at all once older than max_age_days if that is given;
+# clear_stores (map_jobs.py --rebuild-index) starts them all over.
+#
+# Queries with other parameters, without a time window, or with a bounding
+# box across the antimeridian go to catalog_cache.cached_get_events instead.
+# The store keeps the plain event arrays, so fetch must not add mechanisms.
+
+import os
+
+import numpy as np
+import obspy
+
+from catalog_arrays import concat_event_arrays, empty_event_arrays, select_events
+from catalog_cache import (CACHE_DIR, QUERY_FIELDS, cached_get_events, fetch_event_arrays,
+                           load_event_arrays, normalize_query, query_key, query_mask,
+                           save_event_arrays, upsert_events)
+from pipeline_timing import count, span
+
+# Box dimensions: query bounds and the range a missing bound stands for
+BOX_DIMENSIONS = (('starttime', 'endtime', -np.inf, np.inf),
+                  ('minlatitude', 'maxlatitude', -90., 90.),
+                  ('minlongitude', 'maxlongitude', -180., 180.),
+                  ('minmagnitude', 'maxmagnitude', -np.inf, np.inf))
+
+# Stores loaded in this process: path -> (file mtime, CatalogStore)
+_STORES = {}
+
+# Index of (de-duplicated) event arrays by time and by lon/lat grid cell
+class CatalogIndex:
+    def __init__(self, arrays, cell_deg=1.):
+        self.arrays = select_events(arrays, np.argsort(arrays['time'], kind='stable'))
+        self.cell_deg = cell_deg
+        self.n_lon = int(np.ceil(360./cell_deg))
+        self.n_lat = int(np.ceil(180./cell_deg))
+        cells = self._cells(self.arrays['longitude'], self.arrays['latitude'])
+        # Events by cell, in time order within each cell; events without a
+        # location go to a last, never searched, cell
+        self.cell_order = np.argsort(cells, kind='stable')
+        self.cell_start = np.searchsorted(cells[self.cell_order],
+                                          np.arange(self.n_lon*self.n_lat + 2))
+
+    # Function to get the grid cell of each lon/lat
+    def _cells(self, longitude, latitude):
+        with np.errstate(invalid='ignore'):
+            col = np.clip((longitude + 180.)//self.cell_deg, 0, self.n_lon - 1)
+            row = np.clip((latitude + 90.)//self.cell_deg, 0, self.n_lat - 1)
+        cells = row*self.n_lon + col
+        return np.where(np.isfinite(cells), cells, self.n_lon*self.n_lat).astype(np.int64)
+
+    # Function to get the positions (in time order) of the events a
+    # normalized get_events query would return
+    def query_indices(self, **query):
+        times = self.arrays['time']
+        i0, i1 = 0, times.size
+        if 'starttime' in query:
+            i0 = np.searchsorted(times, obspy.UTCDateTime(query['starttime']).timestamp, 'left')
+        if 'endtime' in query:
+            i1 = np.searchsorted(times, obspy.UTCDateTime(query['endtime']).timestamp, 'right')
+        candidates = np.arange(i0, max(i0, i1))
+        if any(name in query for name in ('minlatitude', 'maxlatitude',
+                                          'minlongitude', 'maxlongitude')):
+            col0, row0 = self._cell_bounds(query.get('minlongitude', -180.),
+                                           query.get('minlatitude', -90.))
+            col1, row1 = self._cell_bounds(query.get('maxlongitude', 180.),
+                                           query.get('maxlatitude', 90.))
+            # The cells of one grid row within the box are consecutive, so
+            # their events are one range of cell_order
+            rows = np.arange(row0, row1 + 1)*self.n_lon
+            starts, ends = self.cell_start[rows + col0], self.cell_start[rows + col1 + 1]
+            if (ends - starts).sum() < candidates.size:
+                candidates = np.sort(np.concatenate(
+                    [self.cell_order[start:end] for start, end in zip(starts, ends)]
+                    + [np.array([], dtype=np.int64)]))
+        # Only the columns the query filters on (query_mask takes the event
+        # count from event_id)
+        subset = {'event_id': candidates}
+        for key, names in (('time', ('starttime', 'endtime')),
+                           ('latitude', ('minlatitude', 'maxlatitude')),
+                           ('longitude', ('minlongitude', 'maxlongitude')),
+                           ('magnitude', ('minmagnitude', 'maxmagnitude'))):
+            if any(name in query for name in names):
+                subset[key] = self.arrays[key][candidates]
+        return candidates[query_mask(subset, **query)]
+
+    # Function to get the grid column and row of a lon/lat bound
+    def _cell_bounds(self, longitude, latitude):
+        col = int(np.clip((longitude + 180.)//self.cell_deg, 0, self.n_lon - 1))
+        row = int(np.clip((latitude + 90.)//self.cell_deg, 0, self.n_lat - 1))
+        return col, row
+
+    # Function to get the event arrays a get_events query would return
+    def query(self, **query):
+        return select_events(self.arrays, self.query_indices(**normalize_query(**query)))
+
+# Function to turn a normalized query into a box: one (low, high) per
+# BOX_DIMENSIONS, times as POSIX seconds
+def query_box(query):
+    box = []
+    for low_name, high_name, low, high in BOX_DIMENSIONS:
+        low, high = query.get(low_name, low), query.get(high_name, high)
+        if low_name == 'starttime':
+            low, high = obspy.UTCDateTime(low).timestamp, obspy.UTCDateTime(high).timestamp
+        box.append((float(low), float(high)))
+    return tuple(box)
+
+# Function to turn a box back into query fields, leaving out the bounds that
+# are the whole range
+def box_query(box):
+    query = {}
+    for (low_name, high_name, low, high), (box_low, box_high) in zip(BOX_DIMENSIONS, box):
+        if low_name == 'starttime':
+            query.update(starttime=obspy.UTCDateTime(box_low), endtime=obspy.UTCDateTime(box_high))
+            continue
+        if box_low > low:
+            query[low_name] = box_low
+        if box_high < high:
+            query[high_name] = box_high
+    return normalize_query(**query)
+
+# Function to check whether box inner lies inside box outer
+def box_contains(outer, inner):
+    return all(o_low <= i_low and i_high <= o_high
+               for (o_low, o_high), (i_low, i_high) in zip(outer, inner))
+
+# Function to subtract box cut from box; returns the boxes covering the rest
+# (they share their boundaries with cut, which is harmless as fetched events
+# are de-duplicated)
+def box_difference(box, cut):
+    if any(high <= c_low or low >= c_high
+           for (low, high), (c_low, c_high) in zip(box, cut)):
+        return [box]
+    pieces = []
+    box = list(box)
+    for k, ((low, high), (c_low, c_high)) in enumerate(zip(list(box), cut)):
+        if low < c_low:
+            pieces.append(tuple(box[:k] + [(low, c_low)] + box[k + 1:]))
+            low = c_low
+        if high > c_high:
+            pieces.append(tuple(box[:k] + [(c_high, high)] + box[k + 1:]))
+            high = c_high
+        box[k] = (low, high)
+    return pieces
+
+# Function to check that a query can be served from a store
+def indexable(query):
+    return (set(query) <= set(QUERY_FIELDS) and 'starttime' in query and 'endtime' in query
+            and query.get('minlongitude', -180.) <= query.get('maxlongitude', 180.))
+
+# Events of one catalog from one service and the query boxes they cover,
+# each with the time it was fetched, kept in one .npz
+class CatalogStore:
+    def __init__(self, path, cell_deg=1.):
+        self.path = path
+        self.cell_deg = cell_deg
+        self.boxes = []
+        arrays = None
+        if os.path.exists(path):
+            arrays, meta = load_event_arrays(path)
+            self.boxes = [(tuple(map(tuple, entry['box'])), entry['fetched_at'])
+                          for entry in meta['boxes']]
+        if arrays is None:
+            arrays = empty_event_arrays()
+        self.index = CatalogIndex(arrays, cell_deg)
+
+    # Function to get the part of each box still good for answering queries:
+    # none once it is older than max_age_days, and only up to settle_days
+    # before its fetch time (events that recent may still be added or
+    # revised), so an open time window is fetched again
+    def covered_boxes(self, max_age_days=None, settle_days=1.):
+        now = obspy.UTCDateTime().timestamp
+        covered = []
+        for box, fetched_at in self.boxes:
+            if max_age_days is not None and now - fetched_at > max_age_days*86400.:
+                continue
+            (t0, t1), rest = box[0], box[1:]
+            t1 = min(t1, fetched_at - settle_days*86400.)
+            if t1 > t0:
+                covered.append(((t0, t1),) + rest)
+        return covered
+
+    # Function to get the boxes of a normalized query that the store does
+    # not cover yet, as queries
+    def remainder(self, query, max_age_days=None, settle_days=1.):
+        pieces = [query_box(query)]
+        for box in self.covered_boxes(max_age_days, settle_days):
+            pieces = [piece for rest in pieces for piece in box_difference(rest, box)]
+            if not pieces:
+                return []
+        return [dict(box_query(piece), **({'catalog': query['catalog']}
+                                           if 'catalog' in query else {}))
+                for piece in pieces]
+
+    # Function to add the events fetched at fetched_at for pieces (the
+    # remainder queries of a query); the store then covers each piece as of
+    # fetched_at, while the rest of the query keeps the boxes, and fetch
+    # times, it was served from. Refetched events replace the stored ones.
+    def add(self, arrays, pieces, fetched_at):
+        boxes = [query_box(piece) for piece in pieces]
+        self.boxes = [(old, old_fetched_at) for old, old_fetched_at in self.boxes
+                      if not any(box_contains(box, old) for box in boxes)]
+        self.boxes += [(box, fetched_at) for box in boxes]
+        self.index = CatalogIndex(upsert_events(self.index.arrays, arrays), self.cell_deg)
+
+    def save(self):
+        save_event_arrays(self.path, self.index.arrays,
+                          {'boxes': [{'box': list(map(list, box)), 'fetched_at': fetched_at}
+                                     for box, fetched_at in self.boxes]})
+
+    # Function to look a query up in the store
+    def query(self, **query):
+        return self.index.query(**query)
+
+# Function to get the store file of a catalog from a service
+def store_path(service, catalog=None, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, 'index_' + query_key({'catalog': catalog or ''}, service)
+                        + '.npz')
+
+# Function to open the store of a catalog from a service (name, URL or
+# Client), reusing this process's copy if the file has not changed since it
+# was loaded
+def open_store(service, catalog=None, cache_dir=CACHE_DIR, cell_deg=1.):
+    path = store_path(service, catalog, cache_dir)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    if path not in _STORES or _STORES[path][0] != mtime:
+        _STORES[path] = (mtime, CatalogStore(path, cell_deg))
+    return _STORES[path][1]
+
+# Function to save a store and remember it as this process's current copy
+def save_store(store):
+    store.save()
+    _STORES[store.path] = (os.path.getmtime(store.path), store)
+
+# Function to delete every catalog store in cache_dir, so they are built
+# again from fresh fetches
+def clear_stores(cache_dir=CACHE_DIR):
+    _STORES.clear()
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.startswith('index_') and name.endswith('.npz'):
+            os.remove(os.path.join(cache_dir, name))
+
+# Function to get event arrays for a get_events query from the store of the
+# catalog and service, fetching only what the store does not cover (fetch
+# is called as fetch(client, **query) for each uncovered part, see
+# cached_get_events). max_age_days and settle_days: see covered_boxes.
+def indexed_get_events(client, cache_dir=CACHE_DIR, fetch=fetch_event_arrays,
+                       max_age_days=None, settle_days=1., **query):
+    query = normalize_query(**query)
+    if not indexable(query):
+        return cached_get_events(client, cache_dir, fetch=fetch, **query)
+    store = open_store(client, query.get('catalog'), cache_dir)
+    pieces = store.remainder(query, max_age_days, settle_days)
+    if pieces:
+        count('index_misses')
+        count('index_fetches', len(pieces))
+        fetched_at = obspy.UTCDateTime().timestamp
+        fetched = [fetch(client, **piece) for piece in pieces]
+        store.add(concat_event_arrays(fetched), pieces, fetched_at)
+        save_store(store)
+    else:
+        count('index_hits')
+    with span('index_lookup'):
+        return store.query(**query)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:27:40 2026
+
+@author: chrisyoung
+"""
+# Seismicity time-lapse movies from one map. The basemap and legend of a
+# seismicity job are drawn once and saved as the background; each frame then
+# restores that background, points a single event collection at the events of
+# its time window (a slice of the time-sorted arrays, found with searchsorted)
+# and draws only that collection and, over it, the legend (box, symbols and
+# the changing catalog info text) as on the static map. Frames go to ffmpeg
+# as raw RGBA video, or to numbered PNG files.
+#
+#   python event_animation.py atlas.toml ISC_Japan_SeismicityMap --step-days 30 --window-days 365 --output japan.mp4
+#   python event_animation.py atlas.toml ISC_Japan_SeismicityMap --output frames
+
+import os
+import sys
+import shutil
+import argparse
+import subprocess
+
+import numpy as np
+import obspy
+import matplotlib.image as mpimg
+import cartopy.crs as ccrs
+
+from catalog_arrays import select_events
+from event_style import DEPTH_LIST, DEPTH_COLOR_LIST, classify_events
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.webm', '.avi')
+
+# Writer of frames to an ffmpeg process reading raw RGBA video on stdin
+class FFmpegFrameWriter:
+    def __init__(self, path, width, height, fps=10, ffmpeg='ffmpeg'):
+        executable = shutil.which(ffmpeg)
+        if executable is None:
+            raise RuntimeError('ffmpeg not found; write numbered PNG frames instead')
+        self.path = path
+        self.process = subprocess.Popen(
+            [executable, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgba',
+             '-s', '%dx%d' % (width, height), '-r', str(fps), '-i', '-',
+             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE)
+
+    def write(self, rgba):
+        self.process.stdin.write(memoryview(rgba))
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError('ffmpeg failed writing ' + self.path)
+
+# Writer of frames as directory/frame_00000.png, frame_00001.png, ...
+class PNGFrameWriter:
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.count = 0
+
+    def write(self, rgba):
+        mpimg.imsave(os.path.join(self.directory, 'frame_%05d.png' % self.count),
+                     np.asarray(rgba))
+        self.count += 1
+
+    def close(self):
+        pass
+
+# Function to pick the writer for an output path: ffmpeg for video file
+# names, numbered PNGs in a directory otherwise
+def frame_writer(output, width, height, fps=10):
+    if output.lower().endswith(VIDEO_EXTENSIONS):
+        return FFmpegFrameWriter(output, width, height, fps)
+    return PNGFrameWriter(output)
+
+# Function to build sliding frame windows from starttime to endtime: frames
+# start every step_days and each covers window_days (default step_days).
+# Returns frame start and end times as POSIX seconds.
+def frame_windows(starttime, endtime, step_days=30., window_days=None):
+    start = obspy.UTCDateTime(starttime).timestamp
+    end = obspy.UTCDateTime(endtime).timestamp
+    window = 86400.*(step_days if window_days is None else window_days)
+    frame_start = np.arange(start, max(start + 1., end - window + 1.), 86400.*step_days)
+    return frame_start, np.minimum(frame_start + window, end)
+
+# Function to animate events on an already drawn map (basemap, legend). The
+# collection is drawn in the plot_events style at zorder; the map's patches,
+# lines, texts and collections at that zorder or above (the legend) are drawn
+# over it every frame, as the static map draws them after the events.
+# info_texts (optional Text artists) get the lines info(frame_start,
+# frame_end, count) returns each frame. Every frame is passed to writer as an
+# RGBA buffer; returns the number of frames.
+def animate_events(ax, events, frame_start, frame_end, writer, min_mag, max_mag,
+                   min_marker_size=1, max_marker_size=3, depth_list=DEPTH_LIST,
+                   depth_color_list=DEPTH_COLOR_LIST, info_texts=(), info=None,
+                   zorder=10):
+    fig = ax.figure
+    canvas = fig.canvas
+    order = np.argsort(events['time'], kind='stable')
+    time = np.asarray(events['time'])[order]
+    offsets = np.column_stack([np.asarray(events['longitude'])[order],
+                               np.asarray(events['latitude'])[order]])
+    color_index, colors, marker_size = classify_events(
+        np.asarray(events['depth_km'])[order], np.asarray(events['magnitude'])[order],
+        min_mag, max_mag, min_marker_size, max_marker_size, depth_list, depth_color_list)
+    sizes = marker_size**2
+
+    overlay = [artist for artist in ax.get_children()
+               if any(artist is other for other in info_texts)
+               or artist.get_zorder() >= zorder
+               and any(artist in artists for artists in (ax.patches, ax.lines, ax.texts,
+                                                         ax.collections))]
+    # In draw order (the sort is stable, as matplotlib's is)
+    overlay.sort(key=lambda artist: artist.get_zorder())
+    collection = ax.scatter([], [], marker='o', edgecolors='black', linewidths=0.2,
+                            transform=ccrs.PlateCarree(), zorder=zorder, animated=True)
+    for artist in overlay:
+        artist.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    lo = np.searchsorted(time, frame_start, side='left')
+    hi = np.searchsorted(time, frame_end, side='left')
+    for i in range(len(lo)):
+        canvas.restore_region(background)
+        collection.set_offsets(offsets[lo[i]:hi[i]])
+        collection.set_sizes(sizes[lo[i]:hi[i]])
+        collection.set_facecolors(colors[lo[i]:hi[i]])
+        if info is not None:
+            for text, line in zip(info_texts, info(frame_start[i], frame_end[i], hi[i] - lo[i])):
+                text.set_text(line)
+        ax.draw_artist(collection)
+        for artist in overlay:
+            ax.draw_artist(artist)
+        writer.write(canvas.buffer_rgba())
+    return len(lo)
+
+# Function to make a time-lapse of a seismicity job (see map_jobs.py) with
+# frames every step_days covering window_days; returns the number of frames
+def animate_job(job, output, step_days=30., window_days=None, fps=10, memo=None):
+    from map_jobs import (new_map_figure, get_job_events, draw_seismicity_basemap,
+                          draw_seismicity_legend)
+
+    events = get_job_events(job, {} if memo is None else memo)
+    events = select_events(events, events['valid'])
+    fig, ax = new_map_figure(job)
+    fig.set_dpi(job.get('dpi', 300))
+    extent = draw_seismicity_basemap(ax, job)
+    texts = draw_seismicity_legend(ax, job, extent, 0)
+    lines = [text.get_text() for text in texts]
+
+    # Date range and event count change per frame
+    def info(start, end, count):
+        lines[1] = (obspy.UTCDateTime(start).strftime('%Y-%m-%d') + ' to ' +
+                    obspy.UTCDateTime(end).strftime('%Y-%m-%d'))
+        lines[-1] = str(count) + ' events'
+        return lines
+
+    frame_start, frame_end = frame_windows(job['start'], job['end'], step_days, window_days)
+    width, height = fig.canvas.get_width_height()
+    writer = frame_writer(output, width, height, fps)
+    try:
+        return animate_events(ax, events, frame_start, frame_end, writer,
+                              job['min_mag'], job['max_mag'], job.get('min_marker_size', 1),
+                              job.get('max_marker_size', 3), info_texts=texts, info=info,
+                              zorder=1 if 'bbox' in job else 10)
+    finally:
+        writer.close()
+
+def main(argv=None):
+    from map_jobs import load_jobs
+
+    parser = argparse.ArgumentParser(description='Render a time-lapse of a seismicity job.')
+    parser.add_argument('jobfile', help='TOML (or YAML) job file')
+    parser.add_argument('name', help='seismicity job to animate')
+    parser.add_argument('--step-days', type=float, default=30., help='days between frames')
+    parser.add_argument('--window-days', type=float, help='days per frame (default: step)')
+    parser.add_argument('--fps', type=int, default=10)
+    parser.add_argument('--output', default='frames',
+                        help='video file (.mp4, .mkv, ...) or directory for PNG frames')
+    args = parser.parse_args(argv)
+
+    jobs = [job for job in load_jobs(args.jobfile) if job['name'] == args.name]
+    if not jobs:
+        parser.error('no job named ' + args.name)
+    count = animate_job(jobs[0], args.output, args.step_days, args.window_days, args.fps)
+    print('%d frames written to %s' % (count, args.output))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
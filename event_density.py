@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:14:33 2026
+
+@author: chrisyoung
+"""
+# Density maps for catalogs too big to draw as markers. Events are binned in
+# the map's projected coordinates on a regular or hexagonal grid, optionally
+# weighted by magnitude or seismic moment and split by depth class, and the
+# bins are drawn as one image. The image is built by looking up the bin of
+# every image pixel, so drawing cost follows the grid and image size, not the
+# number of events.
+
+import numpy as np
+import cartopy.crs as ccrs
+from matplotlib import colormaps
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import LinearSegmentedColormap, LogNorm
+
+from event_style import DEPTH_LIST, DEPTH_COLOR_LIST, depth_class_indices
+
+# Function to get per-event bin weights: None counts events, 'magnitude' sums
+# magnitudes, 'moment' sums seismic moment in N m (Hanks & Kanamori,
+# M0 = 10**(1.5 M + 9.1), treating the magnitude as Mw)
+def event_weights(magnitude, weight=None):
+    magnitude = np.asarray(magnitude, dtype=np.float64)
+    if weight is None:
+        return np.ones_like(magnitude)
+    if weight == 'magnitude':
+        return magnitude
+    if weight == 'moment':
+        return 10.**(1.5*magnitude + 9.1)
+    raise ValueError("weight must be None, 'magnitude' or 'moment'")
+
+# Function to find the regular grid bin (row-major, shape (ny, nx)) of points
+# x, y inside extent [x0, x1, y0, y1]; returns bin index and inside mask
+def grid_bins(x, y, extent, shape):
+    x0, x1, y0, y1 = extent
+    ny, nx = shape
+    ix = np.floor((x - x0)/(x1 - x0)*nx).astype(np.int64)
+    iy = np.floor((y - y0)/(y1 - y0)*ny).astype(np.int64)
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    return iy*nx + ix, inside
+
+# Function to count the bins of a hexagonal grid with gridsize hexagons
+# across extent: two offset rectangular lattices of centers, spaced so the
+# cells around them are regular hexagons
+def hex_grid_size(extent, gridsize):
+    x0, x1, y0, y1 = extent
+    sy = (x1 - x0)/gridsize*np.sqrt(3.)
+    ny = int(np.ceil((y1 - y0)/sy))
+    return (gridsize + 1)*(ny + 1) + gridsize*ny
+
+# Function to find the hexagonal bin of points x, y inside extent, as the
+# nearer center of the two lattices; returns bin index and inside mask
+def hex_bins(x, y, extent, gridsize):
+    x0, x1, y0, y1 = extent
+    sx = (x1 - x0)/gridsize
+    sy = sx*np.sqrt(3.)
+    ny = int(np.ceil((y1 - y0)/sy))
+    u, v = (x - x0)/sx, (y - y0)/sy
+    ix1, iy1 = np.round(u).astype(np.int64), np.round(v).astype(np.int64)
+    ix2, iy2 = np.floor(u).astype(np.int64), np.floor(v).astype(np.int64)
+    d1 = (u - ix1)**2 + 3.*(v - iy1)**2
+    d2 = (u - ix2 - 0.5)**2 + 3.*(v - iy2 - 0.5)**2
+    first = d1 <= d2
+    index = np.where(first, ix1*(ny + 1) + iy1,
+                     (gridsize + 1)*(ny + 1) + ix2*ny + iy2)
+    inside = (u >= 0) & (u <= gridsize) & (v >= 0) & (v <= (y1 - y0)/sy)
+    inside &= np.where(first, (ix1 <= gridsize) & (iy1 <= ny),
+                       (ix2 < gridsize) & (iy2 < ny))
+    return index, inside
+
+# Function to bin events in projected coordinates. kind is 'grid' (bins is
+# (ny, nx)) or 'hex' (bins is the number of hexagons across). With
+# by_depth the result has one row per depth class, else a single row.
+# Returns the (classes, bins) array of summed weights.
+def bin_events(x, y, weights, extent, kind='grid', bins=(180, 360), depth_class=None,
+               nclass=1):
+    if kind == 'grid':
+        index, inside = grid_bins(x, y, extent, bins)
+        nbins = bins[0]*bins[1]
+    elif kind == 'hex':
+        index, inside = hex_bins(x, y, extent, bins)
+        nbins = hex_grid_size(extent, bins)
+    else:
+        raise ValueError("kind must be 'grid' or 'hex'")
+    index = index[inside]
+    if depth_class is not None:
+        index = np.asarray(depth_class)[inside]*nbins + index
+    values = np.bincount(index, weights=np.asarray(weights, dtype=np.float64)[inside],
+                         minlength=nclass*nbins)
+    return values.reshape(nclass, nbins)
+
+# Function to get the log scale of the bin totals of binned values (None if
+# every bin is empty)
+def density_norm(values):
+    total = values.sum(axis=0)
+    filled = total > 0
+    if not filled.any():
+        return None
+    vmin, vmax = total[filled].min(), total[filled].max()
+    return LogNorm(vmin, vmax if vmax > vmin else vmin*10.)
+
+# Function to color binned values: one colormap on a log scale, or with
+# several depth classes the depth colors mixed by each class's share of the
+# bin and faded by the bin total (log scale). Empty bins are transparent.
+# Returns (bins, 4) RGBA.
+def bin_colors(values, cmap='inferno_r', depth_color_list=DEPTH_COLOR_LIST):
+    total = values.sum(axis=0)
+    filled = total > 0
+    rgba = np.zeros((total.size, 4))
+    norm = density_norm(values)
+    if norm is None:
+        return rgba
+    level = np.asarray(norm(total[filled]), dtype=np.float64)
+    if values.shape[0] == 1:
+        rgba[filled] = colormaps[cmap](level)
+    else:
+        share = values[:, filled]/total[filled]
+        rgba[filled, :3] = share.T @ np.asarray(depth_color_list, dtype=np.float64)
+        rgba[filled, 3] = 0.3 + 0.7*level
+    return rgba
+
+# Function to get a mappable for the color scale of binned values, as
+# bin_colors colors them: the colormap, or with several depth classes the
+# fading by the bin total (black from 0.3 to full opacity), on the log scale
+# of the bin totals. None if every bin is empty.
+def density_mappable(values, cmap='inferno_r'):
+    norm = density_norm(values)
+    if norm is None:
+        return None
+    if values.shape[0] > 1:
+        cmap = LinearSegmentedColormap.from_list('density_fade',
+                                                 [(0., 0., 0., 0.3), (0., 0., 0., 1.)])
+    else:
+        cmap = colormaps[cmap]
+    return ScalarMappable(norm, cmap)
+
+# Function to draw a catalog as a density image on a map. Set the map extent
+# first; the image covers the current extent at dpi (the savefig dpi) and is
+# made by mapping each image pixel center to its bin. weight and kind/bins
+# are as for event_weights and bin_events. Returns the image artist, the
+# binned values and their color scale (see density_mappable, for a colorbar).
+def plot_event_density(ax, events, kind='grid', bins=(180, 360), weight=None,
+                       by_depth=False, cmap='inferno_r', depth_list=DEPTH_LIST,
+                       depth_color_list=DEPTH_COLOR_LIST, dpi=300, zorder=10):
+    ax.apply_aspect()
+    extent = ax.get_extent()
+    xy = ax.projection.transform_points(ccrs.PlateCarree(),
+                                        np.asarray(events['longitude'], dtype=np.float64),
+                                        np.asarray(events['latitude'], dtype=np.float64))
+    depth_class, nclass = None, 1
+    if by_depth:
+        if len(depth_color_list) != len(depth_list) + 1:
+            raise ValueError('depth_color_list needs one more color than depth_list has boundaries')
+        depth_class = depth_class_indices(events['depth_km'], depth_list)
+        nclass = len(depth_color_list)
+    values = bin_events(xy[:, 0], xy[:, 1], event_weights(events['magnitude'], weight),
+                        extent, kind, bins, depth_class, nclass)
+    rgba = bin_colors(values, cmap, depth_color_list)
+
+    # Bin of every image pixel center
+    fig_width, fig_height = ax.figure.get_size_inches()
+    position = ax.get_position()
+    width_px = max(1, int(round(position.width*fig_width*dpi)))
+    height_px = max(1, int(round(position.height*fig_height*dpi)))
+    x0, x1, y0, y1 = extent
+    px, py = np.meshgrid(x0 + (np.arange(width_px) + 0.5)*(x1 - x0)/width_px,
+                         y0 + (np.arange(height_px) + 0.5)*(y1 - y0)/height_px)
+    if kind == 'grid':
+        index, inside = grid_bins(px, py, extent, bins)
+    else:
+        index, inside = hex_bins(px, py, extent, bins)
+    image = np.zeros((height_px, width_px, 4))
+    image[inside] = rgba[index[inside]]
+    artist = ax.imshow(image, extent=extent, transform=ax.projection, origin='lower',
+                       interpolation='nearest', zorder=zorder)
+    ax.set_extent(extent, crs=ax.projection)
+    return artist, values, density_mappable(values, cmap)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:52:19 2026
+
+@author: chrisyoung
+"""
+# Level-of-detail thinning for dense catalogs. Every event is placed on the
+# pixel grid of the saved figure, and within each pixel only the markers
+# that can still be seen are kept, i.e. those no clearly wider later marker
+# (of the same depth class, or of any class) draws over.
+# Dense small-magnitude catalogs then draw far fewer markers for the same
+# picture.
+
+import numpy as np
+import cartopy.crs as ccrs
+
+from event_plot import plot_events
+from event_style import DEPTH_LIST, DEPTH_COLOR_LIST, classify_events
+
+# Function to find, for each marker, the widest marker drawn after it with
+# the same group key (-inf if none). Groups are walked from their last drawn
+# marker back, with sizes offset so the running max restarts in every group.
+def _later_max(group, sizes):
+    order = np.lexsort((-np.arange(group.size), group))
+    start = np.r_[True, group[order][1:] != group[order][:-1]]
+    offset = np.cumsum(start)*(2.*sizes.max() + 4.)
+    running = np.maximum.accumulate(sizes[order] + offset)
+    later = np.empty(group.size)
+    later[order] = np.where(start, -np.inf, np.r_[-np.inf, running[:-1]] - offset)
+    return later
+
+# Function to pick the markers that stay visible, given marker centers x, y
+# and diameters in pixels and the color (depth class) index of each marker,
+# in draw order. A marker is dropped when a later one in the same pixel,
+# whose center may be up to a pixel diagonal away, draws over it: one of the
+# same color wider by at least the pixel diagonal, or any one wider by more
+# than that. Returns the kept indices in draw order.
+def visible_markers(x, y, color_index, sizes):
+    x, y, sizes = (np.asarray(value, dtype=np.float64) for value in (x, y, sizes))
+    color_index = np.asarray(color_index, dtype=np.int64)
+    if x.size == 0:
+        return np.arange(0)
+    ix, iy = np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+    cell = (ix - ix.min())*(iy.max() - iy.min() + 1) + (iy - iy.min())
+    margin = np.sqrt(2.)
+    covered = _later_max(cell*(color_index.max() + 1) + color_index, sizes) >= sizes + margin
+    covered |= _later_max(cell, sizes) > sizes + margin
+    return np.flatnonzero(~covered)
+
+# Function to place events on the pixel grid of ax saved at dpi; returns
+# pixel x, y (NaN outside the projection)
+def event_pixels(ax, longitude, latitude, dpi=300):
+    ax.apply_aspect()
+    xy = ax.projection.transform_points(ccrs.PlateCarree(),
+                                        np.asarray(longitude, dtype=np.float64),
+                                        np.asarray(latitude, dtype=np.float64))[:, :2]
+    points = ax.transData.transform(xy)*dpi/ax.figure.dpi
+    return points[:, 0], points[:, 1]
+
+# Function to thin event arrays for drawing on ax at dpi with the plot_events
+# style, dropping hidden markers and those outside the axes. Set the map
+# extent first. Returns the kept event arrays and
+# the number of events culled.
+def thin_events(ax, events, min_mag, max_mag, min_marker_size=1, max_marker_size=3,
+                depth_list=DEPTH_LIST, depth_color_list=DEPTH_COLOR_LIST, dpi=300):
+    color_index, colors, marker_size = classify_events(
+        events['depth_km'], events['magnitude'], min_mag, max_mag,
+        min_marker_size, max_marker_size, depth_list, depth_color_list)
+    x, y = event_pixels(ax, events['longitude'], events['latitude'], dpi)
+    # Diameter in pixels, with the marker edge
+    sizes = (marker_size + 0.2)*dpi/72.
+    # Only markers that reach into the axes can be seen
+    x0, y0, x1, y1 = ax.bbox.extents*dpi/ax.figure.dpi
+    with np.errstate(invalid='ignore'):
+        finite = np.flatnonzero((x > x0 - sizes) & (x < x1 + sizes) &
+                                (y > y0 - sizes) & (y < y1 + sizes))
+    sizes = sizes[finite]
+    keep = finite[visible_markers(x[finite], y[finite], color_index[finite], sizes)]
+    thinned = {key: value[keep] for key, value in events.items()}
+    return thinned, events['event_id'].size - keep.size
+
+# Function to draw events like plot_events after thinning them for the
+# figure's savefig dpi. Returns the collection and the number culled.
+def plot_events_lod(ax, events, min_mag, max_mag, min_marker_size=1, max_marker_size=3,
+                    depth_list=DEPTH_LIST, depth_color_list=DEPTH_COLOR_LIST, dpi=300,
+                    zorder=10):
+    thinned, culled = thin_events(ax, events, min_mag, max_mag, min_marker_size,
+                                  max_marker_size, depth_list, depth_color_list, dpi)
+    collection = plot_events(ax, thinned, min_mag, max_mag, min_marker_size,
+                             max_marker_size, depth_list, depth_color_list, zorder)
+    return collection, culled
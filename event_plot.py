@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:02:17 2026
+
+@author: chrisyoung
+"""
+# Draws a whole catalog of events as one scatter collection, with symbols
+# scaled by magnitude and colored by depth, plus the catalog/magnitude/depth
+# legends used at the bottom of the seismicity maps.
+
+import numpy as np
+import matplotlib.patches as patches
+import cartopy.crs as ccrs
+
+from event_style import (DEPTH_LIST, DEPTH_COLOR_LIST, classify_events,
+                         depth_legend_entries, magnitude_legend_entries)
+
+TEXTCOLOR = (0/255, 0/255, 0/255)  #black
+PATCH_COLOR = (240/255, 255/255, 244/255)  #honeydew
+
+# Function to plot event arrays (see catalog_arrays.py) as a single collection.
+# Marker sizes follow the scripts' plt.plot markersize (points), so they are
+# squared for scatter, which takes marker area.
+def plot_events(ax, events, min_mag, max_mag, min_marker_size=1, max_marker_size=3,
+                depth_list=DEPTH_LIST, depth_color_list=DEPTH_COLOR_LIST, zorder=10):
+    color_index, colors, marker_size = classify_events(
+        events['depth_km'], events['magnitude'], min_mag, max_mag,
+        min_marker_size, max_marker_size, depth_list, depth_color_list)
+    return ax.scatter(events['longitude'], events['latitude'],
+                      s=marker_size**2, facecolors=colors, marker='o',
+                      edgecolors='black', linewidths=0.2,
+                      transform=ccrs.PlateCarree(), zorder=zorder)
+
+# Function to draw legend symbols as one collection
+def _legend_markers(ax, x, y, marker_size, colors, zorder=10):
+    return ax.scatter(x, y, s=np.asarray(marker_size, dtype=np.float64)**2,
+                      facecolors=colors, marker='o', edgecolors='black',
+                      linewidths=0.2, transform=ccrs.PlateCarree(), zorder=zorder)
+
+# Function to draw the honeydew box the regional maps put their legend on
+def draw_legend_box(ax, extent, height, facecolor=PATCH_COLOR):
+    min_longitude, max_longitude, min_latitude, max_latitude = extent
+    rect = patches.Rectangle((min_longitude, min_latitude), max_longitude-min_longitude,
+                             height, linewidth=1, edgecolor='k', facecolor=facecolor)
+    ax.add_patch(rect)
+    return rect
+
+# Function to write centered catalog info lines; the first line is bold.
+# Returns the Text artists.
+def draw_catalog_info(ax, x, y_top, y_inc, lines, textcolor=TEXTCOLOR,
+                      fontsize=4, zorder=10):
+    return [ax.text(x, y_top - i*y_inc, line, rotation=0.0,
+                    color=textcolor, va="center", ha="center", fontsize=fontsize,
+                    fontweight='bold' if i == 0 else 'normal', zorder=zorder)
+            for i, line in enumerate(lines)]
+
+# Function to draw the magnitude legend: header, then max/mid/min magnitude
+# with symbols of the matching size
+def draw_magnitude_legend(ax, x_left, y_top, y_inc, x_space, min_mag, max_mag,
+                          min_marker_size=1, max_marker_size=3,
+                          color=DEPTH_COLOR_LIST[0], textcolor=TEXTCOLOR,
+                          fontsize=4, zorder=10):
+    ax.text(x_left, y_top, 'magnitude', rotation=0.0,
+            color=textcolor, va="center", ha="left", fontsize=fontsize,
+            fontweight='bold', zorder=zorder)
+    entries = magnitude_legend_entries(min_mag, max_mag, min_marker_size, max_marker_size)
+    y = y_top - y_inc*np.arange(1, len(entries) + 1)
+    for (label, size), y_row in zip(entries, y):
+        ax.text(x_left, y_row, label, rotation=0.0,
+                color=textcolor, va="center", ha="left", fontsize=fontsize, zorder=zorder)
+    return _legend_markers(ax, np.full(len(entries), x_left - x_space), y,
+                           [size for label, size in entries],
+                           [color]*len(entries), zorder)
+
+# Function to draw the depth legend: header, then one row per depth class,
+# rows_per_column rows per column with columns column_shift apart
+def draw_depth_legend(ax, x_left, y_top, y_inc, x_space, column_shift,
+                      marker_size=3, depth_list=DEPTH_LIST,
+                      depth_color_list=DEPTH_COLOR_LIST, rows_per_column=3,
+                      textcolor=TEXTCOLOR, fontsize=4, zorder=10):
+    ax.text(x_left, y_top, 'depth [km]', rotation=0.0,
+            color=textcolor, va="center", ha="left", fontsize=fontsize,
+            fontweight='bold', zorder=zorder)
+    entries = depth_legend_entries(depth_list, depth_color_list)
+    row = np.arange(len(entries))
+    x = x_left + (row // rows_per_column)*column_shift
+    y = y_top - (row % rows_per_column + 1)*y_inc
+    for (label, color), x_row, y_row in zip(entries, x, y):
+        ax.text(x_row, y_row, label, rotation=0.0,
+                color=textcolor, va="center", ha="left", fontsize=fontsize, zorder=zorder)
+    return _legend_markers(ax, x - x_space, y, np.full(len(entries), marker_size),
+                           [color for label, color in entries], zorder)
+
+# Function to draw a density color scale: header, then a horizontal colorbar
+# of mappable (see event_density.density_mappable) from x_left to x_right,
+# a row below it. Returns the Colorbar.
+def draw_density_legend(ax, mappable, x_left, x_right, y_top, y_inc, label,
+                        textcolor=TEXTCOLOR, fontsize=4, zorder=10):
+    ax.text(x_left, y_top, label, rotation=0.0,
+            color=textcolor, va="center", ha="left", fontsize=fontsize,
+            fontweight='bold', zorder=zorder)
+    cax = ax.inset_axes([x_left, y_top - 1.25*y_inc, x_right - x_left, 0.5*y_inc],
+                        transform=ax.transData, zorder=zorder)
+    colorbar = ax.figure.colorbar(mappable, cax=cax, orientation='horizontal')
+    colorbar.ax.tick_params(labelsize=fontsize, length=1, width=0.3, pad=1,
+                            colors=textcolor)
+    colorbar.outline.set_linewidth(0.3)
+    return colorbar
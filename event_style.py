@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:41:55 2026
+
+@author: chrisyoung
+"""
+# Depth classes, depth colors and magnitude-to-marker-size scaling shared by
+# the seismicity maps. Everything works on whole arrays at once, and the
+# legend labels are built from the same depth_list as the classes.
+
+import numpy as np
+
+# Depth class boundaries [km]; an event with depth <= DEPTH_LIST[i] is in
+# class i, deeper than DEPTH_LIST[-1] is the last class
+DEPTH_LIST = [35.,70.,150.,300.,500.]
+DEPTH_COLOR_LIST = [(220/255, 20/255, 60/255),  #crimson
+                    (255/255, 140/255, 0/255),  #dark orange
+                    (255/255, 215/255, 0/255),  #gold
+                    (0/255,128/255, 0/255),     #green
+                    (0/255, 0/255, 255/255),    #blue
+                    (138/255, 43/255, 226/255)] #blue violet
+
+# Function to map depths [km] to depth class (color) indices
+def depth_class_indices(depth_km, depth_list=DEPTH_LIST):
+    return np.searchsorted(np.asarray(depth_list, dtype=np.float64),
+                           np.asarray(depth_km, dtype=np.float64), side='left')
+
+# Function to scale magnitudes linearly onto marker sizes (plt.plot
+# markersize, i.e. diameter in points)
+def magnitude_marker_sizes(magnitude, min_mag, max_mag,
+                           min_marker_size=1, max_marker_size=3):
+    marker_scale_fac = (max_marker_size - min_marker_size)/(max_mag - min_mag)
+    return min_marker_size + (np.asarray(magnitude, dtype=np.float64) - min_mag)*marker_scale_fac
+
+# Function to classify depth and magnitude arrays in one call; returns the
+# color index, the RGB colors and the marker sizes of every event
+def classify_events(depth_km, magnitude, min_mag, max_mag,
+                    min_marker_size=1, max_marker_size=3,
+                    depth_list=DEPTH_LIST, depth_color_list=DEPTH_COLOR_LIST):
+    if len(depth_color_list) != len(depth_list) + 1:
+        raise ValueError('depth_color_list needs one more color than depth_list has boundaries')
+    color_index = depth_class_indices(depth_km, depth_list)
+    colors = np.asarray(depth_color_list, dtype=np.float64)[color_index]
+    marker_size = magnitude_marker_sizes(magnitude, min_mag, max_mag,
+                                         min_marker_size, max_marker_size)
+    return color_index, colors, marker_size
+
+# Function to build (label, color) legend entries for the depth classes
+def depth_legend_entries(depth_list=DEPTH_LIST, depth_color_list=DEPTH_COLOR_LIST):
+    if len(depth_color_list) != len(depth_list) + 1:
+        raise ValueError('depth_color_list needs one more color than depth_list has boundaries')
+    labels = ['0 to ' + str(depth_list[0])]
+    for upper, lower in zip(depth_list[1:], depth_list[:-1]):
+        labels.append(str(lower) + ' to ' + str(upper))
+    labels.append('> ' + str(depth_list[-1]))
+    return list(zip(labels, depth_color_list))
+
+# Function to build (label, marker size) legend entries for the magnitude
+# range, largest first
+def magnitude_legend_entries(min_mag, max_mag, min_marker_size=1, max_marker_size=3):
+    return [(str(max_mag), max_marker_size),
+            (str((min_mag+max_mag)/2.), (min_marker_size+max_marker_size)/2.),
+            (str(min_mag), min_marker_size)]
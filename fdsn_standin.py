@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:12:09 2026
+
+@author: chrisyoung
+"""
+# Local stand-in for an FDSN event and station web service, so the map
+# scripts and jobs can run, be benchmarked and be load-tested without the
+# live service. It answers the fdsnws-event and fdsnws-station query
+# parameters the scripts use (time window, bounding box or radius, depth and
+# magnitude range, catalog, network/station/location/channel, level, plus
+# orderby, limit and offset) from synthetic catalogs and inventories (see
+# synthetic_data.py) or from QuakeML/StationXML files, and serves the WADL,
+# version and catalogs documents an obspy Client reads when it connects.
+#
+# With a latency every response is held back that many seconds, and with
+# max_events a query matching more events than that is refused with 413, as
+# the real services do for oversized requests (so time slicing and retries
+# get exercised). Responses can also be recorded from an upstream service
+# and replayed later byte for byte.
+#
+#   python fdsn_standin.py --synthetic 200000 --stations 500 --port 8080
+#   python fdsn_standin.py --events isc_2010.xml --catalog ISC --inventory iu.xml
+#   python fdsn_standin.py --record responses --upstream IRIS
+#   python fdsn_standin.py --replay responses --latency 0.5 --max-events 20000
+#
+# Point a client at it with its base URL, e.g. Client('http://127.0.0.1:8080')
+# or SEISMICITY_FDSN_SERVICE=http://127.0.0.1:8080 for the scripts and map
+# jobs (the caches are kept apart per service).
+
+import os
+import sys
+import copy
+import json
+import time
+import fnmatch
+import hashlib
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import obspy
+from obspy.clients.fdsn.header import URL_MAPPINGS
+from obspy.core.inventory import Inventory
+from obspy.geodetics import locations2degrees
+
+from catalog_arrays import build_event_arrays, concat_event_arrays, select_events
+from catalog_cache import query_mask
+from quakeml_stream import read_quakeml_arrays
+from synthetic_data import (synthetic_event_arrays, event_arrays_to_quakeml,
+                            synthetic_inventory, inventory_to_stationxml)
+
+# Query parameters served, by service, with their WADL types
+EVENT_PARAMETERS = (('starttime', 'xs:dateTime'), ('endtime', 'xs:dateTime'),
+                    ('minlatitude', 'xs:double'), ('maxlatitude', 'xs:double'),
+                    ('minlongitude', 'xs:double'), ('maxlongitude', 'xs:double'),
+                    ('latitude', 'xs:double'), ('longitude', 'xs:double'),
+                    ('minradius', 'xs:double'), ('maxradius', 'xs:double'),
+                    ('mindepth', 'xs:double'), ('maxdepth', 'xs:double'),
+                    ('minmagnitude', 'xs:double'), ('maxmagnitude', 'xs:double'),
+                    ('includeallorigins', 'xs:boolean'),
+                    ('includeallmagnitudes', 'xs:boolean'),
+                    ('includearrivals', 'xs:boolean'), ('eventid', 'xs:string'),
+                    ('limit', 'xs:int'), ('offset', 'xs:int'), ('orderby', 'xs:string'),
+                    ('catalog', 'xs:string'), ('updatedafter', 'xs:dateTime'),
+                    ('format', 'xs:string'))
+STATION_PARAMETERS = (('starttime', 'xs:dateTime'), ('endtime', 'xs:dateTime'),
+                      ('network', 'xs:string'), ('station', 'xs:string'),
+                      ('location', 'xs:string'), ('channel', 'xs:string'),
+                      ('minlatitude', 'xs:double'), ('maxlatitude', 'xs:double'),
+                      ('minlongitude', 'xs:double'), ('maxlongitude', 'xs:double'),
+                      ('latitude', 'xs:double'), ('longitude', 'xs:double'),
+                      ('minradius', 'xs:double'), ('maxradius', 'xs:double'),
+                      ('level', 'xs:string'), ('includerestricted', 'xs:boolean'),
+                      ('format', 'xs:string'))
+SERVICE_VERSIONS = {'event': '1.2.0', 'station': '1.1.0'}
+ORDERS = ('time', 'time-asc', 'magnitude', 'magnitude-asc')
+LEVELS = ('network', 'station', 'channel', 'response')
+ALIASES = {'start': 'starttime', 'end': 'endtime', 'minlat': 'minlatitude',
+           'maxlat': 'maxlatitude', 'minlon': 'minlongitude', 'maxlon': 'maxlongitude',
+           'lat': 'latitude', 'lon': 'longitude', 'minmag': 'minmagnitude',
+           'maxmag': 'maxmagnitude', 'net': 'network', 'sta': 'station',
+           'loc': 'location', 'cha': 'channel'}
+
+# Catalogs the scripts ask for, and the Tohoku mainshock that the station map
+# with an event looks up, so synthetic data serves every script
+CATALOGS = ('ISC', 'NEIC PDE')
+LANDMARK_EVENTS = (('smi:local/synthetic/tohoku', '2011-03-11T05:46:23.2',
+                    142.37, 38.30, 29., 9.1),)
+
+# Error with the HTTP status to answer it with
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# Function to make synthetic catalogs, one per name with its own seed, each
+# with the landmark events added
+def synthetic_catalogs(n, names=CATALOGS, starttime='2000-01-01', endtime='2025-01-01',
+                       min_mag=2.5, mechanisms=False, seed=0):
+    landmarks = build_event_arrays(*zip(*[(event_id, obspy.UTCDateTime(time).timestamp,
+                                           lon, lat, depth, mag)
+                                          for event_id, time, lon, lat, depth, mag
+                                          in LANDMARK_EVENTS]))
+    catalogs = {}
+    for i, name in enumerate(names):
+        events = synthetic_event_arrays(n, starttime, endtime, min_mag,
+                                        mechanisms=mechanisms, seed=seed + i)
+        if mechanisms:
+            for key in events:
+                landmarks.setdefault(key, np.full(len(LANDMARK_EVENTS), np.nan))
+        catalogs[name] = concat_event_arrays([events, landmarks])
+    return catalogs
+
+# Function to build a service's WADL document, listing the parameters above
+def service_wadl(base_url, service):
+    parameters = EVENT_PARAMETERS if service == 'event' else STATION_PARAMETERS
+    params = ''.join('<param name="%s" style="query" type="%s"/>' % item
+                     for item in parameters)
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<application xmlns="http://wadl.dev.java.net/2009/02" '
+            'xmlns:xs="http://www.w3.org/2001/XMLSchema">'
+            '<resources base="%s/fdsnws/%s/1"><resource path="query">'
+            '<method id="query" name="GET"><request>%s</request>'
+            '<response><representation mediaType="application/xml"/></response>'
+            '</method></resource></resources></application>\n'
+            % (base_url, service, params)).encode('utf-8')
+
+# Function to build the event service's catalogs document
+def catalogs_xml(names):
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<Catalogs>%s</Catalogs>\n'
+            % ''.join('<Catalog>%s</Catalog>' % name for name in names)).encode('utf-8')
+
+# Function to check a request's parameters against a service's list and
+# convert them (short names to long ones): times to UTCDateTime, numbers to float/int, booleans
+def parse_parameters(query, parameters):
+    types = dict(parameters)
+    types['nodata'] = 'xs:int'
+    params = {}
+    for name, values in urllib.parse.parse_qs(query, keep_blank_values=True).items():
+        name = ALIASES.get(name, name)
+        if name not in types:
+            raise RequestError(400, 'Unsupported parameter: ' + name)
+        value = values[-1]
+        try:
+            if types[name] == 'xs:dateTime':
+                value = obspy.UTCDateTime(value)
+            elif types[name] == 'xs:double':
+                value = float(value)
+            elif types[name] == 'xs:int':
+                value = int(value)
+            elif types[name] == 'xs:boolean':
+                value = value.lower() in ('true', '1')
+        except (TypeError, ValueError):
+            raise RequestError(400, 'Bad value for %s: %s' % (name, value))
+        params[name] = value
+    if params.get('format', 'xml') != 'xml':
+        raise RequestError(400, 'Only format=xml is served')
+    return params
+
+# Function to select the events an event query returns from event arrays
+# (time-sorted); loaded is when the data was loaded, the update time of all
+# events for updatedafter. Raises RequestError 413 when more than max_events
+# would be returned.
+def query_events(arrays, params, loaded=0., max_events=None):
+    query = {name: params[name] for name in
+             ('starttime', 'endtime', 'minlatitude', 'maxlatitude', 'minlongitude',
+              'maxlongitude', 'minmagnitude', 'maxmagnitude') if name in params}
+    mask = query_mask(arrays, **query)
+    if 'mindepth' in params:
+        mask &= arrays['depth_km'] >= params['mindepth']
+    if 'maxdepth' in params:
+        mask &= arrays['depth_km'] <= params['maxdepth']
+    if 'latitude' in params or 'longitude' in params:
+        distance = locations2degrees(params.get('latitude', 0.), params.get('longitude', 0.),
+                                     arrays['latitude'], arrays['longitude'])
+        mask &= (distance >= params.get('minradius', 0.)) & \
+            (distance <= params.get('maxradius', 180.))
+    if 'eventid' in params:
+        mask &= np.isin(arrays['event_id'], params['eventid'].split(','))
+    if 'updatedafter' in params and params['updatedafter'].timestamp > loaded:
+        mask[:] = False
+    index = np.flatnonzero(mask)
+
+    order = params.get('orderby', 'time')
+    if order not in ORDERS:
+        raise RequestError(400, 'Bad value for orderby: ' + order)
+    key = arrays['time' if order.startswith('time') else 'magnitude'][index]
+    index = index[np.argsort(key if order.endswith('-asc') else -key, kind='stable')]
+    offset = max(params.get('offset', 1), 1) - 1
+    index = index[offset:offset + params['limit'] if 'limit' in params else None]
+    if max_events is not None and index.size > max_events:
+        raise RequestError(413, 'Request would return %d events, more than the %d allowed'
+                           % (index.size, max_events))
+    return select_events(arrays, index)
+
+# Function to match a code against comma-separated FDSN patterns (* and ?
+# wildcards, -- for an empty location code)
+def _match(code, patterns):
+    if patterns is None:
+        return True
+    return any(fnmatch.fnmatchcase(code, '' if pattern == '--' else pattern)
+               for pattern in patterns.split(','))
+
+# Function to check that an inventory node (station or channel) is in the
+# query's time window, box and radius
+def _node_in_query(node, params):
+    if not node.is_active(starttime=params.get('starttime'), endtime=params.get('endtime')):
+        return False
+    for name, value, compare in (('minlatitude', node.latitude, np.greater_equal),
+                                 ('maxlatitude', node.latitude, np.less_equal),
+                                 ('minlongitude', node.longitude, np.greater_equal),
+                                 ('maxlongitude', node.longitude, np.less_equal)):
+        if name in params and not compare(value, params[name]):
+            return False
+    if 'latitude' in params or 'longitude' in params:
+        distance = locations2degrees(params.get('latitude', 0.), params.get('longitude', 0.),
+                                     node.latitude, node.longitude)
+        if not params.get('minradius', 0.) <= distance <= params.get('maxradius', 180.):
+            return False
+    return True
+
+# Function to select the part of an inventory a station query returns, down
+# to its level (network, station, channel or response); None if nothing
+# matches
+def query_inventory(inv, params):
+    level = params.get('level', 'station')
+    if level not in LEVELS:
+        raise RequestError(400, 'Bad value for level: ' + level)
+    channel_query = 'location' in params or 'channel' in params
+    networks = []
+    for net in inv:
+        if not _match(net.code, params.get('network')):
+            continue
+        stations = []
+        for sta in net:
+            if not _match(sta.code, params.get('station')) or not _node_in_query(sta, params):
+                continue
+            channels = [cha for cha in sta
+                        if _match(cha.location_code, params.get('location')) and
+                        _match(cha.code, params.get('channel')) and
+                        _node_in_query(cha, params)]
+            if channel_query and not channels:
+                continue
+            sta = copy.copy(sta)
+            sta.channels = channels if level in ('channel', 'response') else []
+            if level == 'channel':
+                for i, cha in enumerate(channels):
+                    sta.channels[i] = copy.copy(cha)
+                    sta.channels[i].response = None
+            stations.append(sta)
+        if stations or not (channel_query or 'station' in params):
+            net = copy.copy(net)
+            net.stations = stations if level != 'network' else []
+            networks.append(net)
+    if not networks:
+        return None
+    return Inventory(networks=networks, source='fdsn_standin')
+
+# Function to hash a request (path and sorted query) into a recording key
+def recording_key(path, query):
+    query = sorted(urllib.parse.parse_qsl(query, keep_blank_values=True))
+    text = path + '?' + urllib.parse.urlencode(query)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+# The stand-in server. catalogs maps catalog names to event arrays (the
+# first is the default), inventory is an obspy Inventory. With record_dir
+# every request is forwarded to upstream (a service name or base URL) and its
+# response recorded; with replay_dir only recorded responses are served.
+class FDSNStandin(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 8080), catalogs=None, inventory=None,
+                 latency=0., max_events=None, record_dir=None, upstream=None,
+                 replay_dir=None, verbose=False):
+        super().__init__(address, _StandinHandler)
+        self.catalogs = {name: select_events(arrays, np.argsort(arrays['time'], kind='stable'))
+                         for name, arrays in (catalogs or {}).items()}
+        self.inventory = inventory
+        self.latency = latency
+        self.max_events = max_events
+        self.record_dir = record_dir
+        self.upstream = URL_MAPPINGS.get(upstream.upper(), upstream) if upstream else None
+        self.replay_dir = replay_dir
+        self.verbose = verbose
+        self.loaded = time.time()
+        self.lock = threading.Lock()
+        self.counts = {}
+        if record_dir is not None:
+            if self.upstream is None:
+                raise ValueError('recording needs an upstream service')
+            os.makedirs(record_dir, exist_ok=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    # Function to count a served request by path and status
+    def count(self, path, status):
+        with self.lock:
+            self.counts[(path, status)] = self.counts.get((path, status), 0) + 1
+
+    # Function to answer a request: (status, content type, body)
+    def respond(self, path, query):
+        if self.replay_dir is not None:
+            return self.replay(path, query)
+        if self.record_dir is not None:
+            return self.record(path, query)
+        parts = path.strip('/').split('/')
+        if len(parts) != 4 or parts[0] != 'fdsnws' or parts[1] not in SERVICE_VERSIONS \
+                or parts[2] != '1':
+            raise RequestError(404, 'Not found: ' + path)
+        service, resource = parts[1], parts[3]
+        if service == 'event' and not self.catalogs or \
+                service == 'station' and self.inventory is None:
+            raise RequestError(404, 'No %s data is served' % service)
+        if resource == 'version':
+            return 200, 'text/plain', SERVICE_VERSIONS[service].encode('ascii')
+        if resource == 'application.wadl':
+            return 200, 'application/xml', service_wadl(self.base_url, service)
+        if resource == 'catalogs' and service == 'event':
+            return 200, 'application/xml', catalogs_xml(self.catalogs)
+        if resource == 'contributors' and service == 'event':
+            return 200, 'application/xml', (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                                            b'<Contributors/>\n')
+        if resource != 'query':
+            raise RequestError(404, 'Not found: ' + path)
+
+        if service == 'event':
+            params = parse_parameters(query, EVENT_PARAMETERS)
+            name = params.get('catalog', next(iter(self.catalogs)))
+            if name not in self.catalogs:
+                raise RequestError(400, 'Unknown catalog: ' + name)
+            events = query_events(self.catalogs[name], params, self.loaded, self.max_events)
+            if events['event_id'].size == 0:
+                return params.get('nodata', 204), 'text/plain', b''
+            return 200, 'application/xml', event_arrays_to_quakeml(events)
+        params = parse_parameters(query, STATION_PARAMETERS)
+        inv = query_inventory(self.inventory, params)
+        if inv is None:
+            return params.get('nodata', 204), 'text/plain', b''
+        return 200, 'application/xml', inventory_to_stationxml(inv)
+
+    # Function to forward a request to the upstream service and record the
+    # response (errors and no-data answers included)
+    def record(self, path, query):
+        url = self.upstream.rstrip('/') + path + ('?' + query if query else '')
+        try:
+            with urllib.request.urlopen(url, timeout=600) as response:
+                status, body = response.status, response.read()
+                content_type = response.headers.get('Content-Type', 'application/xml')
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+            content_type = e.headers.get('Content-Type', 'text/plain')
+        if path.endswith('application.wadl'):
+            # Rebase the WADL on the stand-in
+            body = body.replace(self.upstream.rstrip('/').encode('utf-8'),
+                                self.base_url.encode('utf-8'))
+        key = recording_key(path, query)
+        with open(os.path.join(self.record_dir, key + '.body'), 'wb') as f:
+            f.write(body)
+        with open(os.path.join(self.record_dir, key + '.json'), 'w') as f:
+            json.dump({'path': path, 'query': query, 'status': status,
+                       'content_type': content_type}, f)
+        return status, content_type, body
+
+    # Function to serve a recorded response
+    def replay(self, path, query):
+        key = recording_key(path, query)
+        try:
+            with open(os.path.join(self.replay_dir, key + '.json')) as f:
+                meta = json.load(f)
+            with open(os.path.join(self.replay_dir, key + '.body'), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            raise RequestError(404, 'Not recorded: %s?%s' % (path, query))
+        return meta['status'], meta['content_type'], body
+
+# Request handler of the stand-in; GET only
+class _StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urllib.parse.urlsplit(self.path)
+        if server.latency > 0:
+            time.sleep(server.latency)
+        try:
+            status, content_type, body = server.respond(url.path, url.query)
+        except RequestError as e:
+            status, content_type = e.status, 'text/plain'
+            body = ('Error %d: %s\n' % (e.status, e)).encode('utf-8')
+        server.count(url.path, status)
+        self.send_response(status)
+        if status != 204:
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 204:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+# Function to start a stand-in in a background thread; returns the server
+# (server.base_url to connect, server.shutdown() to stop). Port 0 picks a
+# free port.
+def start_standin(host='127.0.0.1', port=0, **kwargs):
+    server = FDSNStandin((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve a local FDSN event/station stand-in.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='synthetic events per catalog')
+    parser.add_argument('--catalogs', nargs='+', default=list(CATALOGS),
+                        help='synthetic catalog names')
+    parser.add_argument('--start', default='2000-01-01', help='synthetic catalog start')
+    parser.add_argument('--end', default='2025-01-01', help='synthetic catalog end')
+    parser.add_argument('--mechanisms', action='store_true',
+                        help='add focal mechanisms to synthetic events')
+    parser.add_argument('--stations', type=int, default=0, help='synthetic stations')
+    parser.add_argument('--events', nargs='+', default=[], help='QuakeML files to serve')
+    parser.add_argument('--catalog', default='ISC', help='catalog name of the QuakeML files')
+    parser.add_argument('--inventory', nargs='+', default=[], help='StationXML files to serve')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0., help='seconds added to every response')
+    parser.add_argument('--max-events', type=int, help='refuse queries returning more events (413)')
+    parser.add_argument('--record', metavar='DIR', help='record upstream responses to DIR')
+    parser.add_argument('--upstream', default='IRIS', help='service name or URL to record from')
+    parser.add_argument('--replay', metavar='DIR', help='serve responses recorded in DIR')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args(argv)
+
+    catalogs = {}
+    if args.synthetic:
+        catalogs.update(synthetic_catalogs(args.synthetic, args.catalogs, args.start, args.end,
+                                           mechanisms=args.mechanisms, seed=args.seed))
+    if args.events:
+        catalogs[args.catalog] = concat_event_arrays(
+            [read_quakeml_arrays(path, mechanisms=args.mechanisms) for path in args.events])
+    inventory = None
+    if args.stations:
+        inventory = synthetic_inventory(args.stations, seed=args.seed)
+    for path in args.inventory:
+        inv = obspy.read_inventory(path)
+        inventory = inv if inventory is None else inventory + inv
+    if not (catalogs or inventory or args.record or args.replay):
+        parser.error('nothing to serve: give --synthetic, --stations, --events, '
+                     '--inventory, --record or --replay')
+
+    server = FDSNStandin((args.host, args.port), catalogs, inventory, args.latency,
+                         args.max_events, args.record, args.upstream if args.record else None,
+                         args.replay, args.verbose)
+    print('FDSN stand-in at ' + server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
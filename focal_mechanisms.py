@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:46:15 2026
+
+@author: chrisyoung
+"""
+# Focal mechanisms and moment tensors for a region and time window, as event
+# arrays with the MECHANISM_FIELDS columns (see catalog_arrays.py). They come
+# from an FDSN event service (all origins, QuakeML read by the streaming
+# parser) or from local QuakeML or GCMT NDK files, and are cached per query
+# in the same .npz format as the origin catalogs, one row per event id, so
+# beachball maps re-read a few kB of arrays instead of the XML.
+#
+#   events = cached_get_mechanisms('USGS', starttime=..., endtime=..., minlatitude=...)
+#   events = cached_get_mechanisms(['jan76_dec20.ndk'], starttime=..., ...)
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from catalog_arrays import (MECHANISM_FIELDS, build_event_arrays, concat_event_arrays,
+                            deduplicate_events, select_events)
+from catalog_cache import (CACHE_DIR, fetch_event_arrays, load_event_arrays,
+                           normalize_query, query_mask, save_event_arrays)
+from quakeml_stream import read_quakeml_arrays
+
+# Function to read a GCMT NDK file (five lines per event) into event arrays
+# with mechanisms. Location, depth and time are the centroid's, magnitude is
+# Mw from the scalar moment, tensors are converted from dyne cm to N m and
+# the event id is the CMT event name.
+def read_ndk_arrays(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            lines = f.read().splitlines()
+    else:
+        lines = source.read().splitlines()
+    lines = [line for line in lines if line.strip()]
+    if len(lines) % 5:
+        raise ValueError('NDK data must have five lines per event')
+    names, times, longitude, latitude, depth, magnitude = [], [], [], [], [], []
+    mechanism = []
+    for i in range(0, len(lines), 5):
+        hypocenter, name, centroid, tensor, planes = lines[i:i + 5]
+        date, time = hypocenter[4:].split()[:2]
+        day = np.datetime64(date.replace('/', '-'), 's')
+        hour, minute, second = time.split(':')
+        centroid = centroid.split()
+        times.append(day.astype(np.int64) + 3600.*int(hour) + 60.*int(minute) +
+                     float(second) + float(centroid[1]))
+        latitude.append(float(centroid[3]))
+        longitude.append(float(centroid[5]))
+        depth.append(float(centroid[7]))
+        names.append(name.split()[0])
+        tensor = tensor.split()
+        scale = 10.**int(tensor[0])
+        planes = planes.split()
+        moment = float(planes[10])*scale
+        magnitude.append(2./3.*(np.log10(moment) - 16.1))
+        # dyne cm to N m
+        mechanism.append([float(value) for value in planes[11:14]] +
+                         [float(value)*scale*1e-7 for value in tensor[1:12:2]])
+    arrays = build_event_arrays(names, times, longitude, latitude, depth, magnitude)
+    mechanism = np.asarray(mechanism, dtype=np.float64).reshape(-1, len(MECHANISM_FIELDS))
+    for j, key in enumerate(MECHANISM_FIELDS):
+        arrays[key] = mechanism[:, j]
+    return arrays
+
+# Function to read a local mechanism file: .ndk as GCMT NDK, anything else
+# as QuakeML
+def read_mechanism_file(path):
+    if str(path).lower().endswith('.ndk'):
+        return read_ndk_arrays(path)
+    return read_quakeml_arrays(path, mechanisms=True)
+
+# Function to mark events that have a nodal plane or a moment tensor
+def has_mechanism(arrays):
+    plane = np.isfinite(np.column_stack([arrays[key] for key in ('strike', 'dip', 'rake')]))
+    tensor = np.isfinite(np.column_stack([arrays[key] for key in MECHANISM_FIELDS[3:]]))
+    return plane.all(axis=1) | tensor.all(axis=1)
+
+# Function to fetch the events with mechanisms for a query from an FDSN
+# event service. All origins are asked for, since mechanisms usually hang
+# off a centroid origin rather than the preferred one; extra keyword
+# arguments (e.g. service-specific mechanism options) go to get_events.
+def fetch_mechanism_arrays(client, includeallorigins=True, **query):
+    arrays = fetch_event_arrays(client, mechanisms=True,
+                                includeallorigins=includeallorigins, **query)
+    return select_events(arrays, has_mechanism(arrays))
+
+# Function to read the events with mechanisms matching a query from local
+# QuakeML/NDK files
+def read_mechanism_files(paths, **query):
+    arrays = deduplicate_events(concat_event_arrays([read_mechanism_file(path)
+                                                     for path in paths]))
+    return select_events(arrays, has_mechanism(arrays) & query_mask(arrays, **query))
+
+# Function to get mechanism event arrays for a query from the cache, reading
+# them on a miss (or with refresh). source is an FDSN Client or service name,
+# or a list of local QuakeML/NDK files; for files the cache key includes
+# their size and modification time, so edited files are read again.
+def cached_get_mechanisms(source, cache_dir=CACHE_DIR, refresh=False, **query):
+    query = normalize_query(**query)
+    if isinstance(source, (list, tuple)):
+        origin = [[os.path.abspath(path), os.path.getsize(path), os.path.getmtime(path)]
+                  for path in source]
+    else:
+        origin = source if isinstance(source, str) else source.base_url
+    spec = json.dumps({'source': origin, 'query': query}, sort_keys=True)
+    key = hashlib.sha1(spec.encode('utf-8')).hexdigest()
+    path = os.path.join(cache_dir, 'mechanisms_' + key + '.npz')
+    if not refresh and os.path.exists(path):
+        arrays, meta = load_event_arrays(path)
+        return arrays
+    if isinstance(source, (list, tuple)):
+        arrays = read_mechanism_files(source, **query)
+    else:
+        arrays = deduplicate_events(fetch_mechanism_arrays(source, **query))
+    save_event_arrays(path, arrays, {'source': origin, 'query': query})
+    return arrays
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:26:13 2026
+
+@author: chrisyoung
+"""
+# Natural Earth features clipped and simplified to one map extent and stored
+# as flat coordinate arrays (shapely ragged arrays in an .npz), so regional
+# maps load a few kB of coordinates instead of re-reading and re-clipping the
+# full shapefiles on every run.
+
+import os
+import json
+import hashlib
+
+import numpy as np
+import shapely
+import cartopy.crs as ccrs
+import cartopy.feature as cfeature
+
+from catalog_cache import CACHE_DIR
+
+GEOMETRY_DIR = os.path.join(CACHE_DIR, 'geometry')
+
+# Function to clip a feature's geometries to extent (lon/lat) and simplify
+# them with tolerance (degrees). Multi-part and mixed results are split into
+# single polygons, or single lines for line features.
+def clip_feature_geometries(feature, extent, tolerance):
+    min_lon, max_lon, min_lat, max_lat = extent
+    geoms = np.array(list(feature.intersecting_geometries(extent)), dtype=object)
+    if geoms.size == 0:
+        return geoms
+    clipped = shapely.clip_by_rect(geoms, min_lon, min_lat, max_lon, max_lat)
+    clipped = shapely.simplify(clipped, tolerance, preserve_topology=True)
+    parts = shapely.get_parts(clipped[~shapely.is_empty(clipped)])
+    types = shapely.get_type_id(parts)
+    polygons = parts[types == shapely.GeometryType.POLYGON]
+    if polygons.size:
+        return polygons
+    lines = parts[types == shapely.GeometryType.LINESTRING]
+    rings = [shapely.LineString(ring.coords)
+             for ring in parts[types == shapely.GeometryType.LINEARRING]]
+    return np.concatenate([lines, np.array(rings, dtype=object)])
+
+# Function to save single polygons or lines as ragged coordinate arrays
+def save_geometries(path, geoms):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = '%s.%d.tmp.npz' % (path, os.getpid())
+    if len(geoms) == 0:
+        np.savez(tmp_path, geom_type=np.array(-1))
+    else:
+        geom_type, coords, offsets = shapely.to_ragged_array(geoms)
+        np.savez(tmp_path, geom_type=np.array(int(geom_type)), coords=coords,
+                 **{'offsets_%d' % i: offset for i, offset in enumerate(offsets)})
+    os.replace(tmp_path, path)
+
+# Function to load geometries saved by save_geometries
+def load_geometries(path):
+    with np.load(path, allow_pickle=False) as data:
+        geom_type = int(data['geom_type'])
+        if geom_type < 0:
+            return np.array([], dtype=object)
+        offsets = tuple(data['offsets_%d' % i]
+                        for i in range(len(data.files) - 2))
+        return shapely.from_ragged_array(shapely.GeometryType(geom_type),
+                                         data['coords'], offsets)
+
+# Function to return a cartopy feature (by cartopy.feature attribute name,
+# e.g. 'COASTLINE') clipped to extent [min_lon, max_lon, min_lat, max_lat].
+# The clipped coordinates are stored per (feature, scale, extent, tolerance);
+# tolerance defaults to 1/2000 of the extent width, about a pixel of a 300 dpi
+# map. Drawing style is taken from the original feature, then **kwargs.
+def clipped_feature(name, extent, scale=None, tolerance=None,
+                    cache_dir=GEOMETRY_DIR, **kwargs):
+    feature = getattr(cfeature, name)
+    if scale is not None:
+        feature = feature.with_scale(scale)
+    elif isinstance(feature.scaler, cfeature.AdaptiveScaler):
+        scale = feature.scaler.scale_from_extent(extent)
+        feature = feature.with_scale(scale)
+    else:
+        scale = feature.scale
+    if tolerance is None:
+        tolerance = (extent[1] - extent[0])/2000.
+    spec = {'name': name, 'scale': scale, 'tolerance': float(tolerance),
+            'extent': [round(float(value), 6) for value in extent]}
+    key = hashlib.sha1(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+    path = os.path.join(cache_dir, name.lower() + '_' + key + '.npz')
+    if os.path.exists(path):
+        geoms = load_geometries(path)
+    else:
+        geoms = clip_feature_geometries(feature, extent, tolerance)
+        save_geometries(path, geoms)
+    style = dict(feature.kwargs)
+    style.update(kwargs)
+    return cfeature.ShapelyFeature(list(geoms), ccrs.PlateCarree(), **style)
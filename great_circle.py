@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:02:44 2026
+
+@author: chrisyoung
+"""
+# Great-circle paths between sources and receivers computed for all pairs at
+# once (spherical interpolation of unit vectors), split where they cross the
+# antimeridian and drawn as a single LineCollection.
+
+import numpy as np
+import cartopy.crs as ccrs
+from matplotlib.collections import LineCollection
+
+# Function to convert lon/lat [deg] to unit vectors on the sphere
+def _unit_vectors(lon, lat):
+    lon = np.radians(lon)
+    lat = np.radians(lat)
+    return np.stack([np.cos(lat)*np.cos(lon), np.cos(lat)*np.sin(lon), np.sin(lat)], axis=-1)
+
+# Function to sample npts points along the great circle from every source to
+# every matching receiver. Sources and receivers broadcast against each other,
+# so one source and many receivers (or the reverse) works. Returns lon and
+# lat arrays of shape (n_paths, npts) in degrees.
+def great_circle_paths(src_lon, src_lat, rcv_lon, rcv_lat, npts=100):
+    src_lon, src_lat, rcv_lon, rcv_lat = np.broadcast_arrays(
+        np.atleast_1d(src_lon), np.atleast_1d(src_lat),
+        np.atleast_1d(rcv_lon), np.atleast_1d(rcv_lat))
+    a = _unit_vectors(src_lon, src_lat)
+    b = _unit_vectors(rcv_lon, rcv_lat)
+    omega = np.arccos(np.clip(np.sum(a*b, axis=-1), -1., 1.))[:, None]
+
+    # Direction of travel at the source, perpendicular to a. For (nearly)
+    # antipodal pairs the path is not unique; go through the north (or, for
+    # polar sources, the 0 deg meridian) plane.
+    c = b - a*np.sum(a*b, axis=-1, keepdims=True)
+    norm = np.linalg.norm(c, axis=-1, keepdims=True)
+    degenerate = norm[:, 0] < 1e-12
+    if degenerate.any():
+        ref = np.where(np.abs(a[degenerate, 2:3]) > 0.99, [[1., 0., 0.]], [[0., 0., 1.]])
+        c_ref = ref - a[degenerate]*np.sum(a[degenerate]*ref, axis=-1, keepdims=True)
+        c[degenerate] = c_ref
+        norm[degenerate] = np.linalg.norm(c_ref, axis=-1, keepdims=True)
+    c = c/norm
+
+    angle = omega*np.linspace(0., 1., npts)[None, :]
+    points = (np.cos(angle)[..., None]*a[:, None, :]
+              + np.sin(angle)[..., None]*c[:, None, :])
+    lon = np.degrees(np.arctan2(points[..., 1], points[..., 0]))
+    lat = np.degrees(np.arcsin(np.clip(points[..., 2], -1., 1.)))
+    return lon, lat
+
+# Function to split paths where they jump across the antimeridian. Returns a
+# list of (k, 2) lon/lat segments; each piece is closed off at +-180 deg.
+def split_at_antimeridian(lon, lat):
+    lon = np.atleast_2d(lon)
+    lat = np.atleast_2d(lat)
+    jump = np.abs(np.diff(lon, axis=1)) > 180.
+    segments = []
+    for path_lon, path_lat, path_jump in zip(lon, lat, jump):
+        cuts = np.nonzero(path_jump)[0]
+        if cuts.size == 0:
+            segments.append(np.column_stack([path_lon, path_lat]))
+            continue
+        path_lon = path_lon.copy()
+        path_lat = path_lat.copy()
+        start = 0
+        for i in cuts:
+            # Latitude where the segment i..i+1 crosses the antimeridian
+            edge = 180. if path_lon[i] > 0 else -180.
+            next_lon = path_lon[i + 1] + (360. if edge > 0 else -360.)
+            frac = (edge - path_lon[i])/(next_lon - path_lon[i])
+            lat_edge = path_lat[i] + frac*(path_lat[i + 1] - path_lat[i])
+            segments.append(np.vstack([np.column_stack([path_lon[start:i + 1],
+                                                        path_lat[start:i + 1]]),
+                                       [[edge, lat_edge]]]))
+            # Next piece starts at the same crossing on the other side
+            path_lon[i] = -edge
+            path_lat[i] = lat_edge
+            start = i
+        segments.append(np.column_stack([path_lon[start:], path_lat[start:]]))
+    return segments
+
+# Function to draw sampled paths (from great_circle_paths) as one LineCollection
+def plot_great_circles(ax, lon, lat, **kwargs):
+    collection = LineCollection(split_at_antimeridian(lon, lat),
+                                transform=ccrs.PlateCarree(), **kwargs)
+    ax.add_collection(collection)
+    return collection
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:10:27 2026
+
+@author: chrisyoung
+"""
+# Config-driven map runner. A job file (TOML, or YAML if PyYAML is installed)
+# lists one [[job]] per map; every job goes through the same fetch -> plot ->
+# legend -> save pipeline the individual scripts use, and catalogs and
+# inventories fetched for one job are reused by later jobs in the same run.
+#
+#   python map_jobs.py atlas.toml
+#   python map_jobs.py atlas.toml --only ISC_Japan_SeismicityMap --outdir maps
+#   python map_jobs.py atlas.toml --processes 32
+#   python map_jobs.py atlas.toml --async-fetch --per-host 4
+#   python map_jobs.py atlas.toml --timings timings.json --trace-memory --profile-dir profiles
+#
+# Maps are drawn on explicit Agg figures (no pyplot), so the runner works
+# headless. With --processes the catalogs and inventories are fetched once in
+# the parent, copied into shared memory, and the maps are rendered by a pool
+# of worker processes that map those arrays instead of unpickling them.
+# With --async-fetch every job's queries are in flight at once (see
+# async_fetch.py), event queries still served from the local catalog store
+# where it covers them, and each map is rendered as soon as its own data is
+# in.
+# With --timings every stage of every job (fetch, basemap, plot, legend,
+# savefig, ...) is timed and counted (see pipeline_timing.py).
+#
+# Job keys (anything in a [defaults] table applies to every job):
+#   kind         'seismicity' (default) or 'stations'
+#   name         job name, also the default output file name
+#   output       output PNG file
+#   service      FDSN service name or URL (default $SEISMICITY_FDSN_SERVICE or 'IRIS')
+#   dpi          savefig dpi (default 300)
+#   figsize      [width, height] in inches (default matplotlib's figure.figsize)
+# seismicity jobs:
+#   catalog, start, end, min_mag, max_mag, title
+#                (end = "now" for the time of the run)
+#   refresh      true to keep a growing store of the catalog query and only
+#                fetch events after the last run, plus those updated since
+#                (updatedafter), see catalog_cache.refresh_events
+#   bbox         [min_lon, max_lon, min_lat, max_lat]; global map if missing
+#   slice_days   fetch the window as parallel time slices of this length
+#   min_marker_size, max_marker_size
+#   lod          true to skip markers hidden under later ones at the output dpi
+#   density      'grid' or 'hex' to draw binned event density instead of markers,
+#                with its color scale in place of the magnitude legend
+#   density_bins [ny, nx] grid bins, or hexagons across (default [180, 360] / 100)
+#   density_weight    'magnitude' or 'moment' (default: event counts)
+#   density_by_depth  mix the depth colors by each depth class's share
+#   [job.legend] y_top, y_inc, x_space, info_x, info_y, info_mag_range,
+#                mag_x, depth_x, depth_column_shift, box_height
+#                (y_top is above the bottom of the map, info_x from its
+#                center, mag_x back from its right edge, depth_x from its
+#                left edge, info_y from y_top)
+# stations jobs:
+#   network, station, location, channel
+#   event_time, event_min_mag   optional event to draw paths from
+
+import os
+import sys
+import asyncio
+import argparse
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import obspy
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import cartopy.crs as ccrs
+from obspy.clients.fdsn import Client
+
+from async_fetch import (AsyncFDSNFetcher, cached_get_event_arrays,
+                         indexed_get_event_arrays)
+from basemap_cache import add_cached_basemap, GLOBAL_FEATURES, REGIONAL_FEATURES
+from catalog_arrays import select_events
+from catalog_cache import (FDSN_SERVICE, cached_get_events, fetch_event_arrays,
+                           normalize_query, query_key, refresh_events)
+from catalog_fetch import fetch_events_chunked
+from catalog_index import clear_stores, indexed_get_events
+from event_density import plot_event_density
+from event_lod import plot_events_lod
+from event_plot import (plot_events, draw_catalog_info, draw_magnitude_legend,
+                        draw_depth_legend, draw_density_legend, draw_legend_box)
+from pipeline_timing import (active_recorder, count, in_path, span, span_at,
+                             start_recording, stop_recording)
+from shared_arrays import share_arrays, attach_arrays, release_arrays
+from great_circle import great_circle_paths, plot_great_circles
+from station_arrays import inventory_to_arrays
+from station_labels import plot_station_labels
+
+GLOBAL_EXTENT = [-180., 180., -90., 90.]
+EVENT_COLOR = (220/255, 20/255, 60/255)   #crimson
+STATION_COLOR = (255/255, 140/255, 0/255)   #dark orange
+# Density scale headers by density_weight
+DENSITY_LABELS = {None: 'events per bin', 'magnitude': 'magnitude sum',
+                  'moment': 'moment [N m]'}
+
+# Function to read a job file; returns the list of jobs with defaults applied
+def load_jobs(path):
+    if path.endswith(('.yaml', '.yml')):
+        import yaml
+        with open(path) as f:
+            spec = yaml.safe_load(f)
+    else:
+        try:
+            import tomllib
+        except ImportError:   # Python < 3.11
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    defaults = spec.get('defaults', {})
+    jobs = []
+    for job in spec.get('job', []):
+        merged = dict(defaults)
+        merged.update(job)
+        merged['legend'] = dict(defaults.get('legend', {}), **job.get('legend', {}))
+        if 'name' not in merged:
+            raise ValueError('every job needs a name')
+        if merged.get('end') == 'now':
+            merged['end'] = obspy.UTCDateTime().strftime('%Y-%m-%dT%H:%M:%S')
+        jobs.append(merged)
+    return jobs
+
+# Function to build the get_events query of a seismicity job
+def job_query(job):
+    query = {'catalog': job.get('catalog'),
+             'starttime': job['start'], 'endtime': job['end'],
+             'minmagnitude': job['min_mag'], 'maxmagnitude': job['max_mag']}
+    if 'bbox' in job:
+        min_lon, max_lon, min_lat, max_lat = job['bbox']
+        query.update(minlongitude=min_lon, maxlongitude=max_lon,
+                     minlatitude=min_lat, maxlatitude=max_lat)
+    return normalize_query(**query)
+
+# Function to build the get_stations query of a stations job
+def job_station_query(job):
+    return dict(network=job.get('network', 'IU'), station=job.get('station', '*'),
+                location=job.get('location', '00'), channel=job.get('channel', 'BHZ'),
+                level='channel')
+
+# Function to build the get_events query for a stations job's event origin
+def job_origin_query(job):
+    event_time = obspy.UTCDateTime(job['event_time'])
+    return normalize_query(starttime=event_time - 10, endtime=event_time + 10,
+                           minmagnitude=job.get('event_min_mag', 9))
+
+# Function to get a seismicity job's events, from the run's memo if an earlier
+# job asked for the same query, else from the local catalog store (fetching
+# only what it does not cover yet), or for refresh jobs from the growing
+# store of the query
+def get_job_events(job, memo):
+    query = job_query(job)
+    service = job.get('service', FDSN_SERVICE)
+    key = ('events', service, query_key(query), bool(job.get('refresh')))
+    if key not in memo:
+        fetch = fetch_event_arrays
+        if job.get('slice_days'):
+            fetch = functools.partial(fetch_events_chunked, slice_days=job['slice_days'])
+        if job.get('refresh'):
+            query = dict(query)
+            starttime, endtime = query.pop('starttime'), query.pop('endtime')
+            memo[key] = refresh_events(service, starttime, endtime, fetch=fetch, **query)
+        else:
+            memo[key] = indexed_get_events(service, fetch=fetch, **query)
+    return memo[key]
+
+# Function to get a stations job's station arrays (and event origin, if any),
+# memoized per query for the run
+def get_job_stations(job, memo):
+    service = job.get('service', FDSN_SERVICE)
+    query = job_station_query(job)
+    key = ('stations', service, tuple(sorted(query.items())))
+    if key not in memo:
+        if ('client', service) not in memo:
+            memo[('client', service)] = Client(service)
+        client = memo[('client', service)]
+        memo[key] = inventory_to_arrays(client.get_stations(**query))
+    origin = None
+    if job.get('event_time'):
+        events = cached_get_events(service, **job_origin_query(job))
+        origin = (float(events['longitude'][0]), float(events['latitude'][0]))
+    return memo[key], origin
+
+# Function to set a seismicity job's map extent and draw its basemap;
+# returns the extent [min_lon, max_lon, min_lat, max_lat]
+def draw_seismicity_basemap(ax, job):
+    regional = 'bbox' in job
+    extent = list(job['bbox']) if regional else GLOBAL_EXTENT
+    if regional:
+        ax.set_extent(extent, crs=ccrs.PlateCarree())
+    else:
+        ax.set_global()
+    add_cached_basemap(ax, REGIONAL_FEATURES if regional else GLOBAL_FEATURES,
+                       dpi=job.get('dpi', 300))
+    return extent
+
+# Function to draw a seismicity job's legend at the bottom of the map, with
+# density_scale (the mappable of a density job's colors) in place of the
+# magnitude legend; returns the catalog info Text artists (title, dates,
+# [magnitudes], count)
+def draw_seismicity_legend(ax, job, extent, event_count, density_scale=None):
+    min_longitude, max_longitude, min_latitude, max_latitude = extent
+    min_mag, max_mag = job['min_mag'], job['max_mag']
+    max_marker_size = job.get('max_marker_size', 3)
+    density = job.get('density')
+    legend = job.get('legend', {})
+    if legend.get('box_height'):
+        draw_legend_box(ax, extent, legend['box_height'])
+    y_top = min_latitude + legend.get('y_top', 16.)
+    y_inc = legend.get('y_inc', 4.)
+    x_space = legend.get('x_space', 4.)
+    lines = [job.get('title', str(job.get('catalog')) + ' Catalog'),
+             str(job['start']) + ' to ' + str(job['end'])]
+    if legend.get('info_mag_range', True):
+        lines.append('magnitude ' + str(min_mag) + ' to ' + str(max_mag))
+    lines.append(str(event_count) + ' events')
+    texts = draw_catalog_info(ax, 0.5*(max_longitude + min_longitude) + legend.get('info_x', 0.),
+                              y_top + legend.get('info_y', 0.), y_inc, lines)
+    if not density:
+        draw_magnitude_legend(ax, max_longitude - legend.get('mag_x', 30.), y_top, y_inc,
+                              x_space, min_mag, max_mag, job.get('min_marker_size', 1),
+                              max_marker_size)
+    elif density_scale is not None:
+        draw_density_legend(ax, density_scale,
+                            max_longitude - legend.get('mag_x', 30.) - x_space,
+                            max_longitude - x_space, y_top, y_inc,
+                            DENSITY_LABELS[job.get('density_weight')])
+    if not density or job.get('density_by_depth'):
+        draw_depth_legend(ax, min_longitude + legend.get('depth_x', 10.), y_top, y_inc,
+                          x_space, legend.get('depth_column_shift', 40.), max_marker_size)
+    return texts
+
+# Function to draw a seismicity map (basemap, events and legend) on ax
+def render_seismicity_map(ax, job, events):
+    dpi = job.get('dpi', 300)
+    min_mag, max_mag = job['min_mag'], job['max_mag']
+    min_marker_size = job.get('min_marker_size', 1)
+    max_marker_size = job.get('max_marker_size', 3)
+    zorder = 1 if 'bbox' in job else 10
+    with span('basemap'):
+        extent = draw_seismicity_basemap(ax, job)
+
+    # Only plot events with depth and magnitude
+    with span('select'):
+        count('events_skipped_missing', int(events['event_id'].size - events['valid'].sum()))
+        events = select_events(events, events['valid'])
+    event_count = events['event_id'].size
+    density = job.get('density')
+    density_scale = None
+    with span('plot'):
+        if density:
+            bins = job.get('density_bins', (180, 360) if density == 'grid' else 100)
+            image, values, density_scale = plot_event_density(
+                ax, events, density, tuple(bins) if density == 'grid' else bins,
+                job.get('density_weight'), job.get('density_by_depth', False),
+                dpi=dpi, zorder=zorder)
+            count('events_binned', event_count)
+        elif job.get('lod'):
+            collection, culled = plot_events_lod(ax, events, min_mag, max_mag, min_marker_size,
+                                                 max_marker_size, dpi=dpi, zorder=zorder)
+            count('events_plotted', event_count - culled)
+            count('events_culled', culled)
+        else:
+            plot_events(ax, events, min_mag, max_mag, min_marker_size, max_marker_size,
+                        zorder=zorder)
+            count('events_plotted', event_count)
+
+    with span('legend'):
+        draw_seismicity_legend(ax, job, extent, event_count, density_scale)
+    return event_count
+
+# Function to draw a station map (optionally with an event and paths) on ax
+def render_station_map(ax, job, stations, origin=None):
+    ax.set_global()
+    with span('basemap'):
+        add_cached_basemap(ax, GLOBAL_FEATURES, dpi=job.get('dpi', 300))
+    with span('plot'):
+        if origin is not None:
+            ax.plot(origin[0], origin[1], marker='*', markerfacecolor=EVENT_COLOR,
+                    markeredgecolor=EVENT_COLOR, transform=ccrs.PlateCarree(), zorder=10)
+        ax.plot(stations['longitude'], stations['latitude'], linestyle='none',
+                marker='^', markersize=2, markerfacecolor=STATION_COLOR,
+                markeredgecolor=STATION_COLOR, transform=ccrs.PlateCarree(), zorder=5)
+        count('stations_plotted', stations['station'].size)
+    if origin is not None:
+        with span('paths'):
+            path_lon, path_lat = great_circle_paths(origin[0], origin[1],
+                                                    stations['longitude'], stations['latitude'])
+            plot_great_circles(ax, path_lon, path_lat, colors='black', linewidths=0.5,
+                               linestyles='--', zorder=6)
+    with span('labels'):
+        collection, drawn = plot_station_labels(ax, stations['longitude'], stations['latitude'],
+                                                stations['station'], fontsize=6, zorder=7)
+        count('labels_drawn', int(drawn.sum()))
+    return stations['station'].size
+
+# Function to make a headless figure with one PlateCarree map axes
+def new_map_figure(job):
+    fig = Figure(figsize=job.get('figsize', matplotlib.rcParams['figure.figsize']))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(projection=ccrs.PlateCarree())
+    return fig, ax
+
+# Function to render one job from already fetched data and write its PNG
+def render_job(job, data, origin=None, outdir='.'):
+    fig, ax = new_map_figure(job)
+    if job.get('kind', 'seismicity') == 'stations':
+        render_station_map(ax, job, data, origin)
+    else:
+        render_seismicity_map(ax, job, data)
+    output = os.path.join(outdir, job.get('output', job['name'] + '.png'))
+    with span('savefig'):
+        fig.savefig(output, dpi=job.get('dpi', 300))
+    return output
+
+# Function to get the data a job draws: (events, None) or (stations, origin)
+def get_job_data(job, memo):
+    if job.get('kind', 'seismicity') == 'stations':
+        return get_job_stations(job, memo)
+    return get_job_events(job, memo), None
+
+# Function to fetch a job's data inside a 'fetch' span, counting what came
+def _fetch_job_data(job, memo):
+    with span('fetch'):
+        data, origin = get_job_data(job, memo)
+    _count_job_data(job, data)
+    return data, origin
+
+# Function to count the events or stations a job got
+def _count_job_data(job, data):
+    if job.get('kind', 'seismicity') == 'stations':
+        count('stations_fetched', data['station'].size)
+    else:
+        count('events_fetched', data['event_id'].size)
+
+# Function to run one job and write its PNG; memo is shared across jobs
+def run_job(job, memo=None, outdir='.'):
+    memo = {} if memo is None else memo
+    with span(job['name']):
+        data, origin = _fetch_job_data(job, memo)
+        return render_job(job, data, origin, outdir)
+
+# Worker side of run_jobs_parallel: map the shared arrays and render. With
+# timing (trace_memory, profile_dir) the worker records its own spans and
+# returns them with the output.
+def _run_shared_job(job, descriptor, origin, outdir, timing=None):
+    if timing is None:
+        return render_job(job, attach_arrays(descriptor), origin, outdir), None
+    start_recording(*timing)
+    try:
+        with span(job['name']):
+            output = render_job(job, attach_arrays(descriptor), origin, outdir)
+    finally:
+        recorder = stop_recording()
+    return output, recorder.records()
+
+# Function to run a list of jobs, rendering in up to processes worker
+# processes. All data is fetched first in this process (once per distinct
+# query) and shared with the workers through shared memory.
+def run_jobs_parallel(jobs, processes, outdir='.'):
+    memo = {}
+    blocks = []
+    descriptors = {}
+    tasks = []
+    try:
+        for job in jobs:
+            with span(job['name']):
+                data, origin = _fetch_job_data(job, memo)
+            if id(data) not in descriptors:
+                data_blocks, descriptors[id(data)] = share_arrays(data)
+                blocks.extend(data_blocks)
+            tasks.append((job, descriptors[id(data)], origin))
+        recorder = active_recorder()
+        timing = None if recorder is None else (recorder.trace_memory, recorder.profile_dir)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            futures = [pool.submit(_run_shared_job, job, descriptor, origin, outdir, timing)
+                       for job, descriptor, origin in tasks]
+            outputs = []
+            for future in futures:
+                output, records = future.result()
+                if records is not None:
+                    recorder.merge(records)
+                outputs.append(output)
+            return outputs
+    finally:
+        release_arrays(blocks)
+
+# Function to get a fetch shared by every job asking for key: the task
+# pending[key], started from make() by the first job to ask
+def _shared_fetch(pending, key, make):
+    if key not in pending:
+        pending[key] = asyncio.ensure_future(make())
+    return pending[key]
+
+# Function to get a refresh job's events in a worker thread, timing its
+# stages under span_path
+def _refresh_job_events(job, span_path):
+    with in_path(span_path):
+        return get_job_events(job, {})
+
+# Function to get a job's data like get_job_data, with every query issued
+# through fetcher; identical queries of several jobs are fetched once (their
+# stages are timed under the job that started the fetch)
+async def get_job_data_async(job, fetcher, pending):
+    with span_at([job['name']], 'fetch'):
+        return await _get_job_data_async(job, fetcher, pending, [job['name'], 'fetch'])
+
+async def _get_job_data_async(job, fetcher, pending, span_path):
+    service = job.get('service', FDSN_SERVICE)
+    if job.get('kind', 'seismicity') != 'stations':
+        query = job_query(job)
+        if job.get('refresh'):
+            # The growing store is updated by its own (synchronous) fetches
+            events = _shared_fetch(pending, ('events', service, query_key(query), True),
+                                   lambda: asyncio.to_thread(_refresh_job_events, job, span_path))
+            return await events, None
+        events = _shared_fetch(
+            pending, ('events', service, query_key(query), False),
+            lambda: indexed_get_event_arrays(fetcher, service, slice_days=job.get('slice_days'),
+                                             span_path=span_path, **query))
+        return await events, None
+    query = job_station_query(job)
+    stations = _shared_fetch(pending, ('stations', service, tuple(sorted(query.items()))),
+                             lambda: fetcher.get_station_arrays(service, span_path, **query))
+    if not job.get('event_time'):
+        return await stations, None
+    origin_query = job_origin_query(job)
+    events = _shared_fetch(pending, ('events', service, query_key(origin_query)),
+                           lambda: cached_get_event_arrays(fetcher, service, span_path=span_path,
+                                                           **origin_query))
+    stations, events = await asyncio.gather(stations, events)
+    return stations, (float(events['longitude'][0]), float(events['latitude'][0]))
+
+# Function to render one job from fetched data inside its job span (for a
+# render thread)
+def _render_fetched_job(job, data, origin, outdir):
+    with span(job['name']):
+        return render_job(job, data, origin, outdir)
+
+# Coroutine behind run_jobs_async
+async def _run_jobs_async(jobs, outdir, processes, per_host):
+    loop = asyncio.get_running_loop()
+    recorder = active_recorder()
+    timing = None if recorder is None else (recorder.trace_memory, recorder.profile_dir)
+    if processes > 1:
+        renderer = ProcessPoolExecutor(max_workers=processes,
+                                       mp_context=multiprocessing.get_context('spawn'))
+    else:
+        renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='render')
+    pending = {}
+    blocks = []
+    descriptors = {}
+
+    async def run(job):
+        data, origin = await get_job_data_async(job, fetcher, pending)
+        with in_path([job['name']]):
+            _count_job_data(job, data)
+        if processes == 1:
+            return await loop.run_in_executor(renderer, _render_fetched_job, job, data,
+                                              origin, outdir)
+        if id(data) not in descriptors:
+            data_blocks, descriptors[id(data)] = share_arrays(data)
+            blocks.extend(data_blocks)
+        output, records = await loop.run_in_executor(
+            renderer, _run_shared_job, job, descriptors[id(data)], origin, outdir, timing)
+        if records is not None:
+            recorder.merge(records)
+        return output
+
+    try:
+        async with AsyncFDSNFetcher(per_host=per_host) as fetcher:
+            return await asyncio.gather(*[run(job) for job in jobs])
+    finally:
+        renderer.shutdown(wait=True)
+        release_arrays(blocks)
+
+# Function to run a list of jobs with all their queries in flight at once
+# (at most per_host to any one service host, see async_fetch.py); each job is
+# rendered as soon as its own data is in, in a render thread, or in up to
+# processes worker processes mapping the data from shared memory
+def run_jobs_async(jobs, outdir='.', processes=1, per_host=4):
+    return asyncio.run(_run_jobs_async(jobs, outdir, max(1, min(processes, len(jobs))),
+                                       per_host))
+
+# Function to run a list of jobs in one process, sharing fetched data
+def run_jobs(jobs, outdir='.', processes=1):
+    if processes > 1 and len(jobs) > 1:
+        return run_jobs_parallel(jobs, min(processes, len(jobs)), outdir)
+    memo = {}
+    return [run_job(job, memo, outdir) for job in jobs]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the maps listed in a job file.')
+    parser.add_argument('jobfile', help='TOML (or YAML) job file')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='only run these jobs')
+    parser.add_argument('--outdir', default='.', help='directory for the PNG files')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='render in this many worker processes (0: one per CPU)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='treat every seismicity job as refresh = true')
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help='delete the local catalog stores and fetch them again')
+    parser.add_argument('--async-fetch', action='store_true',
+                        help='issue all queries at once and render each map as its data comes in')
+    parser.add_argument('--per-host', type=int, default=4,
+                        help='with --async-fetch, requests in flight to one host at a time')
+    parser.add_argument('--timings', metavar='FILE',
+                        help='write per-stage timings and counters (.json or .csv)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also record tracemalloc allocations per stage')
+    parser.add_argument('--profile-dir', metavar='DIR',
+                        help='also write a cProfile dump per stage to DIR')
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobfile)
+    if args.only:
+        jobs = [job for job in jobs if job['name'] in args.only]
+    if args.refresh:
+        jobs = [dict(job, refresh=True) for job in jobs]
+    if args.rebuild_index:
+        clear_stores()
+    os.makedirs(args.outdir, exist_ok=True)
+    processes = args.processes or os.cpu_count() or 1
+    recording = args.timings or args.trace_memory or args.profile_dir
+    if recording:
+        start_recording(args.trace_memory, args.profile_dir)
+    try:
+        if args.async_fetch:
+            outputs = run_jobs_async(jobs, args.outdir, processes, args.per_host)
+        else:
+            outputs = run_jobs(jobs, args.outdir, processes)
+        for output in outputs:
+            print(output)
+    finally:
+        recorder = stop_recording() if recording else None
+    if recorder is not None:
+        for name, total in sorted(recorder.summary().items(), key=lambda item: -item[1]['wall_s']):
+            print('%-24s %4d x %9.3f s wall %9.3f s cpu %9.3f s thread cpu'
+                  % (name, total['calls'], total['wall_s'], total['cpu_s'],
+                     total['thread_cpu_s']))
+        if args.timings:
+            recorder.write(args.timings)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:41:06 2026
+
+@author: chrisyoung
+"""
+# Web Mercator (EPSG:3857) z/x/y PNG tiles of a seismicity layer, for slippy
+# map viewers. Tiles are transparent overlays of the events only, sized by
+# magnitude and colored by depth like the maps. Only tiles with events are
+# written, and every tile's content hash (its events plus the style) is kept
+# in tiles.json in the output directory, so after a catalog refresh only the
+# tiles whose events changed are drawn again.
+#
+#   python map_tiles.py atlas.toml ISC_Global_SeismicityMap --max-zoom 8 --processes 0
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from catalog_arrays import select_events
+from event_lod import visible_markers
+from event_style import DEPTH_LIST, DEPTH_COLOR_LIST, classify_events
+
+TILE_SIZE = 256
+MAX_LATITUDE = 85.0511287798   # Web Mercator cut-off
+MANIFEST = 'tiles.json'
+
+# Function to convert lon/lat to pixel coordinates of the whole world at zoom
+# (x east and y south from the top-left corner, TILE_SIZE*2**zoom across)
+def world_pixels(longitude, latitude, zoom):
+    size = TILE_SIZE*2.**zoom
+    lat = np.radians(np.clip(np.asarray(latitude, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    x = (np.asarray(longitude, dtype=np.float64) + 180.)/360.*size
+    y = (1. - np.log(np.tan(lat) + 1./np.cos(lat))/np.pi)/2.*size
+    return x, y
+
+# Function to find the tiles each event's marker touches. Markers reach pad
+# pixels from their center, so an event can land on up to four tiles; tiles
+# wrap around in x. Returns event index, tile x (unwrapped) and tile y of
+# every (event, tile) pair, grouped by tile with events in catalog order.
+def tile_assignments(x, y, zoom, pad):
+    ntiles = 2**zoom
+    tx0 = np.floor((x - pad)/TILE_SIZE).astype(np.int64)
+    tx1 = np.floor((x + pad)/TILE_SIZE).astype(np.int64)
+    ty0 = np.floor((y - pad)/TILE_SIZE).astype(np.int64)
+    ty1 = np.floor((y + pad)/TILE_SIZE).astype(np.int64)
+    index = np.arange(x.size)
+    split_x, split_y = tx1 != tx0, ty1 != ty0
+    both = split_x & split_y
+    event = np.concatenate([index, index[split_x], index[split_y], index[both]])
+    tx = np.concatenate([tx0, tx1[split_x], tx0[split_y], tx1[both]])
+    ty = np.concatenate([ty0, ty0[split_x], ty1[split_y], ty1[both]])
+    keep = (ty >= 0) & (ty < ntiles)
+    event, tx, ty = event[keep], tx[keep], ty[keep]
+    order = np.lexsort((event, ty, tx % ntiles))
+    return event[order], tx[order], ty[order]
+
+# Function to draw batches of tiles. Each item is (path, x, y, sizes, colors)
+# with x, y in pixels from the tile's top-left corner; one figure and one
+# collection are reused for the whole batch.
+def render_tile_batch(items):
+    fig = Figure(figsize=(TILE_SIZE/72., TILE_SIZE/72.), dpi=72)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_axis_off()
+    collection = ax.scatter([], [], marker='o', edgecolors='black', linewidths=0.2)
+    ax.set_xlim(0, TILE_SIZE)
+    ax.set_ylim(TILE_SIZE, 0)
+    for path, x, y, sizes, colors in items:
+        collection.set_offsets(np.column_stack([x, y]))
+        collection.set_sizes(sizes**2)
+        collection.set_facecolors(colors)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = '%s.%d.tmp.png' % (path, os.getpid())
+        fig.savefig(tmp_path, dpi=72, transparent=True)
+        os.replace(tmp_path, path)
+    return len(items)
+
+# Function to read the tile hashes of an earlier run
+def load_manifest(outdir):
+    path = os.path.join(outdir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+# Function to render the tiles of zoom levels min_zoom..max_zoom for event
+# arrays into outdir/z/x/y.png. Marker sizes are in pixels. Returns counts of
+# tiles rendered, left unchanged and removed (tiles that no longer have events).
+def render_tiles(events, outdir, min_mag, max_mag, min_zoom=0, max_zoom=8,
+                 min_marker_size=2, max_marker_size=8, depth_list=DEPTH_LIST,
+                 depth_color_list=DEPTH_COLOR_LIST, processes=1, batch_size=256):
+    events = select_events(events, events['valid'])
+    color_index, colors, sizes = classify_events(
+        events['depth_km'], events['magnitude'], min_mag, max_mag,
+        min_marker_size, max_marker_size, depth_list, depth_color_list)
+    style = json.dumps([min_mag, max_mag, min_marker_size, max_marker_size,
+                        list(depth_list), np.asarray(depth_color_list).tolist()]).encode('utf-8')
+    columns = [np.ascontiguousarray(events[key], dtype=np.float64)
+               for key in ('longitude', 'latitude', 'depth_km', 'magnitude')]
+    pad = 0.5*max(min_marker_size, max_marker_size) + 1.
+
+    old_manifest = load_manifest(outdir)
+    manifest = {}
+    pending = []
+    for zoom in range(min_zoom, max_zoom + 1):
+        ntiles = 2**zoom
+        x, y = world_pixels(events['longitude'], events['latitude'], zoom)
+        event, tx, ty = tile_assignments(x, y, zoom, pad)
+        tile = (tx % ntiles)*ntiles + ty
+        starts = np.flatnonzero(np.r_[True, tile[1:] != tile[:-1]])
+        for start, stop in zip(starts, np.r_[starts[1:], tile.size]):
+            index = event[start:stop]
+            name = '%d/%d/%d' % (zoom, tx[start] % ntiles, ty[start])
+            digest = hashlib.sha1(style)
+            digest.update(name.encode('utf-8'))
+            for column in columns:
+                digest.update(column[index].tobytes())
+            manifest[name] = digest.hexdigest()
+            path = os.path.join(outdir, name + '.png')
+            if old_manifest.get(name) == manifest[name] and os.path.exists(path):
+                continue
+            # Positions relative to the unwrapped tile each event was found
+            # in, so markers crossing the antimeridian show on both sides
+            tile_x = x[index] - tx[start:stop]*TILE_SIZE
+            tile_y = y[index] - ty[start]*TILE_SIZE
+            keep = visible_markers(tile_x, tile_y, color_index[index], sizes[index])
+            index = index[keep]
+            pending.append((path, tile_x[keep], tile_y[keep], sizes[index], colors[index]))
+
+    removed = [name for name in old_manifest if name not in manifest]
+    for name in removed:
+        path = os.path.join(outdir, name + '.png')
+        if os.path.exists(path):
+            os.remove(path)
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    if processes > 1 and len(batches) > 1:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            list(pool.map(render_tile_batch, batches))
+    else:
+        for batch in batches:
+            render_tile_batch(batch)
+
+    os.makedirs(outdir, exist_ok=True)
+    path = os.path.join(outdir, MANIFEST)
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+    return {'rendered': len(pending), 'unchanged': len(manifest) - len(pending),
+            'removed': len(removed)}
+
+def main(argv=None):
+    from map_jobs import load_jobs, get_job_events
+
+    parser = argparse.ArgumentParser(description='Render web map tiles of a seismicity job.')
+    parser.add_argument('jobfile', help='TOML (or YAML) job file')
+    parser.add_argument('name', help='seismicity job whose catalog is tiled')
+    parser.add_argument('--min-zoom', type=int, default=0)
+    parser.add_argument('--max-zoom', type=int, default=8)
+    parser.add_argument('--outdir', default='tiles', help='tile directory (z/x/y.png)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='render in this many worker processes (0: one per CPU)')
+    args = parser.parse_args(argv)
+
+    jobs = [job for job in load_jobs(args.jobfile) if job['name'] == args.name]
+    if not jobs:
+        parser.error('no job named ' + args.name)
+    job = jobs[0]
+    counts = render_tiles(get_job_events(job, {}), args.outdir, job['min_mag'], job['max_mag'],
+                          args.min_zoom, args.max_zoom,
+                          processes=args.processes or os.cpu_count() or 1)
+    print('%(rendered)d tiles rendered, %(unchanged)d unchanged, %(removed)d removed' % counts)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:05:33 2026
+
+@author: chrisyoung
+"""
+# Per-stage timing and memory instrumentation for the map pipeline. Stages
+# are marked with span(name) context managers and counts with count(name, n);
+# both do nothing unless a recorder has been started, so the pipeline code
+# keeps them in place for free. Each span records wall time, the process's
+# and its own thread's CPU time, the process's peak RSS at its end and how
+# much the span raised it, and, with trace_memory, the tracemalloc
+# allocation delta and peak inside the span.
+# Spans nest ('ISC_Japan_SeismicityMap/fetch/get_events'), counters are
+# kept under the span they were counted in. With a profile_dir every span
+# also writes a cProfile dump of its own time (nested spans get their own).
+#
+#   recorder = start_recording(trace_memory=True, profile_dir='profiles')
+#   with span('fetch'):
+#       events = ...
+#       count('events_fetched', events['event_id'].size)
+#   stop_recording()
+#   recorder.write('timings.json')    # or timings.csv
+#
+# Spans running at the same time in several threads are all recorded; a
+# worker thread continues its caller's path when it runs under
+# in_path(current_path()). cpu_s, tracemalloc and RSS figures are per
+# process, so those of concurrent spans overlap (cpu_s of a span includes the
+# CPU time of every other thread meanwhile, and cpu_s of concurrent spans do
+# not add up); thread_cpu_s is the span's own thread only (not the worker
+# threads it waits for). asyncio code marks its stages with span_at(path,
+# name) instead of span, and runs blocking parts in threads under in_path.
+
+import os
+import sys
+import csv
+import json
+import time
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+# Span fields: start is POSIX seconds, so spans from several processes line
+# up; memory figures are MB
+SPAN_FIELDS = ('path', 'name', 'pid', 'start', 'wall_s', 'cpu_s', 'thread_cpu_s',
+               'max_rss_mb', 'rss_growth_mb', 'alloc_mb', 'alloc_peak_mb', 'profile')
+
+# The recorder span() and count() report to, if any
+_ACTIVE = None
+
+# Function to get the process's peak resident set size in MB
+def peak_rss_mb():
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return maxrss/(1024.*1024.) if sys.platform == 'darwin' else maxrss/1024.
+
+# Recorder of spans and counters
+class PipelineRecorder:
+    def __init__(self, trace_memory=False, profile_dir=None):
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.spans = []
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        if profile_dir is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    # Function to get this thread's stack of open span names
+    def _stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+            # Per open span: its profiler and highest traced memory so far
+            self.local.profilers = []
+            self.local.peaks = []
+        return self.local.stack
+
+    # Function to record the block it wraps as the span name
+    @contextmanager
+    def span(self, name):
+        stack = self._stack()
+        profilers, peaks = self.local.profilers, self.local.peaks
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # Keep the enclosing spans' peaks before resetting it for this one
+            current, peak = tracemalloc.get_traced_memory()
+            peaks[:] = [max(value, peak) for value in peaks]
+            tracemalloc.reset_peak()
+        stack.append(str(name))
+        peaks.append(current if tracing else 0)
+        path = '/'.join(stack)
+        # Profiles are per span: the enclosing span's profiler pauses
+        profiler = None
+        if self.profile_dir is not None:
+            if profilers and profilers[-1] is not None:
+                profilers[-1].disable()
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is running
+                profiler = None
+        profilers.append(profiler)
+        rss_start = peak_rss_mb()
+        start = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        thread_cpu_start = time.thread_time()
+        alloc_start = current if tracing else 0
+        try:
+            yield
+        finally:
+            record = {'path': path, 'name': stack[-1], 'pid': os.getpid(),
+                      'start': start,
+                      'wall_s': time.perf_counter() - wall_start,
+                      'cpu_s': time.process_time() - cpu_start,
+                      'thread_cpu_s': time.thread_time() - thread_cpu_start,
+                      'max_rss_mb': peak_rss_mb()}
+            if rss_start is not None:
+                record['rss_growth_mb'] = record['max_rss_mb'] - rss_start
+            profilers.pop()
+            if profiler is not None:
+                profiler.disable()
+                record['profile'] = self._dump_profile(profiler, path)
+            if profilers and profilers[-1] is not None:
+                profilers[-1].enable()
+            peak = peaks.pop()
+            if tracing:
+                current, traced_peak = tracemalloc.get_traced_memory()
+                peak = max(peak, traced_peak)
+                if peaks:
+                    peaks[-1] = max(peaks[-1], peak)
+                record['alloc_mb'] = (current - alloc_start)/2**20
+                record['alloc_peak_mb'] = (peak - alloc_start)/2**20
+            stack.pop()
+            with self.lock:
+                self.spans.append(record)
+
+    # Function to record the block it wraps as a span at path (a list of
+    # names) + name without this thread's span stack, for code that awaits:
+    # asyncio tasks share the loop's thread, so their spans cannot nest on
+    # its stack. Wall time and RSS only; the CPU time and allocations in
+    # between are the other tasks' as much as this one's.
+    @contextmanager
+    def span_at(self, path, name):
+        rss_start = peak_rss_mb()
+        start = time.time()
+        wall_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {'path': '/'.join(list(path) + [str(name)]), 'name': str(name),
+                      'pid': os.getpid(), 'start': start,
+                      'wall_s': time.perf_counter() - wall_start,
+                      'max_rss_mb': peak_rss_mb()}
+            if rss_start is not None:
+                record['rss_growth_mb'] = record['max_rss_mb'] - rss_start
+            with self.lock:
+                self.spans.append(record)
+
+    # Function to write a span's profile as profile_dir/<path>.prof, numbered
+    # when the same path is profiled again
+    def _dump_profile(self, profiler, path):
+        base = os.path.join(self.profile_dir, path.replace('/', '__').replace(' ', '_'))
+        with self.lock:
+            n = 0
+            filename = base + '.prof'
+            while os.path.exists(filename):
+                n += 1
+                filename = '%s.%d.prof' % (base, n)
+            profiler.dump_stats(filename)
+        return filename
+
+    # Function to run the block it wraps under the span path path (a list
+    # of names, see current_path), e.g. in a worker thread
+    @contextmanager
+    def in_path(self, path):
+        stack = self._stack()
+        depth = len(stack)
+        stack.extend(path)
+        self.local.profilers.extend([None]*len(path))
+        self.local.peaks.extend([0]*len(path))
+        try:
+            yield
+        finally:
+            del stack[depth:], self.local.profilers[depth:], self.local.peaks[depth:]
+
+    # Function to add n to a counter kept under the current span
+    def count(self, name, n=1):
+        key = '/'.join(self._stack() + [str(name)])
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    # Function to take in the records of another recorder (e.g. a worker
+    # process's), as returned by records()
+    def merge(self, records):
+        with self.lock:
+            self.spans.extend(records['spans'])
+            for key, value in records['counters'].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    # Function to get all spans and counters as plain data
+    def records(self):
+        with self.lock:
+            return {'spans': list(self.spans), 'counters': dict(self.counters)}
+
+    # Function to write the records as JSON, or as CSV (spans, then one row
+    # per counter) when path ends with .csv
+    def write(self, path):
+        records = self.records()
+        if not path.lower().endswith('.csv'):
+            with open(path, 'w') as f:
+                json.dump(records, f, indent=1)
+            return
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, ('kind',) + SPAN_FIELDS + ('value',))
+            writer.writeheader()
+            for record in records['spans']:
+                writer.writerow(dict(record, kind='span'))
+            for key, value in sorted(records['counters'].items()):
+                writer.writerow({'kind': 'counter', 'path': key,
+                                 'name': key.rsplit('/', 1)[-1], 'value': value})
+
+    # Function to sum wall time, CPU time and calls per span name (the
+    # process-wide cpu_s of concurrent spans is counted once per span)
+    def summary(self):
+        totals = {}
+        for record in self.records()['spans']:
+            total = totals.setdefault(record['name'], {'calls': 0, 'wall_s': 0., 'cpu_s': 0.,
+                                                       'thread_cpu_s': 0.})
+            total['calls'] += 1
+            for key in ('wall_s', 'cpu_s', 'thread_cpu_s'):
+                total[key] += record.get(key, 0.)
+        return totals
+
+# Function to start recording spans and counters into a new recorder (with
+# trace_memory, tracemalloc is started too); returns the recorder
+def start_recording(trace_memory=False, profile_dir=None):
+    global _ACTIVE
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _ACTIVE = PipelineRecorder(trace_memory, profile_dir)
+    return _ACTIVE
+
+# Function to stop recording; returns the recorder that was active
+def stop_recording():
+    global _ACTIVE
+    recorder, _ACTIVE = _ACTIVE, None
+    if recorder is not None and recorder.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return recorder
+
+# Function to get the active recorder, or None
+def active_recorder():
+    return _ACTIVE
+
+# Function to mark a pipeline stage; a no-op context when not recording
+def span(name):
+    return nullcontext() if _ACTIVE is None else _ACTIVE.span(name)
+
+# Function to mark a stage of awaiting code at an explicit span path (see
+# PipelineRecorder.span_at); a no-op context when not recording
+def span_at(path, name):
+    return nullcontext() if _ACTIVE is None else _ACTIVE.span_at(path, name)
+
+# Function to add n to a counter; a no-op when not recording
+def count(name, n=1):
+    if _ACTIVE is not None:
+        _ACTIVE.count(name, n)
+
+# Function to get the names of the spans open in this thread, or [] when
+# not recording
+def current_path():
+    return [] if _ACTIVE is None else list(_ACTIVE._stack())
+
+# Function to continue a span path (from current_path) in another thread;
+# a no-op context when not recording
+def in_path(path):
+    return nullcontext() if _ACTIVE is None else _ACTIVE.in_path(path)
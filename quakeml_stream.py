@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:15:48 2026
+
+@author: chrisyoung
+"""
+# Streaming QuakeML reader for FDSN event responses. Instead of building an
+# obspy Catalog it walks the XML one <event> at a time, keeps only the
+# preferred origin and magnitude (and optionally the preferred focal
+# mechanism), and throws the element away again. Events are collected in
+# chunks of chunk_size, so the parser itself never holds more than one chunk
+# of per-event Python objects.
+
+import io
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import obspy
+
+from catalog_arrays import (MECHANISM_FIELDS, build_event_arrays,
+                            concat_event_arrays, empty_event_arrays)
+
+# QuakeML element names of the moment tensor components, in MECHANISM_FIELDS order
+_TENSOR_TAGS = ('Mrr', 'Mtt', 'Mpp', 'Mrt', 'Mrp', 'Mtp')
+
+# Function to strip the XML namespace off a tag
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+# Function to find a direct child by local name
+def _child(elem, name):
+    if elem is None:
+        return None
+    for child in elem:
+        if _local(child.tag) == name:
+            return child
+    return None
+
+# Function to read <name><value>x</value></name> below elem as a float
+def _value(elem, name):
+    value = _child(_child(elem, name), 'value')
+    if value is None or value.text is None:
+        return float('nan')
+    return float(value.text)
+
+# Function to pick the preferred origin/magnitude/focal mechanism element
+def _preferred(items, preferred_id):
+    for item in items:
+        if item.get('publicID') == preferred_id:
+            return item
+    return items[0] if items else None
+
+# Function to convert QuakeML time strings to POSIX seconds in one go.
+# Times with a time zone offset other than Z (+hh:mm or -hh:mm after the
+# date) go to UTCDateTime, as do all of them if numpy cannot read one.
+def _times_to_seconds(time_strings):
+    seconds = np.full(len(time_strings), np.nan)
+    offset = np.array([bool(t) and ('+' in t[10:] or '-' in t[10:]) for t in time_strings],
+                      dtype=bool)
+    plain = np.flatnonzero(~offset)
+    try:
+        times = np.array([time_strings[i].rstrip('Z') if time_strings[i] else 'NaT'
+                          for i in plain], dtype='datetime64[us]')
+    except ValueError:
+        return np.array([obspy.UTCDateTime(t).timestamp if t else np.nan
+                         for t in time_strings], dtype=np.float64)
+    seconds[plain] = np.where(np.isnat(times), np.nan, times.astype(np.int64)/1e6)
+    for i in np.flatnonzero(offset):
+        seconds[i] = obspy.UTCDateTime(time_strings[i]).timestamp
+    return seconds
+
+# Function to pull the fields we map out of one <event> element
+def _event_fields(event, mechanisms):
+    children = {}
+    for child in event:
+        children.setdefault(_local(child.tag), []).append(child)
+    preferred = {name: None if (children.get(name) is None or children[name][0].text is None)
+                 else children[name][0].text.strip()
+                 for name in ('preferredOriginID', 'preferredMagnitudeID',
+                              'preferredFocalMechanismID')}
+
+    origin = _preferred(children.get('origin', []), preferred['preferredOriginID'])
+    magnitude = _preferred(children.get('magnitude', []), preferred['preferredMagnitudeID'])
+    time_elem = _child(_child(origin, 'time'), 'value')
+    fields = [event.get('publicID'),
+              None if time_elem is None else time_elem.text,
+              _value(origin, 'longitude'), _value(origin, 'latitude'),
+              _value(origin, 'depth')/1000., _value(magnitude, 'mag')]
+    if mechanisms:
+        mechanism = _preferred(children.get('focalMechanism', []),
+                               preferred['preferredFocalMechanismID'])
+        plane = _child(_child(mechanism, 'nodalPlanes'), 'nodalPlane1')
+        tensor = _child(_child(mechanism, 'momentTensor'), 'tensor')
+        fields += [_value(plane, 'strike'), _value(plane, 'dip'), _value(plane, 'rake')]
+        fields += [_value(tensor, tag) for tag in _TENSOR_TAGS]
+    return fields
+
+# Function to turn a chunk of per-event field lists into event arrays
+def _chunk_to_arrays(rows, mechanisms):
+    columns = list(zip(*rows))
+    arrays = build_event_arrays(columns[0], _times_to_seconds(columns[1]), *columns[2:6])
+    if mechanisms:
+        for name, column in zip(MECHANISM_FIELDS, columns[6:]):
+            arrays[name] = np.asarray(column, dtype=np.float64)
+    return arrays
+
+# Generator yielding event arrays for every chunk_size events of a QuakeML
+# document (path, file object or bytes)
+def iter_quakeml_chunks(source, chunk_size=10000, mechanisms=False):
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    rows = []
+    parent = None
+    for action, elem in ET.iterparse(source, events=('start', 'end')):
+        name = _local(elem.tag)
+        if action == 'start':
+            if name == 'eventParameters':
+                parent = elem
+            continue
+        if name != 'event':
+            continue
+        rows.append(_event_fields(elem, mechanisms))
+        # Done with this event; drop it from the tree
+        elem.clear()
+        if parent is not None:
+            parent.remove(elem)
+        if len(rows) == chunk_size:
+            yield _chunk_to_arrays(rows, mechanisms)
+            rows = []
+    if rows:
+        yield _chunk_to_arrays(rows, mechanisms)
+
+# Function to read a whole QuakeML document into one set of event arrays
+def read_quakeml_arrays(source, chunk_size=10000, mechanisms=False):
+    chunks = list(iter_quakeml_chunks(source, chunk_size, mechanisms))
+    if not chunks:
+        return empty_event_arrays(mechanisms)
+    return concat_event_arrays(chunks)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:02:45 2026
+
+@author: chrisyoung
+"""
+# Event/station arrays placed in shared memory so worker processes can map
+# them without the arrays being pickled and sent with every job. The parent
+# calls share_arrays() once per catalog and hands workers the small
+# descriptor it returns; workers call attach_arrays() to get zero-copy views.
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Blocks this process has attached to, by name, kept open for its lifetime
+_ATTACHED = {}
+
+# Function to copy a dict of arrays into shared memory. Returns the
+# SharedMemory blocks (keep them, and unlink() them when done) and a
+# picklable descriptor {key: (block name, dtype, shape)}.
+def share_arrays(arrays):
+    blocks = []
+    descriptor = {}
+    for key, value in arrays.items():
+        value = np.ascontiguousarray(value)
+        block = shared_memory.SharedMemory(create=True, size=max(1, value.nbytes))
+        np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+        blocks.append(block)
+        descriptor[key] = (block.name, value.dtype.str, value.shape)
+    return blocks, descriptor
+
+# Function to open a shared block without this process taking ownership of
+# it (the parent unlinks it)
+def _open_block(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers every attach with the resource tracker;
+        # pool workers share their parent's tracker, which already holds it
+        return shared_memory.SharedMemory(name=name)
+
+# Function to get read-only array views from a share_arrays descriptor.
+# Blocks are attached once per process and reused by later calls.
+def attach_arrays(descriptor):
+    arrays = {}
+    for key, (name, dtype, shape) in descriptor.items():
+        if name not in _ATTACHED:
+            _ATTACHED[name] = _open_block(name)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_ATTACHED[name].buf)
+        view.flags.writeable = False
+        arrays[key] = view
+    return arrays
+
+# Function to close and remove the blocks made by share_arrays
+def release_arrays(blocks):
+    for block in blocks:
+        block.close()
+        block.unlink()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:31:09 2026
+
+@author: chrisyoung
+"""
+# Flattens an obspy Inventory into NumPy arrays in a single walk over
+# network -> station -> channel, instead of looking every channel up again
+# with inv.get_coordinates().
+#
+# Station arrays are a plain dict of equal-length arrays:
+#   network, station, location, channel   codes (strings)
+#   latitude, longitude                   degrees
+#   elevation                             m
+
+import numpy as np
+
+STATION_FIELDS = ('network', 'station', 'location', 'channel',
+                  'latitude', 'longitude', 'elevation')
+
+# Function to convert an Inventory to station arrays. Channel coordinates are
+# used where the inventory has channels, station coordinates otherwise. With
+# unique_stations only the first channel of each NET.STA is kept.
+def inventory_to_arrays(inv, unique_stations=True):
+    rows = []
+    seen = set()
+    for net in inv.networks:
+        for sta in net.stations:
+            if unique_stations and (net.code, sta.code) in seen:
+                continue
+            channels = sta.channels or [None]
+            for cha in channels:
+                coords = sta if cha is None else cha
+                rows.append((net.code, sta.code,
+                             '' if cha is None else cha.location_code,
+                             '' if cha is None else cha.code,
+                             coords.latitude, coords.longitude, coords.elevation))
+                if unique_stations:
+                    seen.add((net.code, sta.code))
+                    break
+    return build_station_arrays(rows)
+
+# Function to build station arrays from (net, sta, loc, cha, lat, lon, elev) rows
+def build_station_arrays(rows):
+    columns = list(zip(*rows)) if rows else [[]]*len(STATION_FIELDS)
+    arrays = {}
+    for name, column in zip(STATION_FIELDS[:4], columns[:4]):
+        arrays[name] = np.asarray(column, dtype=str)
+    for name, column in zip(STATION_FIELDS[4:], columns[4:]):
+        arrays[name] = np.asarray(column, dtype=np.float64)
+    return arrays
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:48:20 2026
+
+@author: chrisyoung
+"""
+# Station code labels without overlaps. Each distinct label is measured once
+# (built from cached per-character outlines), labels are placed greedily (in priority order) at the first
+# of four corners around the station that does not collide with a label
+# already placed, using a uniform grid as the spatial index, and the labels
+# that fit are drawn as glyph outlines in one PathCollection rather than as
+# one Text artist per station.
+#
+# Layout is done in points, so it holds for any savefig dpi.
+
+import numpy as np
+import cartopy.crs as ccrs
+from matplotlib.collections import PathCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath, text_to_path
+from matplotlib.transforms import Affine2D
+
+# Function to build glyph outlines (in points) of each label by laying out
+# per-character TextPaths, so only the few distinct characters are ever
+# rendered to paths. Returns a dict label -> Path.
+def label_paths(labels, fontsize=6, prop=None):
+    prop = FontProperties(size=fontsize) if prop is None else prop.copy()
+    prop.set_size(fontsize)
+    glyphs = {}
+    paths = {}
+    for label in set(labels):
+        vertices, codes, advance = [], [], 0.
+        for char in label:
+            if char not in glyphs:
+                width, height, descent = text_to_path.get_text_width_height_descent(
+                    char, prop, ismath=False)
+                glyphs[char] = (TextPath((0, 0), char, size=fontsize, prop=prop), width)
+            glyph, width = glyphs[char]
+            if len(glyph.vertices):
+                vertices.append(glyph.vertices + (advance, 0.))
+                codes.append(glyph.codes)
+            advance += width
+        if vertices:
+            paths[label] = Path(np.concatenate(vertices), np.concatenate(codes))
+        else:
+            paths[label] = Path(np.zeros((1, 2)), [Path.MOVETO])
+    return paths
+
+# Function to measure labels as (paths, width, height, xmin, ymin), all in
+# points, building each distinct label's outline only once
+def label_extents(labels, fontsize=6, prop=None):
+    paths = label_paths(labels, fontsize, prop)
+    # Bounds of the control points; a touch larger than the outline at most
+    extents = {label: np.concatenate([path.vertices.min(axis=0), path.vertices.max(axis=0)])
+               for label, path in paths.items()}
+    bounds = np.array([extents[label] for label in labels]).reshape(-1, 4)
+    return (paths, bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1],
+            bounds[:, 0], bounds[:, 1])
+
+# Function to place boxes of width x height (points) next to anchor points
+# x, y (points). Candidates are tried in order: upper right (where the old
+# plt.text labels went), upper left, lower right, lower left. Returns the
+# lower-left corner offset of every box, NaN where all four collide.
+def place_labels(x, y, width, height, pad=1., priority=None):
+    n = len(x)
+    order = np.arange(n) if priority is None else np.argsort(priority, kind='stable')[::-1]
+    cell = max(float(np.max(width, initial=1.)), float(np.max(height, initial=1.))) + pad
+    grid = {}
+    boxes = np.full((n, 4), np.nan)
+    offsets = np.full((n, 2), np.nan)
+    for i in order:
+        w, h = width[i], height[i]
+        for dx, dy in ((pad, pad), (-w - pad, pad), (pad, -h - pad), (-w - pad, -h - pad)):
+            x0, y0 = x[i] + dx, y[i] + dy
+            x1, y1 = x0 + w, y0 + h
+            ix0, ix1 = int(np.floor(x0/cell)), int(np.floor(x1/cell))
+            iy0, iy1 = int(np.floor(y0/cell)), int(np.floor(y1/cell))
+            cells = [(ix, iy) for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1)]
+            collide = False
+            for key in cells:
+                for j in grid.get(key, ()):
+                    bx0, by0, bx1, by1 = boxes[j]
+                    if x0 < bx1 and bx0 < x1 and y0 < by1 and by0 < y1:
+                        collide = True
+                        break
+                if collide:
+                    break
+            if not collide:
+                boxes[i] = (x0, y0, x1, y1)
+                offsets[i] = (dx, dy)
+                for key in cells:
+                    grid.setdefault(key, []).append(i)
+                break
+    return offsets
+
+# Function to label stations at lon/lat with their codes. Labels are placed
+# for the axes as they are now, so call this after the map extent is set.
+# Higher priority labels are placed first. Returns the collection and the
+# mask of labels that were drawn.
+def plot_station_labels(ax, longitude, latitude, labels, fontsize=6, color='black',
+                        pad=1., priority=None, prop=None, zorder=7):
+    labels = [str(label) for label in labels]
+    fig = ax.figure
+    ax.autoscale_view()
+    ax.apply_aspect()
+
+    # Station positions in data (projection) coordinates and in points
+    xy = ax.projection.transform_points(ccrs.PlateCarree(), np.asarray(longitude, dtype=np.float64),
+                                        np.asarray(latitude, dtype=np.float64))[:, :2]
+    points = ax.transData.transform(xy)*72./fig.dpi
+    visible = np.all(np.isfinite(points), axis=1)
+
+    paths, width, height, xmin, ymin = label_extents(labels, fontsize, prop)
+    offsets = np.full((len(labels), 2), np.nan)
+    if visible.any():
+        offsets[visible] = place_labels(points[visible, 0], points[visible, 1],
+                                        width[visible], height[visible], pad,
+                                        None if priority is None else np.asarray(priority)[visible])
+    drawn = np.all(np.isfinite(offsets), axis=1)
+
+    # Glyph outlines shifted to their chosen corner, in points about the station
+    glyphs = [Path(paths[labels[i]].vertices + (offsets[i, 0] - xmin[i], offsets[i, 1] - ymin[i]),
+                   paths[labels[i]].codes)
+              for i in np.nonzero(drawn)[0]]
+    collection = PathCollection(glyphs, offsets=xy[drawn], offset_transform=ax.transData,
+                                transform=Affine2D().scale(1/72.) + fig.dpi_scale_trans,
+                                facecolors=color, edgecolors='none', linewidths=0,
+                                zorder=zorder)
+    ax.add_collection(collection, autolim=False)
+    return collection, drawn
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:18:02 2026
+
+@author: chrisyoung
+"""
+# Synthetic catalogs and inventories for running the map pipeline offline.
+# Events cluster along the major subduction zones and plate boundaries with
+# a thin uniform background, depths mix crustal, intermediate and deep
+# events, and magnitudes follow Gutenberg-Richter (b = 1) above the minimum.
+# Catalogs can be written as QuakeML and inventories as StationXML, so the
+# parsers see the same kind of documents an FDSN service returns.
+
+import io
+
+import numpy as np
+import obspy
+from obspy.core.inventory import Inventory, Network, Station, Channel
+
+from catalog_arrays import MECHANISM_FIELDS, build_event_arrays
+
+# Plate boundary polylines (lon, lat) that events are scattered around
+ARCS = (((142., 35.), (144., 40.), (150., 46.), (158., 52.)),               # Japan, Kurils
+        ((165., 52.), (180., 51.), (-165., 53.), (-150., 58.)),              # Aleutians
+        ((-77., 5.), (-80., -5.), (-72., -20.), (-71., -33.), (-73., -45.)),  # Andes
+        ((95., 5.), (100., -3.), (108., -8.), (120., -9.), (128., -4.)),     # Sunda
+        ((-175., -15.), (-176., -22.), (-178., -30.)),                      # Tonga
+        ((-105., 18.), (-92., 14.), (-85., 10.)),                           # Central America
+        ((20., 38.), (45., 35.), (70., 35.), (90., 28.)),                   # Alpide belt
+        ((-124., 40.), (-120., 36.), (-116., 33.)))                         # California
+
+# Function to make n synthetic events between starttime and endtime with
+# magnitudes from min_mag (capped at max_mag); with mechanisms random nodal
+# planes and double-couple moment tensors are added
+def synthetic_event_arrays(n, starttime='2010-01-01', endtime='2012-01-01', min_mag=2.5,
+                           max_mag=9., background=0.05, scatter=0.7, mechanisms=False,
+                           seed=0):
+    rng = np.random.default_rng(seed)
+    # Points along the arcs, segments picked in proportion to their length
+    segments = []
+    for arc in ARCS:
+        for (lon0, lat0), (lon1, lat1) in zip(arc[:-1], arc[1:]):
+            dlon = (lon1 - lon0 + 180.) % 360. - 180.
+            segments.append((lon0, lat0, dlon, lat1 - lat0))
+    segments = np.array(segments)
+    length = np.hypot(segments[:, 2], segments[:, 3])
+    pick = rng.choice(len(segments), n, p=length/length.sum())
+    along = rng.random(n)
+    longitude = segments[pick, 0] + along*segments[pick, 2] + rng.normal(0., scatter, n)
+    latitude = segments[pick, 1] + along*segments[pick, 3] + rng.normal(0., scatter, n)
+    # Uniform background over the sphere
+    uniform = rng.random(n) < background
+    longitude[uniform] = rng.uniform(-180., 180., uniform.sum())
+    latitude[uniform] = np.degrees(np.arcsin(rng.uniform(-1., 1., uniform.sum())))
+    longitude = (longitude + 180.) % 360. - 180.
+    latitude = np.clip(latitude, -90., 90.)
+
+    # Crustal, intermediate and deep events
+    kind = rng.choice(3, n, p=(0.75, 0.2, 0.05))
+    depth = np.where(kind == 0, rng.exponential(12., n).clip(0., 70.),
+                     np.where(kind == 1, rng.uniform(70., 300., n), rng.uniform(300., 660., n)))
+    magnitude = np.minimum(min_mag + rng.exponential(1./np.log(10.), n), max_mag)
+    start = obspy.UTCDateTime(starttime).timestamp
+    end = obspy.UTCDateTime(endtime).timestamp
+    time = np.sort(rng.uniform(start, end, n))
+    event_id = np.char.add('smi:local/synthetic/', np.arange(n).astype(str))
+    arrays = build_event_arrays(event_id, time, longitude, latitude, depth, np.round(magnitude, 1))
+    if mechanisms:
+        strike, dip, rake = rng.uniform(0., 360., n), rng.uniform(10., 90., n), rng.uniform(-180., 180., n)
+        tensor = double_couple_tensors(strike, dip, rake, 10.**(1.5*magnitude + 9.1))
+        for key, column in zip(MECHANISM_FIELDS, [strike, dip, rake] + list(tensor.T)):
+            arrays[key] = column
+    return arrays
+
+# Function to get the moment tensors (n, 6: m_rr, m_tt, m_pp, m_rt, m_rp,
+# m_tp) of double couples with moment m0 (Aki & Richards, Box 4.4)
+def double_couple_tensors(strike, dip, rake, m0):
+    phi, delta, lam = np.radians(strike), np.radians(dip), np.radians(rake)
+    m_xx = -(np.sin(delta)*np.cos(lam)*np.sin(2*phi) + np.sin(2*delta)*np.sin(lam)*np.sin(phi)**2)
+    m_xy = np.sin(delta)*np.cos(lam)*np.cos(2*phi) + 0.5*np.sin(2*delta)*np.sin(lam)*np.sin(2*phi)
+    m_xz = -(np.cos(delta)*np.cos(lam)*np.cos(phi) + np.cos(2*delta)*np.sin(lam)*np.sin(phi))
+    m_yy = np.sin(delta)*np.cos(lam)*np.sin(2*phi) - np.sin(2*delta)*np.sin(lam)*np.cos(phi)**2
+    m_yz = -(np.cos(delta)*np.cos(lam)*np.sin(phi) - np.cos(2*delta)*np.sin(lam)*np.cos(phi))
+    m_zz = np.sin(2*delta)*np.sin(lam)
+    # x north, y east, z down -> r up, t south, p east
+    return np.column_stack([m_zz, m_xx, m_yy, m_xz, -m_yz, -m_xy])*np.reshape(m0, (-1, 1))
+
+# Function to write event arrays as a QuakeML document (bytes): one origin
+# and magnitude per event, plus a focal mechanism when the arrays have the
+# mechanism columns
+def event_arrays_to_quakeml(arrays):
+    times = np.datetime_as_string(np.round(arrays['time']*1e6).astype('datetime64[us]'))
+    mechanisms = all(key in arrays for key in MECHANISM_FIELDS)
+    out = io.StringIO()
+    out.write("<?xml version='1.0' encoding='utf-8'?>\n"
+              '<q:quakeml xmlns:q="http://quakeml.org/xmlns/quakeml/1.2" '
+              'xmlns="http://quakeml.org/xmlns/bed/1.2">\n'
+              '<eventParameters publicID="smi:local/synthetic">\n')
+    for i, event_id in enumerate(arrays['event_id']):
+        out.write('<event publicID="%s"><preferredOriginID>%s/origin</preferredOriginID>'
+                  '<preferredMagnitudeID>%s/magnitude</preferredMagnitudeID>'
+                  '<origin publicID="%s/origin"><time><value>%sZ</value></time>'
+                  '<latitude><value>%.4f</value></latitude><longitude><value>%.4f</value></longitude>'
+                  % (event_id, event_id, event_id, event_id, times[i],
+                     arrays['latitude'][i], arrays['longitude'][i]))
+        if np.isfinite(arrays['depth_km'][i]):
+            out.write('<depth><value>%.0f</value></depth>' % (arrays['depth_km'][i]*1000.))
+        out.write('</origin>')
+        if np.isfinite(arrays['magnitude'][i]):
+            out.write('<magnitude publicID="%s/magnitude"><mag><value>%.1f</value></mag>'
+                      '<type>Mw</type></magnitude>' % (event_id, arrays['magnitude'][i]))
+        if mechanisms and np.isfinite(arrays['strike'][i]):
+            out.write('<focalMechanism publicID="%s/mechanism"><nodalPlanes><nodalPlane1>'
+                      '<strike><value>%.1f</value></strike><dip><value>%.1f</value></dip>'
+                      '<rake><value>%.1f</value></rake></nodalPlane1></nodalPlanes>'
+                      % (event_id, arrays['strike'][i], arrays['dip'][i], arrays['rake'][i]))
+            if np.isfinite(arrays['m_rr'][i]):
+                out.write('<momentTensor publicID="%s/tensor"><derivedOriginID>%s/origin'
+                          '</derivedOriginID><tensor>' % (event_id, event_id))
+                for tag, key in zip(('Mrr', 'Mtt', 'Mpp', 'Mrt', 'Mrp', 'Mtp'), MECHANISM_FIELDS[3:]):
+                    out.write('<%s><value>%.6e</value></%s>' % (tag, arrays[key][i], tag))
+                out.write('</tensor></momentTensor>')
+            out.write('</focalMechanism>')
+        out.write('</event>\n')
+    out.write('</eventParameters>\n</q:quakeml>\n')
+    return out.getvalue().encode('utf-8')
+
+# Function to make an Inventory of n stations spread over the globe, in
+# networks of up to stations_per_network, each with one channel
+def synthetic_inventory(n, networks=('IU', 'II', 'GE', 'G', 'CN', 'AU', 'XX', 'YY'),
+                        stations_per_network=200, location='00', channel='BHZ', seed=0):
+    rng = np.random.default_rng(seed)
+    longitude = rng.uniform(-180., 180., n)
+    latitude = np.degrees(np.arcsin(rng.uniform(-0.95, 0.98, n)))
+    elevation = rng.uniform(0., 3000., n)
+    start = obspy.UTCDateTime('1990-01-01')
+    inv = Inventory(networks=[], source='synthetic')
+    for i in range(n):
+        k = i//stations_per_network
+        code = networks[k % len(networks)] + ('' if k < len(networks) else str(k//len(networks)))
+        if not inv.networks or inv.networks[-1].code != code:
+            inv.networks.append(Network(code=code, stations=[]))
+        cha = Channel(code=channel, location_code=location, latitude=latitude[i],
+                      longitude=longitude[i], elevation=elevation[i], depth=0.,
+                      start_date=start)
+        inv.networks[-1].stations.append(
+            Station(code='S%03d' % (i % stations_per_network), latitude=latitude[i],
+                    longitude=longitude[i], elevation=elevation[i], channels=[cha],
+                    start_date=start))
+    return inv
+
+# Function to write an Inventory as StationXML (bytes)
+def inventory_to_stationxml(inv):
+    out = io.BytesIO()
+    inv.write(out, format='STATIONXML')
+    return out.getvalue()
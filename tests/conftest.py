@@ -0,0 +1,26 @@
+# Shared set-up for the tests: the modules live at the top of the
+# repository, next to the map scripts, and FDSN services are stood in for by
+# fdsn_standin.py.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fdsn_standin import start_standin
+
+# Function fixture starting local FDSN stand-ins (start_standin keywords);
+# they are shut down after the test
+@pytest.fixture
+def standin():
+    servers = []
+    def start(**kwargs):
+        server = start_standin(**kwargs)
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
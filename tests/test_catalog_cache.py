@@ -0,0 +1,90 @@
+# Tests for catalog_cache.py: query masks and keys, and the on-disk cache
+
+import numpy as np
+import obspy
+
+from catalog_arrays import build_event_arrays
+from catalog_cache import (cached_get_events, load_event_arrays, normalize_query,
+                           query_key, query_mask, save_event_arrays)
+
+T0 = obspy.UTCDateTime('2011-01-01').timestamp
+
+# Events on the bounds of the query below, and just outside each of them
+def _events():
+    rows = [('in', T0, 140., 35., 10., 5.),
+            ('start', T0 - 86400., 140., 35., 10., 5.),
+            ('end', T0 + 86400., 140., 35., 10., 5.),
+            ('before', T0 - 86401., 140., 35., 10., 5.),
+            ('after', T0 + 86401., 140., 35., 10., 5.),
+            ('west', T0, 124.9, 35., 10., 5.),
+            ('east', T0, 150.1, 35., 10., 5.),
+            ('south', T0, 140., 22.9, 10., 5.),
+            ('north', T0, 140., 48.1, 10., 5.),
+            ('small', T0, 140., 35., 10., 2.4),
+            ('large', T0, 140., 35., 10., 7.6),
+            ('corner', T0, 125., 23., 10., 2.5)]
+    return build_event_arrays(*zip(*rows))
+
+QUERY = dict(starttime='2010-12-31', endtime='2011-01-02', minlongitude=125,
+             maxlongitude=150, minlatitude=23, maxlatitude=48, minmagnitude=2.5,
+             maxmagnitude=7.5)
+
+def test_query_mask_bounds_are_inclusive():
+    events = _events()
+    selected = events['event_id'][query_mask(events, **QUERY)]
+    assert sorted(selected) == ['corner', 'end', 'in', 'start']
+
+def test_query_mask_unset_fields_do_not_filter():
+    events = _events()
+    assert query_mask(events).all()
+    mask = query_mask(events, minmagnitude=7.5, maxlatitude=None)
+    assert events['event_id'][mask].tolist() == ['large']
+
+def test_query_mask_time_types():
+    events = _events()
+    np.testing.assert_array_equal(
+        query_mask(events, starttime=obspy.UTCDateTime('2010-12-31'), endtime=T0 + 86400.),
+        query_mask(events, starttime='2010-12-31T00:00:00', endtime='2011-01-02'))
+
+# Equivalent spellings of a query share a key; other queries and other
+# services do not
+def test_query_key():
+    key = query_key(QUERY)
+    same = dict(QUERY, starttime=obspy.UTCDateTime('2010-12-31'), minlongitude=125.,
+                minmagnitude=np.float32(2.5), catalog=None)
+    assert query_key(dict(reversed(list(same.items())))) == key
+    assert query_key(dict(QUERY, maxmagnitude=7.)) != key
+    assert query_key(QUERY, 'IRIS') != key
+    assert query_key(QUERY, 'IRIS') != query_key(QUERY, 'http://127.0.0.1:8080')
+
+# A Client is keyed on its base URL, like the URL itself
+def test_query_key_client_service():
+    class FakeClient:
+        base_url = 'http://127.0.0.1:8080'
+    assert query_key(QUERY, FakeClient()) == query_key(QUERY, 'http://127.0.0.1:8080')
+
+def test_save_and_load_event_arrays(tmp_path):
+    events = _events()
+    path = str(tmp_path / 'events.npz')
+    save_event_arrays(path, events, {'query': normalize_query(**QUERY)})
+    arrays, meta = load_event_arrays(path)
+    assert set(arrays) == set(events)
+    for key in events:
+        np.testing.assert_array_equal(arrays[key], events[key])
+    assert meta['query']['minlongitude'] == 125.
+
+# The second get is served from the cache, per service
+def test_cached_get_events(tmp_path):
+    calls = []
+    def fetch(client, **query):
+        calls.append(client)
+        events = _events()
+        return {key: value[query_mask(events, **query)] for key, value in events.items()}
+    first = cached_get_events('A', str(tmp_path), fetch=fetch, **QUERY)
+    again = cached_get_events('A', str(tmp_path), fetch=fetch, **dict(QUERY, minlongitude=125.))
+    other = cached_get_events('B', str(tmp_path), fetch=fetch, **QUERY)
+    assert calls == ['A', 'B']
+    np.testing.assert_array_equal(first['event_id'], again['event_id'])
+    np.testing.assert_array_equal(first['event_id'], other['event_id'])
+    cached_get_events('A', str(tmp_path), refresh=True, fetch=fetch, **QUERY)
+    assert calls == ['A', 'B', 'A']
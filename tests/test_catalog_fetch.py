@@ -0,0 +1,53 @@
+# Tests for catalog_fetch.py, against a local FDSN stand-in
+
+import numpy as np
+import obspy
+import pytest
+from obspy.clients.fdsn.header import FDSNRequestTooLargeException
+
+from catalog_cache import query_mask
+from catalog_fetch import fetch_events_chunked, split_time_window
+from synthetic_data import synthetic_event_arrays
+
+QUERY = dict(catalog='ISC', starttime='2010-01-01', endtime='2012-01-01',
+             minmagnitude=3., maxmagnitude=9.)
+
+# Function to count the event queries a stand-in answered with status
+def _event_queries(server, status):
+    return server.counts.get(('/fdsnws/event/1/query', status), 0)
+
+def test_split_time_window():
+    slices = split_time_window('2010-01-01', '2010-03-01', 30.)
+    assert [(str(t0), str(t1)) for t0, t1 in slices] == [
+        ('2010-01-01T00:00:00.000000Z', '2010-01-31T00:00:00.000000Z'),
+        ('2010-01-31T00:00:00.000000Z', '2010-03-01T00:00:00.000000Z')]
+
+def test_fetch_events_chunked(standin):
+    events = synthetic_event_arrays(2000, seed=1)
+    server = standin(catalogs={'ISC': events})
+    fetched = fetch_events_chunked(server.base_url, slice_days=90., **QUERY)
+    expected = events['event_id'][query_mask(events, **QUERY)]
+    assert sorted(fetched['event_id']) == sorted(expected)
+    assert _event_queries(server, 413) == 0
+
+# Slices refused as too large (413) are split until the service answers,
+# and no event is lost or doubled
+def test_fetch_events_chunked_splits_refused_slices(standin):
+    events = synthetic_event_arrays(2000, seed=1)
+    server = standin(catalogs={'ISC': events}, max_events=100)
+    fetched = fetch_events_chunked(server.base_url, slice_days=365., retry_wait=0., **QUERY)
+    expected = events['event_id'][query_mask(events, **QUERY)]
+    assert expected.size > 4*100
+    assert sorted(fetched['event_id']) == sorted(expected)
+    assert _event_queries(server, 413) > 0
+    # QuakeML times are to the microsecond
+    np.testing.assert_allclose(np.sort(fetched['time']),
+                               np.sort(events['time'][query_mask(events, **QUERY)]),
+                               rtol=0., atol=1e-6)
+
+# A slice still too large after max_splits halvings is an error
+def test_fetch_events_chunked_gives_up_splitting(standin):
+    server = standin(catalogs={'ISC': synthetic_event_arrays(2000, seed=1)}, max_events=0)
+    with pytest.raises(FDSNRequestTooLargeException):
+        fetch_events_chunked(server.base_url, slice_days=730., retry_wait=0., **QUERY)
+    assert _event_queries(server, 413) == 7
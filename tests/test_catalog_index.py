@@ -0,0 +1,130 @@
+# Tests for catalog_index.py: box arithmetic, store coverage and lookups
+
+import numpy as np
+import obspy
+
+from catalog_arrays import empty_event_arrays
+from catalog_cache import normalize_query, query_mask
+from catalog_index import (CatalogIndex, CatalogStore, box_contains, box_difference,
+                           box_query, indexed_get_events, query_box)
+from synthetic_data import synthetic_event_arrays
+
+DAY = 86400.
+GLOBAL = normalize_query(catalog='ISC', starttime='2010-01-01', endtime='2012-01-01',
+                         minmagnitude=4., maxmagnitude=7.)
+JAPAN = normalize_query(catalog='ISC', starttime='2010-01-01', endtime='2012-01-01',
+                        minmagnitude=2.5, maxmagnitude=7.5, minlatitude=23.,
+                        maxlatitude=48., minlongitude=125., maxlongitude=150.)
+
+# Function to get the volume of a box
+def _volume(box):
+    return np.prod([high - low for low, high in box])
+
+# Function to check whether point lies inside box
+def _inside(point, box):
+    return all(low < value < high for value, (low, high) in zip(point, box))
+
+def test_box_difference_disjoint_and_covered():
+    box = ((0., 10.), (0., 10.), (0., 10.), (0., 10.))
+    assert box_difference(box, ((10., 20.), (0., 10.), (0., 10.), (0., 10.))) == [box]
+    assert box_difference(box, ((-1., 11.), (0., 10.), (-5., 10.), (0., 10.))) == []
+
+# The pieces and the cut together fill the box, without overlapping
+def test_box_difference_partitions_the_box():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        box = tuple(tuple(sorted(rng.uniform(0., 10., 2))) for _ in range(4))
+        cut = tuple(tuple(sorted(rng.uniform(0., 10., 2))) for _ in range(4))
+        pieces = box_difference(box, cut)
+        inter = tuple((max(b[0], c[0]), min(b[1], c[1])) for b, c in zip(box, cut))
+        overlap = _volume(inter) if all(low < high for low, high in inter) else 0.
+        assert np.isclose(sum(_volume(piece) for piece in pieces), _volume(box) - overlap)
+        for piece in pieces:
+            assert box_contains(box, piece)
+        for point in rng.uniform(0., 10., (200, 4)):
+            if _inside(point, box):
+                count = sum(_inside(point, piece) for piece in pieces)
+                assert count == (0 if _inside(point, cut) else 1)
+
+def test_query_box_round_trip():
+    assert box_query(query_box(JAPAN)) == {key: value for key, value in JAPAN.items()
+                                           if key != 'catalog'}
+    box = query_box(GLOBAL)
+    assert box[1] == (-90., 90.) and box[2] == (-180., 180.)
+
+# Function to make a store (in tmp_path) covering query, fetched days_ago
+def _store(tmp_path, query, days_ago=30.):
+    store = CatalogStore(str(tmp_path / 'index_test.npz'))
+    store.add(empty_event_arrays(), [query], obspy.UTCDateTime().timestamp - days_ago*DAY)
+    return store
+
+def test_remainder_of_empty_store(tmp_path):
+    store = CatalogStore(str(tmp_path / 'index_test.npz'))
+    assert store.remainder(GLOBAL) == [GLOBAL]
+
+# A query inside a covered box needs nothing; one sticking out of it only
+# its missing magnitude bands (in the covered region)
+def test_remainder(tmp_path):
+    store = _store(tmp_path, GLOBAL)
+    assert store.remainder(normalize_query(**dict(JAPAN, minmagnitude=4.,
+                                                  maxmagnitude=7.))) == []
+    pieces = store.remainder(JAPAN)
+    bands = sorted((piece['minmagnitude'], piece['maxmagnitude']) for piece in pieces)
+    assert bands == [(2.5, 4.), (7., 7.5)]
+    for piece in pieces:
+        assert piece['catalog'] == 'ISC'
+        assert (piece['minlongitude'], piece['maxlatitude']) == (125., 48.)
+
+# The last settle_days before a box was fetched are fetched again, and a
+# box older than max_age_days not trusted at all
+def test_remainder_settle_and_max_age(tmp_path):
+    now = obspy.UTCDateTime()
+    query = normalize_query(catalog='ISC', starttime=now - 100*DAY, endtime=now,
+                            minmagnitude=4.)
+    store = _store(tmp_path, query, days_ago=0.)
+    pieces = store.remainder(query, settle_days=2.)
+    assert len(pieces) == 1
+    assert abs(obspy.UTCDateTime(pieces[0]['starttime']) - (now - 2*DAY)) < 60.
+    assert obspy.UTCDateTime(pieces[0]['endtime']) == obspy.UTCDateTime(query['endtime'])
+    old = _store(tmp_path, GLOBAL, days_ago=30.)
+    assert old.remainder(GLOBAL, max_age_days=40.) == []
+    assert old.remainder(GLOBAL, max_age_days=20.) == [GLOBAL]
+
+# Adding the fetched pieces of a query keeps the older boxes, with their
+# own fetch times, for the parts served from them
+def test_add_keeps_older_boxes(tmp_path):
+    store = _store(tmp_path, GLOBAL, days_ago=30.)
+    fetched_at = obspy.UTCDateTime().timestamp
+    store.add(empty_event_arrays(), store.remainder(JAPAN), fetched_at)
+    times = sorted(time for box, time in store.boxes)
+    assert len(times) == 3
+    assert times[0] < fetched_at - 29*DAY and times[1:] == [fetched_at, fetched_at]
+    assert store.remainder(JAPAN) == []
+    assert store.remainder(GLOBAL, max_age_days=10.) == [GLOBAL]
+    assert len(store.remainder(JAPAN, max_age_days=10.)) == 1
+
+# Index lookups return what a plain mask over all events would
+def test_catalog_index_matches_query_mask():
+    events = synthetic_event_arrays(20000, seed=2)
+    index = CatalogIndex(events)
+    queries = [JAPAN, GLOBAL, dict(JAPAN, minlongitude=-130., maxlongitude=-65.,
+                                   minlatitude=15., maxlatitude=55.),
+               dict(GLOBAL, starttime='2011-03-01', endtime='2011-03-02')]
+    for query in queries:
+        found = index.query(**query)
+        mask = query_mask(events, **query)
+        assert sorted(found['event_id']) == sorted(events['event_id'][mask])
+        assert (np.diff(found['time']) >= 0).all()
+
+# Sub-region queries after a covering one are served from the store
+def test_indexed_get_events(standin, tmp_path):
+    events = synthetic_event_arrays(5000, seed=7)
+    server = standin(catalogs={'ISC': events})
+    cache_dir = str(tmp_path)
+    everywhere = indexed_get_events(server.base_url, cache_dir,
+                                    **dict(GLOBAL, minmagnitude=2.5, maxmagnitude=7.5))
+    queries = sum(server.counts.values())
+    japan = indexed_get_events(server.base_url, cache_dir, **JAPAN)
+    assert sum(server.counts.values()) == queries
+    assert sorted(japan['event_id']) == sorted(events['event_id'][query_mask(events, **JAPAN)])
+    assert everywhere['event_id'].size > japan['event_id'].size > 0
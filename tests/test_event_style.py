@@ -0,0 +1,38 @@
+# Tests for event_style.py
+
+import numpy as np
+import pytest
+
+from event_style import DEPTH_LIST, DEPTH_COLOR_LIST, classify_events, depth_class_indices
+
+# Depth class of one event the way the seismicity scripts used to find it
+def _ladder_class(depth, depth_list=DEPTH_LIST):
+    for i, boundary in enumerate(depth_list):
+        if depth <= boundary:
+            return i
+    return len(depth_list)
+
+# Classes match the if-ladder everywhere, on the boundaries (which belong to
+# the shallower class), just past them and for missing depths
+def test_depth_class_indices_match_if_ladder():
+    rng = np.random.default_rng(0)
+    depth = np.concatenate([rng.uniform(-5., 700., 10000), DEPTH_LIST,
+                            np.nextafter(DEPTH_LIST, np.inf), [0., np.nan]])
+    assert depth_class_indices(depth).tolist() == [_ladder_class(d) for d in depth]
+
+def test_depth_class_indices_custom_list():
+    depth_list = [10., 100.]
+    depth = [0., 10., 10.5, 100., 1000.]
+    expected = [_ladder_class(d, depth_list) for d in depth]
+    assert expected == [0, 0, 1, 1, 2]
+    assert depth_class_indices(depth, depth_list).tolist() == expected
+
+def test_classify_events():
+    color_index, colors, marker_size = classify_events([10., 600.], [2.5, 7.5], 2.5, 7.5)
+    assert color_index.tolist() == [0, 5]
+    np.testing.assert_allclose(colors, np.asarray(DEPTH_COLOR_LIST)[[0, 5]])
+    np.testing.assert_allclose(marker_size, [1., 3.])
+
+def test_classify_events_needs_a_color_per_class():
+    with pytest.raises(ValueError):
+        classify_events([10.], [5.], 2.5, 7.5, depth_list=[35.])
@@ -0,0 +1,98 @@
+# Tests for quakeml_stream.py: the streaming parser against obspy.read_events
+
+import io
+import os
+import warnings
+
+import numpy as np
+import obspy
+import pytest
+
+from catalog_arrays import MECHANISM_FIELDS
+from quakeml_stream import read_quakeml_arrays
+from synthetic_data import event_arrays_to_quakeml, synthetic_event_arrays
+
+# QuakeML samples shipped with obspy's tests: service responses (IRIS,
+# NERIES, USGS) and documents with several origins and magnitudes or with a
+# focal mechanism
+SAMPLE_DIR = os.path.join(os.path.dirname(obspy.__file__), 'io', 'quakeml', 'tests', 'data')
+SAMPLES = ('iris_events.xml', 'neries_events.xml', 'usgs_event.xml', 'preferred.xml',
+           'qml-example-1.2-RC3.xml', 'quakeml_1.2_origin.xml',
+           'quakeml_1.2_magnitude.xml', 'quakeml_1.2_focalmechanism.xml')
+
+# Function to read a document with obspy; returns the Catalog (obspy warns
+# about, and drops, events with a non-standard event type)
+def _read_events(source):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        return obspy.read_events(source, format='QUAKEML')
+
+# Function to get the preferred item of an event the way obspy does,
+# falling back to the first
+def _preferred(preferred, items):
+    return preferred if preferred is not None else (items[0] if items else None)
+
+# Function to check parsed event arrays against an obspy Catalog, event by
+# event; the parser may keep events obspy drops
+def _check_against_catalog(arrays, cat, mechanisms=False):
+    index = {event_id: i for i, event_id in enumerate(arrays['event_id'])}
+    assert len(cat) > 0
+    for event in cat:
+        i = index[str(event.resource_id)]
+        origin = _preferred(event.preferred_origin(), event.origins)
+        magnitude = _preferred(event.preferred_magnitude(), event.magnitudes)
+        expected = {'magnitude': None if magnitude is None else magnitude.mag}
+        if origin is not None:
+            expected.update(time=origin.time.timestamp, longitude=origin.longitude,
+                            latitude=origin.latitude,
+                            depth_km=None if origin.depth is None else origin.depth/1000.)
+        if mechanisms:
+            mechanism = _preferred(event.preferred_focal_mechanism(), event.focal_mechanisms)
+            if mechanism is not None and mechanism.nodal_planes is not None:
+                plane = mechanism.nodal_planes.nodal_plane_1
+                expected.update({key: getattr(plane, key) for key in ('strike', 'dip', 'rake')})
+            if mechanism is not None and mechanism.moment_tensor is not None:
+                tensor = mechanism.moment_tensor.tensor
+                expected.update({key: getattr(tensor, key) for key in MECHANISM_FIELDS[3:]})
+        keys = ('time', 'longitude', 'latitude', 'depth_km', 'magnitude')
+        for key in keys + (MECHANISM_FIELDS if mechanisms else ()):
+            value = expected.get(key)
+            if value is None:
+                assert np.isnan(arrays[key][i]), key
+            else:
+                assert arrays[key][i] == pytest.approx(value, rel=1e-9, abs=1e-6), key
+
+@pytest.mark.parametrize('name', SAMPLES)
+def test_matches_obspy_on_samples(name):
+    path = os.path.join(SAMPLE_DIR, name)
+    if not os.path.exists(path):
+        pytest.skip('obspy test data not installed')
+    arrays = read_quakeml_arrays(path, mechanisms=True)
+    _check_against_catalog(arrays, _read_events(path), mechanisms=True)
+
+# A synthetic catalog with mechanisms, read in small chunks
+def test_matches_obspy_on_synthetic_catalog():
+    events = synthetic_event_arrays(300, mechanisms=True, seed=3)
+    quakeml = event_arrays_to_quakeml(events)
+    arrays = read_quakeml_arrays(io.BytesIO(quakeml), chunk_size=7, mechanisms=True)
+    assert arrays['event_id'].tolist() == events['event_id'].tolist()
+    _check_against_catalog(arrays, _read_events(io.BytesIO(quakeml)), mechanisms=True)
+
+# Times with a zone offset are converted to UTC, without numpy's warning
+def test_time_zone_offsets():
+    events = synthetic_event_arrays(20, seed=4)
+    quakeml = event_arrays_to_quakeml(events)
+    first = obspy.UTCDateTime(events['time'][0])
+    shifted = (first + 9*3600).strftime('%Y-%m-%dT%H:%M:%S.%f') + '+09:00'
+    quakeml = quakeml.replace(first.strftime('%Y-%m-%dT%H:%M:%S.%f').encode() + b'Z',
+                              shifted.encode(), 1)
+    assert shifted.encode() in quakeml
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        arrays = read_quakeml_arrays(quakeml)
+    np.testing.assert_allclose(arrays['time'], events['time'], rtol=0., atol=1e-6)
+
+def test_empty_document():
+    arrays = read_quakeml_arrays(event_arrays_to_quakeml(synthetic_event_arrays(0)))
+    assert arrays['event_id'].size == 0
+    assert set(arrays) >= {'time', 'longitude', 'latitude', 'depth_km', 'magnitude'}
@@ -0,0 +1,80 @@
+# Tests for catalog_cache.refresh_events, against a local FDSN stand-in
+
+import time
+
+import numpy as np
+import obspy
+
+from catalog_arrays import build_event_arrays, concat_event_arrays
+from catalog_cache import query_mask, refresh_events
+from synthetic_data import synthetic_event_arrays
+
+QUERY = dict(catalog='ISC', minmagnitude=3.)
+
+# Function to count the event queries a stand-in answered
+def _event_queries(server):
+    return sum(n for (path, status), n in server.counts.items()
+               if path == '/fdsnws/event/1/query')
+
+# A later run only asks for the new part of the window and for events
+# updated since the last run (updatedafter); new events are added and
+# revised ones replace the stored copies
+def test_refresh_events_adds_new_and_updated_events(standin, tmp_path):
+    events = synthetic_event_arrays(2000, seed=5)
+    server = standin(catalogs={'ISC': events})
+    first = refresh_events(server.base_url, '2010-01-01', '2011-06-01', str(tmp_path), **QUERY)
+    in_first = query_mask(events, starttime='2010-01-01', endtime='2011-06-01', **QUERY)
+    assert sorted(first['event_id']) == sorted(events['event_id'][in_first])
+    assert _event_queries(server) == 1
+
+    # Revise an event of the first window and add one after it
+    isc = server.catalogs['ISC']
+    old = np.flatnonzero(query_mask(isc, starttime='2010-01-01', endtime='2010-06-01',
+                                    **QUERY))[0]
+    isc['magnitude'][old] = 8.8
+    new = build_event_arrays(['smi:local/new/1'],
+                             [obspy.UTCDateTime('2011-09-01').timestamp], [142.], [38.],
+                             [20.], [6.5])
+    server.catalogs['ISC'] = concat_event_arrays([isc, new])
+    server.loaded = time.time()
+    server.counts.clear()
+
+    second = refresh_events(server.base_url, '2010-01-01', '2012-01-01', str(tmp_path),
+                            **QUERY)
+    assert _event_queries(server) == 2
+    revised = second['magnitude'][second['event_id'] == isc['event_id'][old]]
+    assert revised.tolist() == [8.8]
+    assert 'smi:local/new/1' in second['event_id']
+    in_second = query_mask(server.catalogs['ISC'], starttime='2010-01-01',
+                           endtime='2012-01-01', **QUERY)
+    assert sorted(second['event_id']) == sorted(server.catalogs['ISC']['event_id'][in_second])
+    assert np.unique(second['event_id']).size == second['event_id'].size
+
+# Events not updated since the last run are not replaced, and a window
+# inside the stored one is served without asking the service
+def test_refresh_events_keeps_unchanged_events(standin, tmp_path):
+    events = synthetic_event_arrays(2000, seed=6)
+    server = standin(catalogs={'ISC': events})
+    # Loaded long before the first run, so nothing counts as updated since
+    server.loaded = time.time() - 10*86400.
+    refresh_events(server.base_url, '2010-01-01', '2011-06-01', str(tmp_path), **QUERY)
+    server.catalogs['ISC']['magnitude'][:] = 9.9
+    server.counts.clear()
+
+    narrower = refresh_events(server.base_url, '2010-03-01', '2011-01-01', str(tmp_path),
+                              **QUERY)
+    assert _event_queries(server) == 0
+    assert narrower['event_id'].size > 0
+    assert (narrower['magnitude'] < 9.9).all()
+    assert narrower['time'].min() >= obspy.UTCDateTime('2010-03-01').timestamp
+    assert narrower['time'].max() <= obspy.UTCDateTime('2011-01-01').timestamp
+
+    longer = refresh_events(server.base_url, '2010-01-01', '2012-01-01', str(tmp_path),
+                            **QUERY)
+    assert _event_queries(server) == 2
+    # Only the new part of the window (and its one-day overlap) is fetched
+    refetched = longer['magnitude'] == 9.9
+    assert refetched.any() and not refetched.all()
+    overlap_start = obspy.UTCDateTime('2011-05-31').timestamp
+    assert (longer['time'][refetched] >= overlap_start).all()
+    assert (longer['time'][~refetched] < overlap_start).all()